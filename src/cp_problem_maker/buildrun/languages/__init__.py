@@ -1,15 +1,60 @@
-from .cpp import Cpp, SolverCpp
-from .language import CompileResult, ILanguage
-from .python import Python
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .language import CompileError, CompileResult, ILanguage, Role
 from .registry import LanguageRegistry
-from .text_cat import TextCat
+
+if TYPE_CHECKING:
+    from .cpp import (
+        CheckerCpp,
+        Cpp,
+        GeneratorCpp,
+        SanitizerCpp,
+        SolverCpp,
+        ToolchainCpp,
+        VerifierCpp,
+    )
+    from .python import Python, SolverPython, ToolPython
+    from .text_cat import TextCat
+
+# Languages are imported on first access, so that unused ones cost nothing
+_LAZY_ATTRIBUTES = {
+    "Cpp": ".cpp",
+    "SolverCpp": ".cpp",
+    "CheckerCpp": ".cpp",
+    "VerifierCpp": ".cpp",
+    "GeneratorCpp": ".cpp",
+    "SanitizerCpp": ".cpp",
+    "ToolchainCpp": ".cpp",
+    "Python": ".python",
+    "SolverPython": ".python",
+    "ToolPython": ".python",
+    "TextCat": ".text_cat",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    return getattr(module, name)
+
 
 __all__ = [
     "ILanguage",
     "Cpp",
     "SolverCpp",
+    "CheckerCpp",
+    "VerifierCpp",
+    "GeneratorCpp",
+    "SanitizerCpp",
+    "ToolchainCpp",
     "Python",
+    "SolverPython",
+    "ToolPython",
     "TextCat",
     "CompileResult",
+    "CompileError",
     "LanguageRegistry",
+    "Role",
 ]
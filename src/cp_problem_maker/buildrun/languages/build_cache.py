@@ -0,0 +1,401 @@
+import fcntl
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator, Iterable, Mapping
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from cp_problem_maker.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+_MANIFEST_MAX_ENTRIES = 8
+"""Number of dependency snapshots remembered for a single source key"""
+
+_DEP_TOKEN_PATTERN = re.compile(r"(?:\\.|[^\s\\])+")
+
+
+def hash_bytes(*chunks: bytes) -> str:
+    """Hash the byte chunks
+
+    Args:
+        *chunks (bytes): Byte chunks to hash
+    Returns:
+        str: Hex digest of the chunks
+    """
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(len(chunk).to_bytes(8, "little"))
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_file(file_path: Path) -> str:
+    """Hash the content of the file
+
+    Args:
+        file_path (Path): Path to the file
+    Returns:
+        str: Hex digest of the content
+    """
+    with file_path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def executable_identity(executable: str) -> str:
+    """Identify an executable by its resolved path, size and modification time
+
+    Upgrading a compiler or an interpreter in place changes its identity,
+    which invalidates the artifacts built by it.
+
+    Args:
+        executable (str): Command name or path of the executable
+    Returns:
+        str: Identity of the executable
+    """
+    resolved = shutil.which(executable)
+    if resolved is None:
+        return executable
+    real_path = Path(resolved).resolve()
+    stat = real_path.stat()
+    return f"{real_path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def parse_dep_file(dep_file: Path) -> list[Path]:
+    """Parse a Makefile-style dependency file generated by `-MMD` or `-MD`
+
+    Args:
+        dep_file (Path): Path to the dependency file
+    Returns:
+        list[Path]: Resolved paths of the prerequisites
+    """
+    return parse_deps(dep_file.read_text())
+
+
+def parse_deps(content: str) -> list[Path]:
+    """Parse Makefile-style dependency rules generated by `-M` and its variants
+
+    Args:
+        content (str): Dependency rules
+    Returns:
+        list[Path]: Resolved paths of the prerequisites
+    """
+    content = content.replace("\\\n", " ")
+    deps: list[Path] = []
+    for rule in content.splitlines():
+        _, sep, prerequisites = rule.partition(": ")
+        if not sep:
+            continue
+        for token in _DEP_TOKEN_PATTERN.findall(prerequisites):
+            deps.append(Path(re.sub(r"\\(.)", r"\1", token)).resolve())
+    return list(dict.fromkeys(deps))
+
+
+def _artifact_size(artifact: Path) -> int:
+    if not artifact.is_dir():
+        return artifact.stat().st_size
+    return sum(f.stat().st_size for f in artifact.rglob("*") if f.is_file())
+
+
+def _end_session(fd: int, session_file: Path) -> None:
+    session_file.unlink(missing_ok=True)
+    os.close(fd)
+
+
+class _ManifestEntry(BaseModel):
+    deps: dict[str, str] = Field(..., description="Content hash of each dependency")
+    artifact: str = Field(..., description="Key of the artifact")
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+class _Manifest(BaseModel):
+    entries: list[_ManifestEntry] = Field([], description="Most recent entry first")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class BuildCache:
+    """Content-addressed store of build artifacts shared across problems.
+
+    Layout of the cache directory::
+
+        <root>/<profile>/manifests/<source key>.json
+        <root>/<profile>/artifacts/<artifact key>
+        <root>/<profile>/tmp/
+        <root>/lock
+        <root>/sessions/
+
+    A source key identifies everything known before building (source bytes,
+    compiler and flags). Its manifest remembers the dependencies discovered
+    while building and the artifact built from them, so that an artifact is
+    reused only if every dependency still has the same content.
+    An artifact is either a single file or a directory.
+    The least recently used artifacts are evicted when the total size of the
+    artifacts exceeds `max_size_mb`. The profiles in `profile_max_size_mb`
+    have budgets of their own instead, so that e.g. a large set of answers
+    does not evict the executables.
+    The artifacts looked up or stored by this instance are never evicted by it,
+    since they may still be run.
+
+    Several processes may share the cache. Lookups take a shared `flock` on
+    `<root>/lock`, and stores and evictions an exclusive one. Each instance
+    also holds a shared `flock` on a file in `<root>/sessions/` while it is
+    alive. An artifact used since the start of any live session is not
+    evicted, since another process may still run it.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_size_mb: int | None,
+        profile_max_size_mb: Mapping[str, int] | None = None,
+    ) -> None:
+        self.root = root
+        self.max_size_mb = max_size_mb
+        self.profile_max_size_mb = dict(profile_max_size_mb or {})
+        self._in_use: set[Path] = set()
+        """Artifacts handed out by this instance"""
+        self._session_started = False
+
+    @contextmanager
+    def _locked(self, *, exclusive: bool) -> Generator[None, None, None]:
+        """Lock the cache against the other processes and threads
+
+        The lock file is opened per call, so that the threads of a process
+        also exclude each other.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / "lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if not self._session_started:
+                # Excluding evictions, which would find the new session file
+                # unlocked and remove it
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._start_session()
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def _start_session(self) -> None:
+        """Mark the session of this instance as live until it is collected"""
+        sessions_dir = self.root / "sessions"
+        sessions_dir.mkdir(parents=True, exist_ok=True)
+        fd, session_file = tempfile.mkstemp(dir=sessions_dir)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        # Also at exit. The files left by killed processes are removed by
+        # `_oldest_live_session`.
+        weakref.finalize(self, _end_session, fd, Path(session_file))
+        self._session_started = True
+
+    def _oldest_live_session(self) -> float | None:
+        """Find the start time of the oldest session still alive
+
+        The files of the sessions ended without cleanup are removed.
+
+        Returns:
+            float | None: Modification time of the oldest live session file
+        """
+        oldest: float | None = None
+        for session_file in (self.root / "sessions").glob("*"):
+            try:
+                fd = os.open(session_file, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                started = os.fstat(fd).st_mtime
+                oldest = started if oldest is None else min(oldest, started)
+            else:
+                session_file.unlink(missing_ok=True)
+            finally:
+                os.close(fd)
+        return oldest
+
+    def _profile_dir(self, profile: str) -> Path:
+        return self.root / profile
+
+    def _manifest_file(self, profile: str, source_key: str) -> Path:
+        return self._profile_dir(profile) / "manifests" / f"{source_key}.json"
+
+    def _artifact_file(self, profile: str, artifact_key: str) -> Path:
+        return self._profile_dir(profile) / "artifacts" / artifact_key
+
+    def _load_manifest(self, profile: str, source_key: str) -> _Manifest:
+        manifest_file = self._manifest_file(profile, source_key)
+        try:
+            return _Manifest.model_validate_json(manifest_file.read_bytes())
+        except FileNotFoundError:
+            return _Manifest()
+        except ValidationError:
+            logger.warning("Ignoring broken manifest file %s", manifest_file)
+            return _Manifest()
+
+    def _write_manifest(
+        self, profile: str, source_key: str, manifest: _Manifest
+    ) -> None:
+        manifest_file = self._manifest_file(profile, source_key)
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=manifest_file.parent, suffix=".tmp", delete=False
+        ) as f:
+            f.write(manifest.model_dump_json())
+        Path(f.name).replace(manifest_file)
+
+    @staticmethod
+    def _deps_unchanged(deps: dict[str, str]) -> bool:
+        for dep, digest in deps.items():
+            try:
+                if hash_file(Path(dep)) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def lookup(self, profile: str, source_key: str) -> Path | None:
+        """Look up the artifact built from the source key
+
+        Args:
+            profile (str): Build profile
+            source_key (str): Key of the source
+        Returns:
+            Path | None: Path to the artifact, or None if there is no valid artifact
+        """
+        with self._locked(exclusive=False):
+            manifest = self._load_manifest(profile, source_key)
+            for entry in manifest.entries:
+                artifact_file = self._artifact_file(profile, entry.artifact)
+                if not artifact_file.exists() or not self._deps_unchanged(entry.deps):
+                    continue
+                try:
+                    # The modification time is used as the last access time for
+                    # LRU, and tells the other sessions that it is in use.
+                    os.utime(artifact_file)
+                except FileNotFoundError:
+                    continue
+                logger.debug("Build cache hit: %s/%s", profile, entry.artifact)
+                self._in_use.add(artifact_file)
+                return artifact_file
+        logger.debug("Build cache miss: %s/%s", profile, source_key)
+        return None
+
+    @contextmanager
+    def staging_dir(self, profile: str) -> Generator[Path, None, None]:
+        """Create a temporary directory to build an artifact in
+
+        The directory is on the same filesystem as the artifacts,
+        so that `store` can move the artifact atomically.
+
+        Args:
+            profile (str): Build profile
+        Yields:
+            Path: Path to the temporary directory
+        """
+        tmp_root = self._profile_dir(profile) / "tmp"
+        tmp_root.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=tmp_root) as tmp_dir:
+            yield Path(tmp_dir)
+
+    def store(
+        self,
+        profile: str,
+        source_key: str,
+        *,
+        artifact: Path,
+        deps: Iterable[Path],
+    ) -> Path:
+        """Store the artifact built from the source key
+
+        Args:
+            profile (str): Build profile
+            source_key (str): Key of the source
+            artifact (Path): Built file or directory. It is moved into the cache.
+            deps (Iterable[Path]): Files the artifact depends on
+        Returns:
+            Path: Path to the artifact in the cache
+        """
+        dep_hashes = {str(dep): hash_file(dep) for dep in sorted(set(deps))}
+        artifact_key = hash_bytes(
+            source_key.encode(),
+            *(f"{dep}\0{digest}".encode() for dep, digest in dep_hashes.items()),
+        )
+        artifact_file = self._artifact_file(profile, artifact_key)
+        artifact_file.parent.mkdir(parents=True, exist_ok=True)
+        entry = _ManifestEntry(deps=dep_hashes, artifact=artifact_key)
+        with self._locked(exclusive=True):
+            try:
+                artifact.replace(artifact_file)
+            except OSError:
+                # The same directory artifact has been stored concurrently
+                if not (artifact.is_dir() and artifact_file.is_dir()):
+                    raise
+            os.utime(artifact_file)
+            self._in_use.add(artifact_file)
+            manifest = self._load_manifest(profile, source_key)
+            entries = [entry] + [e for e in manifest.entries if e != entry]
+            manifest.entries = entries[:_MANIFEST_MAX_ENTRIES]
+            self._write_manifest(profile, source_key, manifest)
+            if profile in self.profile_max_size_mb:
+                self._evict(
+                    self._profile_dir(profile).glob("artifacts/*"),
+                    max_size_mb=self.profile_max_size_mb[profile],
+                )
+            else:
+                self._evict(
+                    (
+                        artifact_file
+                        for artifact_file in self.root.glob("*/artifacts/*")
+                        if artifact_file.parent.parent.name
+                        not in self.profile_max_size_mb
+                    ),
+                    max_size_mb=self.max_size_mb,
+                )
+        return artifact_file
+
+    def _evict(
+        self, artifact_files: Iterable[Path], *, max_size_mb: int | None
+    ) -> None:
+        """Evict the least recently used artifacts not in use beyond the size
+
+        Must be called with the exclusive lock.
+
+        Args:
+            artifact_files (Iterable[Path]): Artifacts sharing the budget
+            max_size_mb (int | None): Budget in MiB. Unlimited if None.
+        """
+        if max_size_mb is None:
+            return
+        oldest_session = self._oldest_live_session()
+        artifacts: list[tuple[float, int, Path]] = []
+        for artifact_file in artifact_files:
+            try:
+                stat = artifact_file.stat()
+                size = _artifact_size(artifact_file)
+            except FileNotFoundError:
+                continue
+            artifacts.append((stat.st_mtime, size, artifact_file))
+        total_size = sum(size for _, size, _ in artifacts)
+        max_size = max_size_mb * 1024 * 1024
+        for mtime, size, artifact_file in sorted(artifacts):
+            if total_size <= max_size:
+                break
+            if artifact_file in self._in_use:
+                continue
+            if oldest_session is not None and mtime >= oldest_session:
+                # Used by a live session, and the older ones are evicted first
+                break
+            logger.debug("Evicting %s from the build cache", artifact_file)
+            if artifact_file.is_dir():
+                shutil.rmtree(artifact_file, ignore_errors=True)
+            else:
+                artifact_file.unlink(missing_ok=True)
+            total_size -= size
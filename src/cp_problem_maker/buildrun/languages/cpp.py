@@ -1,19 +1,122 @@
+import re
+import shutil
 import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Self
 
-from cp_problem_maker.buildrun.languages.language import CompileResult, ILanguage
+from cp_problem_maker.buildrun.languages.build_cache import (
+    BuildCache,
+    executable_identity,
+    hash_bytes,
+    parse_dep_file,
+    parse_deps,
+)
+from cp_problem_maker.buildrun.languages.language import (
+    CompileError,
+    CompileResult,
+    ILanguage,
+    Role,
+)
 from cp_problem_maker.config import tool_config
 from cp_problem_maker.logging.setup import get_logger
 
 logger = get_logger(__name__)
 
+_DIRECTIVE_PATTERN = re.compile(r"^\s*#\s*(\w+)\s*(.*)$", re.MULTILINE)
+_INCLUDE_ARG_PATTERN = re.compile(r'[<"]([^>"]+)[>"]')
+
+
+def _leading_includes(source: str) -> list[str]:
+    """List the headers included before any other preprocessor directive
+
+    Precompiling such a header does not change the meaning of the source,
+    because no macro or pragma can be in effect when it is included.
+
+    Args:
+        source (str): Source code
+    Returns:
+        list[str]: Headers as written in the include directives
+    """
+    headers: list[str] = []
+    for directive in _DIRECTIVE_PATTERN.finditer(source):
+        if directive[1] != "include":
+            break
+        include_arg = _INCLUDE_ARG_PATTERN.match(directive[2])
+        if include_arg is None:
+            break
+        headers.append(include_arg[1])
+    return headers
+
+
+_STATIC_LINK_PROBE = """\
+#include <iostream>
+int main() { std::cout << std::endl; }
+"""
+
+_static_link_support: dict[tuple[str, str], bool] = {}
+_static_link_lock = threading.Lock()
+
+
+def _supports_static_link(compiler: str, flags: list[str]) -> bool:
+    """Check whether a program can be linked statically with the compiler and flags
+
+    The check fails if the static libraries (e.g. libstdc++.a) are not installed,
+    or if the flags conflict with static linking (e.g. sanitizers).
+    The result is cached per compiler and flags.
+
+    Args:
+        compiler (str): Compiler command
+        flags (list[str]): Compiler flags
+    Returns:
+        bool: True if static linking is available
+    """
+    key = (executable_identity(compiler), "\0".join(flags))
+    with _static_link_lock:
+        if key not in _static_link_support:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                exec_file = Path(tmp_dir) / "probe"
+                cmd = [compiler, *flags, "-static", "-x", "c++", "-"]
+                cmd += ["-o", str(exec_file)]
+                logger.debug("Running command: %s", cmd)
+                proc = subprocess.run(
+                    cmd, input=_STATIC_LINK_PROBE, capture_output=True, text=True
+                )
+            if proc.returncode != 0:
+                logger.warning(
+                    "Static linking is not available, falling back to dynamic linking:\n%s",  # noqa: E501
+                    proc.stderr,
+                )
+            _static_link_support[key] = proc.returncode == 0
+        return _static_link_support[key]
+
+
+@dataclass
+class _PrecompiledHeader:
+    include_file: Path
+    """File to pass to `-include`. The precompiled header is next to it."""
+    source_file: Path
+    """Original header file"""
+
 
 class Cpp(ILanguage):
-    def __init__(self, cpp_config: tool_config._Cpp) -> None:
+    profile = "cpp"
+    """Name of the build profile. Artifacts are cached separately per profile."""
+
+    def __init__(self, cpp_config: tool_config._Cpp, build_cache: BuildCache) -> None:
         super().__init__()
         self.cpp_config = cpp_config.model_copy(deep=True)
+        self.build_cache = build_cache
         # Cache the compilation result
         self.compile_cache: dict[Path, CompileResult] = {}
+        # Lock per file so that the same file is never compiled twice at a time
+        self._file_locks: dict[Path, threading.Lock] = {}
+        self._file_locks_lock = threading.Lock()
+        # Precompiled headers keyed by the header name and the source directory
+        self._pch_cache: dict[tuple[str, Path], _PrecompiledHeader | None] = {}
+        self._pch_locks: dict[tuple[str, Path], threading.Lock] = {}
 
     @classmethod
     def get_name(cls) -> str:
@@ -23,30 +126,196 @@ class Cpp(ILanguage):
     def get_extensions(cls) -> list[str]:
         return [".cpp", ".cc", ".cxx", ".c++"]
 
-    @staticmethod
-    def _exec_file(file_path: Path) -> Path:
-        return file_path.with_suffix("")
+    @classmethod
+    def from_config(
+        cls, config: tool_config._Language, *, build_cache: BuildCache
+    ) -> Self:
+        return cls(config.cpp, build_cache)
+
+    @classmethod
+    def for_role(cls, role: Role) -> type[ILanguage]:
+        return _ROLE_LANGUAGES[role]
+
+    @classmethod
+    def has_sanitizer(cls) -> bool:
+        return True
+
+    @classmethod
+    def solver_toolchains(
+        cls, config: tool_config._Language, *, build_cache: BuildCache
+    ) -> dict[str, ILanguage]:
+        return {
+            name: ToolchainCpp(config.cpp, build_cache, toolchain=name)
+            for name in config.cpp.toolchains
+        }
+
+    def _apply_override(self, override: tool_config._CppOverride | None) -> None:
+        if override is None:
+            return
+        if override.compiler is not None:
+            self.cpp_config.compiler = override.compiler
+        if override.flags is not None:
+            self.cpp_config.flags = override.flags
+        if override.static_link is not None:
+            self.cpp_config.static_link = override.static_link
+
+    def links_statically(self) -> bool:
+        """Whether the executables are linked statically
+
+        Returns:
+            bool: True if static linking is enabled and available
+        """
+        return self.cpp_config.static_link and _supports_static_link(
+            self.cpp_config.compiler, self.cpp_config.flags
+        )
+
+    def _link_flags(self) -> list[str]:
+        return ["-static"] if self.links_statically() else []
+
+    def _source_key(self, file_path: Path) -> str:
+        return hash_bytes(
+            executable_identity(self.cpp_config.compiler).encode(),
+            "\0".join([*self.cpp_config.flags, *self._link_flags()]).encode(),
+            file_path.read_bytes(),
+        )
+
+    def _build_precompiled_header(
+        self, header: str, search_dir: Path
+    ) -> _PrecompiledHeader | None:
+        compiler = self.cpp_config.compiler
+        flags = self.cpp_config.flags
+        # Resolve the header in the same way as `#include "header"` in the source
+        cmd = [compiler, *flags, "-iquote", str(search_dir), "-x", "c++", "-M", "-"]
+        logger.debug("Running command: %s", cmd)
+        proc = subprocess.run(
+            cmd, input=f'#include "{header}"\n', capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            logger.debug("Header %s is not found: %s", header, proc.stderr)
+            return None
+        deps = parse_deps(proc.stdout)
+        header_file = next((d for d in deps if d.match(header)), None)
+        if header_file is None:
+            return None
+
+        source_key = hash_bytes(
+            b"precompiled-header",
+            executable_identity(compiler).encode(),
+            "\0".join(flags).encode(),
+            str(header_file).encode(),
+        )
+        pch_dir = self.build_cache.lookup(self.profile, source_key)
+        if pch_dir is None:
+            with self.build_cache.staging_dir(self.profile) as staging_dir:
+                include_file = staging_dir / "pch" / header
+                include_file.parent.mkdir(parents=True)
+                shutil.copyfile(header_file, include_file)
+                cmd = [
+                    compiler,
+                    *flags,
+                    "-x",
+                    "c++-header",
+                    str(include_file),
+                    "-o",
+                    f"{include_file}.gch",
+                ]
+                logger.info("Precompiling %s (profile: %s)", header, self.profile)
+                logger.debug("Running command: %s", cmd)
+                proc = subprocess.run(cmd, capture_output=True, text=True)
+                if proc.returncode != 0:
+                    logger.warning(
+                        "Failed to precompile %s:\n%s", header_file, proc.stderr
+                    )
+                    return None
+                pch_dir = self.build_cache.store(
+                    self.profile, source_key, artifact=staging_dir / "pch", deps=deps
+                )
+        return _PrecompiledHeader(
+            include_file=pch_dir / header, source_file=header_file
+        )
+
+    def _precompiled_header(self, file_path: Path) -> _PrecompiledHeader | None:
+        """Get the precompiled header usable for the source file
+
+        Only one precompiled header can be used in a compilation,
+        so the first configured header included by the source is chosen.
+
+        Args:
+            file_path (Path): Path to the source file
+        Returns:
+            _PrecompiledHeader | None: Precompiled header, or None if not available
+        """
+        leading_includes = _leading_includes(file_path.read_text(errors="replace"))
+        headers = [
+            header
+            for header in leading_includes
+            if header in self.cpp_config.precompiled_headers
+        ]
+        if not headers:
+            return None
+        key = (headers[0], file_path.parent)
+        with self._file_locks_lock:
+            pch_lock = self._pch_locks.setdefault(key, threading.Lock())
+        with pch_lock:
+            if key not in self._pch_cache:
+                self._pch_cache[key] = self._build_precompiled_header(*key)
+            return self._pch_cache[key]
+
+    def _build(self, file_path: Path, source_key: str) -> Path:
+        pch_flags: list[str] = []
+        pch_deps: list[Path] = []
+        pch = self._precompiled_header(file_path)
+        if pch is not None:
+            pch_flags = ["-include", str(pch.include_file)]
+            pch_deps = [pch.source_file]
+        with self.build_cache.staging_dir(self.profile) as staging_dir:
+            exec_file = staging_dir / file_path.stem
+            dep_file = staging_dir / f"{file_path.stem}.d"
+            cmd = [
+                self.cpp_config.compiler,
+                *self.cpp_config.flags,
+                *pch_flags,
+                *self._link_flags(),
+                "-MMD",
+                "-MF",
+                str(dep_file),
+                "-o",
+                str(exec_file),
+                str(file_path),
+            ]
+            logger.info("Compiling %s (profile: %s)", file_path.name, self.profile)
+            logger.debug("Running command: %s", cmd)
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise CompileError(file_path, cmd=cmd, stderr=proc.stderr)
+            if proc.stderr:
+                logger.warning("Compiler output for %s:\n%s", file_path, proc.stderr)
+            return self.build_cache.store(
+                self.profile,
+                source_key,
+                artifact=exec_file,
+                deps=[file_path, *parse_dep_file(dep_file), *pch_deps],
+            )
 
     def compile(self, file_path: Path) -> CompileResult:
         file_path = file_path.resolve()
+        with self._file_locks_lock:
+            file_lock = self._file_locks.setdefault(file_path, threading.Lock())
+        with file_lock:
+            return self._compile(file_path)
 
+    def _compile(self, file_path: Path) -> CompileResult:
         # Check cache
         if file_path in self.compile_cache:
             return self.compile_cache[file_path]
 
-        exec_file = Cpp._exec_file(file_path)
-        cmd = [
-            self.cpp_config.compiler,
-            *self.cpp_config.flags,
-            "-o",
-            str(exec_file),
-            str(file_path),
-        ]
-        logger.debug("Running command: %s", cmd)
-        subprocess.run(cmd)
+        source_key = self._source_key(file_path)
+        exec_file = self.build_cache.lookup(self.profile, source_key)
+        if exec_file is None:
+            exec_file = self._build(file_path, source_key)
         result = CompileResult(
             language=Cpp,
-            exec_cmd=[str(exec_file.resolve())],
+            exec_cmd=[str(exec_file)],
         )
 
         # Update cache
@@ -56,13 +325,61 @@ class Cpp(ILanguage):
 
 
 class SolverCpp(Cpp):
-    def __init__(self, cpp_config: tool_config._Cpp) -> None:
-        super().__init__(cpp_config)
-        solver_config = self.cpp_config.solver
-        if solver_config is not None:
-            compiler = solver_config.compiler
-            flags = solver_config.flags
-            if compiler is not None:
-                self.cpp_config.compiler = compiler
-            if flags is not None:
-                self.cpp_config.flags = flags
+    profile = "solver-cpp"
+
+    def __init__(self, cpp_config: tool_config._Cpp, build_cache: BuildCache) -> None:
+        super().__init__(cpp_config, build_cache)
+        self._apply_override(self.cpp_config.solver)
+
+
+class ToolchainCpp(SolverCpp):
+    """Solver build with a toolchain variant applied on top of the solver profile"""
+
+    def __init__(
+        self, cpp_config: tool_config._Cpp, build_cache: BuildCache, *, toolchain: str
+    ) -> None:
+        super().__init__(cpp_config, build_cache)
+        self.toolchain = toolchain
+        self.profile = f"{SolverCpp.profile}-{toolchain}"
+        self._apply_override(self.cpp_config.toolchains[toolchain])
+
+
+class CheckerCpp(Cpp):
+    profile = "checker-cpp"
+
+    def __init__(self, cpp_config: tool_config._Cpp, build_cache: BuildCache) -> None:
+        super().__init__(cpp_config, build_cache)
+        self._apply_override(self.cpp_config.checker)
+
+
+class VerifierCpp(Cpp):
+    profile = "verifier-cpp"
+
+    def __init__(self, cpp_config: tool_config._Cpp, build_cache: BuildCache) -> None:
+        super().__init__(cpp_config, build_cache)
+        self._apply_override(self.cpp_config.verifier)
+
+
+class GeneratorCpp(Cpp):
+    profile = "generator-cpp"
+
+    def __init__(self, cpp_config: tool_config._Cpp, build_cache: BuildCache) -> None:
+        super().__init__(cpp_config, build_cache)
+        self._apply_override(self.cpp_config.generator)
+
+
+class SanitizerCpp(Cpp):
+    profile = "sanitizer-cpp"
+
+    def __init__(self, cpp_config: tool_config._Cpp, build_cache: BuildCache) -> None:
+        super().__init__(cpp_config, build_cache)
+        self._apply_override(self.cpp_config.sanitizer)
+
+
+_ROLE_LANGUAGES: dict[Role, type[Cpp]] = {
+    "solver": SolverCpp,
+    "checker": CheckerCpp,
+    "verifier": VerifierCpp,
+    "generator": GeneratorCpp,
+    "sanitizer": SanitizerCpp,
+}
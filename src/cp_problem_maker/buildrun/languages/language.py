@@ -1,8 +1,43 @@
 import abc
+import functools
+import importlib
+import importlib.metadata
 from pathlib import Path
+from typing import ClassVar, Literal, Self
 
 from pydantic import BaseModel
 
+from cp_problem_maker.buildrun.languages.build_cache import BuildCache
+from cp_problem_maker.config import tool_config
+
+Role = Literal["solver", "checker", "verifier", "generator", "sanitizer"]
+
+ENTRY_POINT_GROUP = "cp_problem_maker.languages"
+"""Entry point group of the language plugins.
+
+The name of an entry point is a file extension (e.g. `.rs`), and its value is
+the `ILanguage` subclass for the extension (e.g. `my_plugin.rust:Rust`).
+"""
+
+_BUILTIN_LANGUAGES: dict[str, str] = {
+    ".cpp": "cp_problem_maker.buildrun.languages.cpp:Cpp",
+    ".cc": "cp_problem_maker.buildrun.languages.cpp:Cpp",
+    ".cxx": "cp_problem_maker.buildrun.languages.cpp:Cpp",
+    ".c++": "cp_problem_maker.buildrun.languages.cpp:Cpp",
+    ".py": "cp_problem_maker.buildrun.languages.python:Python",
+    ".txt": "cp_problem_maker.buildrun.languages.text_cat:TextCat",
+    ".in": "cp_problem_maker.buildrun.languages.text_cat:TextCat",
+}
+"""Built-in languages, which are imported when a file of the language is first seen"""
+
+
+@functools.cache
+def _language_targets() -> dict[str, str]:
+    targets = dict(_BUILTIN_LANGUAGES)
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        targets.setdefault(entry_point.name, entry_point.value)
+    return targets
+
 
 class CompileResult(BaseModel):
     language: "type[ILanguage]"
@@ -11,7 +46,26 @@ class CompileResult(BaseModel):
     """Command to execute the compiled file"""
 
 
+class CompileError(Exception):
+    def __init__(self, file_path: Path, *, cmd: list[str], stderr: str) -> None:
+        super().__init__(f"Failed to compile {file_path}:\n{stderr}")
+        self.file_path = file_path
+        self.cmd = cmd
+        self.stderr = stderr
+
+
 class ILanguage(metaclass=abc.ABCMeta):
+    _extension_index: ClassVar[dict[str, "type[ILanguage]"]] = {}
+    """Language of each extension. Filled when a language class is defined."""
+
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
+        # Subclasses of a language are its build profiles, not new languages
+        if ILanguage not in cls.__bases__:
+            return
+        for extension in cls.get_extensions():
+            ILanguage._extension_index.setdefault(extension, cls)
+
     @classmethod
     @abc.abstractmethod
     def get_name(cls) -> str:
@@ -32,9 +86,69 @@ class ILanguage(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def from_config(
+        cls, config: tool_config._Language, *, build_cache: BuildCache
+    ) -> Self:
+        """Create the language from the configuration
+
+        Languages that take no configuration do not need to override this.
+
+        Args:
+            config (tool_config._Language): Language configuration
+            build_cache (BuildCache): Cache to store the build artifacts in
+        Returns:
+            Self: Language
+        """
+        return cls()
+
+    @classmethod
+    def for_role(cls, role: Role) -> "type[ILanguage]":
+        """Get the language class used to build a file of the role
+
+        Languages that use the same build for every role do not need to override this.
+
+        Args:
+            role (Role): Role of the file in the problem
+        Returns:
+            type[ILanguage]: The class itself or its subclass
+        """
+        return cls
+
+    @classmethod
+    def has_sanitizer(cls) -> bool:
+        """Whether the language has a sanitizer build for the "sanitizer" role
+
+        Languages without sanitizers do not need to override this.
+
+        Returns:
+            bool: True if `for_role("sanitizer")` builds with sanitizers
+        """
+        return False
+
+    @classmethod
+    def solver_toolchains(
+        cls, config: tool_config._Language, *, build_cache: BuildCache
+    ) -> "dict[str, ILanguage]":
+        """Create the configured toolchain variants of the solver build
+
+        Languages without toolchain variants do not need to override this.
+
+        Args:
+            config (tool_config._Language): Language configuration
+            build_cache (BuildCache): Cache to store the build artifacts in
+        Returns:
+            dict[str, ILanguage]: Languages keyed by the toolchain names
+        """
+        return {}
+
     @abc.abstractmethod
     def compile(self, file_path: Path) -> CompileResult:
-        """Compile the file"""
+        """Compile the file
+
+        Raises:
+            CompileError: If the compilation fails
+        """
         raise NotImplementedError()
 
     @staticmethod
@@ -48,8 +162,14 @@ class ILanguage(metaclass=abc.ABCMeta):
         Raises:
             ValueError: If the language is not supported
         """
-        for language in ILanguage.__subclasses__():
-            if file_path.suffix in language.get_extensions():
-                return language
-        else:
-            raise ValueError(f"Unsupported language for file {file_path}")
+        extension = file_path.suffix
+        if extension not in ILanguage._extension_index:
+            target = _language_targets().get(extension)
+            if target is not None:
+                # Importing the module defines the class, which indexes itself
+                module_name, _, class_name = target.partition(":")
+                getattr(importlib.import_module(module_name), class_name)
+        try:
+            return ILanguage._extension_index[extension]
+        except KeyError:
+            raise ValueError(f"Unsupported language for file {file_path}") from None
@@ -1,7 +1,45 @@
+import subprocess
+import threading
 from pathlib import Path
+from typing import Self
 
-from cp_problem_maker.buildrun.languages.language import CompileResult, ILanguage
+from cp_problem_maker.buildrun.languages.build_cache import (
+    BuildCache,
+    executable_identity,
+    hash_bytes,
+)
+from cp_problem_maker.buildrun.languages.language import CompileResult, ILanguage, Role
+from cp_problem_maker.buildrun.runners import fork_server
 from cp_problem_maker.config import tool_config
+from cp_problem_maker.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+_BYTE_COMPILE_CODE = """\
+import py_compile, sys
+py_compile.compile(sys.argv[1], cfile=sys.argv[2], dfile=sys.argv[1], doraise=True)
+"""
+"""Byte-compile `argv[1]` into `argv[2]` in the interpreter that runs the result"""
+
+_PYC_LOADER_CODE = """\
+import marshal, sys, types
+with open(sys.argv[1], "rb") as f:
+    f.seek(16)
+    code = marshal.load(f)
+sys.argv[:3] = [sys.argv[2]]
+if not sys.flags.safe_path:
+    sys.path[0] = sys.argv[0].rpartition("/")[0]
+main = types.ModuleType("__main__")
+main.__file__ = sys.argv[0]
+main.__builtins__ = __builtins__
+sys.modules["__main__"] = main
+exec(code, main.__dict__)
+"""
+"""Run the bytecode file `argv[1]` as if the source file `argv[2]` is run.
+
+The solution runs in a fresh `__main__` module,
+so that the names used by the loader are not visible to it.
+"""
 
 
 class Python(ILanguage):
@@ -17,8 +55,117 @@ class Python(ILanguage):
     def get_extensions(cls) -> list[str]:
         return [".py"]
 
+    @classmethod
+    def from_config(
+        cls, config: tool_config._Language, *, build_cache: BuildCache
+    ) -> Self:
+        return cls(config.python)
+
+    @classmethod
+    def for_role(cls, role: Role) -> type[ILanguage]:
+        if role == "solver":
+            return SolverPython
+        if role in ("checker", "verifier", "generator"):
+            return ToolPython
+        return Python
+
+    def _interpreter(self) -> list[str]:
+        return [self.python_config.python, *self.python_config.flags]
+
     def compile(self, file_path: Path) -> CompileResult:
         return CompileResult(
             language=Python,
-            exec_cmd=[self.python_config.python, str(file_path.resolve())],
+            exec_cmd=[*self._interpreter(), str(file_path.resolve())],
         )
+
+
+class SolverPython(Python):
+    """Python for solutions
+
+    The solutions are byte-compiled ahead of time,
+    so that parsing the source is not included in the execution time.
+    """
+
+    profile = "solver-python"
+    """Name of the build profile"""
+
+    def __init__(
+        self, python_config: tool_config._Python, build_cache: BuildCache
+    ) -> None:
+        super().__init__(python_config)
+        self.build_cache = build_cache
+        # Cache the compilation result
+        self.compile_cache: dict[Path, CompileResult] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: tool_config._Language, *, build_cache: BuildCache
+    ) -> Self:
+        return cls(config.python, build_cache)
+
+    def _byte_compile(self, file_path: Path, source_key: str) -> Path | None:
+        with self.build_cache.staging_dir(self.profile) as staging_dir:
+            pyc_file = staging_dir / f"{file_path.stem}.pyc"
+            cmd = [
+                *self._interpreter(),
+                "-c",
+                _BYTE_COMPILE_CODE,
+                str(file_path),
+                str(pyc_file),
+            ]
+            logger.info("Compiling %s (profile: %s)", file_path.name, self.profile)
+            logger.debug("Running command: %s", cmd)
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                # Run the source as it is, so that the error is reported as a RE
+                logger.warning("Failed to byte-compile %s:\n%s", file_path, proc.stderr)
+                return None
+            return self.build_cache.store(
+                self.profile, source_key, artifact=pyc_file, deps=[file_path]
+            )
+
+    def compile(self, file_path: Path) -> CompileResult:
+        file_path = file_path.resolve()
+        with self._lock:
+            if file_path in self.compile_cache:
+                return self.compile_cache[file_path]
+
+            interpreter = self._interpreter()
+            # The bytecode depends on the interpreter and flags such as -O
+            source_key = hash_bytes(
+                executable_identity(self.python_config.python).encode(),
+                "\0".join(self.python_config.flags).encode(),
+                file_path.read_bytes(),
+            )
+            pyc_file = self.build_cache.lookup(self.profile, source_key)
+            if pyc_file is None:
+                pyc_file = self._byte_compile(file_path, source_key)
+            if pyc_file is None:
+                result = super().compile(file_path)
+            else:
+                result = CompileResult(
+                    language=Python,
+                    exec_cmd=[
+                        *interpreter,
+                        "-c",
+                        _PYC_LOADER_CODE,
+                        str(pyc_file),
+                        str(file_path),
+                    ],
+                )
+            self.compile_cache[file_path] = result
+            return result
+
+
+class ToolPython(Python):
+    """Python for the untimed tools, i.e. checkers, verifiers and generators
+
+    If the fork server is enabled, the tools are run on it.
+    """
+
+    def compile(self, file_path: Path) -> CompileResult:
+        if not self.python_config.fork_server:
+            return super().compile(file_path)
+        server = fork_server.get_server(self._interpreter(), file_path.resolve())
+        return CompileResult(language=Python, exec_cmd=server.command())
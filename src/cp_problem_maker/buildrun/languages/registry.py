@@ -1,22 +1,38 @@
+import threading
 from pathlib import Path
 from typing import overload
 
-from cp_problem_maker.buildrun.languages.cpp import Cpp, SolverCpp
-from cp_problem_maker.buildrun.languages.language import ILanguage
-from cp_problem_maker.buildrun.languages.python import Python
-from cp_problem_maker.buildrun.languages.text_cat import TextCat
+from cp_problem_maker.buildrun.languages.build_cache import BuildCache
+from cp_problem_maker.buildrun.languages.language import ILanguage, Role
 from cp_problem_maker.config import tool_config
 
+__all__ = ["LanguageRegistry", "Role"]
+
 
 class LanguageRegistry:
+    """Instances of the languages configured by the loaded configuration
+
+    A language is instantiated when it is first requested.
+    """
+
+    _config: tool_config._Language | None = None
+    _build_cache: BuildCache | None = None
     _instances: dict[type[ILanguage], ILanguage] = {}
+    _toolchains: dict[type[ILanguage], dict[str, ILanguage]] = {}
+    _lock = threading.Lock()
 
     @staticmethod
     def load_config(config: tool_config._Language) -> None:
-        LanguageRegistry._instances[Cpp] = Cpp(config.cpp)
-        LanguageRegistry._instances[SolverCpp] = SolverCpp(config.cpp)
-        LanguageRegistry._instances[Python] = Python(config.python)
-        LanguageRegistry._instances[TextCat] = TextCat()
+        build_cache = BuildCache(
+            Path(config.cache.path).expanduser(),
+            max_size_mb=config.cache.max_size_mb,
+            profile_max_size_mb=config.cache.profile_max_size_mb,
+        )
+        with LanguageRegistry._lock:
+            LanguageRegistry._config = config.model_copy(deep=True)
+            LanguageRegistry._build_cache = build_cache
+            LanguageRegistry._instances = {}
+            LanguageRegistry._toolchains = {}
 
     @overload
     @staticmethod
@@ -30,4 +46,54 @@ class LanguageRegistry:
     def get_languege(obj: type[ILanguage] | Path) -> ILanguage:
         if isinstance(obj, Path):
             obj = ILanguage.detect_language(obj)
-        return LanguageRegistry._instances[obj]
+        with LanguageRegistry._lock:
+            instance = LanguageRegistry._instances.get(obj)
+            if instance is None:
+                config, build_cache = LanguageRegistry._loaded_config()
+                instance = obj.from_config(config, build_cache=build_cache)
+                LanguageRegistry._instances[obj] = instance
+            return instance
+
+    @staticmethod
+    def _loaded_config() -> tuple[tool_config._Language, BuildCache]:
+        config = LanguageRegistry._config
+        build_cache = LanguageRegistry._build_cache
+        if config is None or build_cache is None:
+            raise RuntimeError("The language configuration is not loaded")
+        return config, build_cache
+
+    @staticmethod
+    def get_build_cache() -> BuildCache:
+        _, build_cache = LanguageRegistry._loaded_config()
+        return build_cache
+
+    @staticmethod
+    def get_toolchains(file_path: Path) -> dict[str, ILanguage]:
+        """Get the toolchain variants to build the solution with
+
+        Args:
+            file_path (Path): Path to the solution
+        Returns:
+            dict[str, ILanguage]: Languages keyed by the toolchain names
+        """
+        language_type = ILanguage.detect_language(file_path)
+        with LanguageRegistry._lock:
+            if language_type not in LanguageRegistry._toolchains:
+                config, build_cache = LanguageRegistry._loaded_config()
+                LanguageRegistry._toolchains[language_type] = (
+                    language_type.solver_toolchains(config, build_cache=build_cache)
+                )
+            return LanguageRegistry._toolchains[language_type]
+
+    @staticmethod
+    def get_languege_for_role(file_path: Path, role: Role) -> ILanguage:
+        """Get the language to build the file for the role
+
+        Args:
+            file_path (Path): Path to the file
+            role (Role): Role of the file in the problem
+        Returns:
+            ILanguage: Language with the build profile of the role
+        """
+        language_type = ILanguage.detect_language(file_path)
+        return LanguageRegistry.get_languege(language_type.for_role(role))
@@ -0,0 +1,163 @@
+"""Fork server for Python tool scripts.
+
+Usage: python _fork_server_main.py <socket path> <script path>
+
+The server imports the top-level imports of the script once, and then forks
+a child per request that runs the script with the requested argv and stdio.
+This file is executed by the configured Python interpreter, which may not
+have cp_problem_maker installed, so it must depend only on the standard library.
+
+Protocol (one connection per run):
+    client -> server: JSON {"args": [...], "cwd": str, "memory_limit": int | null}
+                      with the file descriptors of stdin, stdout and stderr
+    server -> client: "<pid>\n" once the child is forked,
+                      "<exit code>\n" once the child exits
+"""
+
+import ast
+import importlib
+import json
+import os
+import resource
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import traceback
+from pathlib import Path
+from typing import Any
+
+_MAX_MESSAGE_SIZE = 1 << 20
+_PARENT_CHECK_INTERVAL = 1.0
+
+
+def _preload(script: Path) -> None:
+    tree = ast.parse(script.read_bytes(), filename=script)
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except BaseException:
+                # The child reports the error when it runs the script
+                pass
+
+
+def _run_child(script: Path, request: dict[str, Any], fds: list[int]) -> int:
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+    for fd in fds:
+        if fd > 2:
+            os.close(fd)
+    os.chdir(request["cwd"])
+    memory_limit = request["memory_limit"]
+    if memory_limit is not None:
+        max_memory_bytes = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+    sys.argv = [str(script), *request["args"]]
+    try:
+        runpy.run_path(str(script), run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _fork(script: Path, conn: socket.socket, cleanup: list[int]) -> int | None:
+    try:
+        data, fds, _, _ = socket.recv_fds(conn, _MAX_MESSAGE_SIZE, 3)
+        request = json.loads(data)
+    except (OSError, ValueError):
+        conn.close()
+        return None
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            for fd in cleanup:
+                os.close(fd)
+            conn.close()
+            code = _run_child(script, request, fds)
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+    for fd in fds:
+        os.close(fd)
+    conn.sendall(f"{pid}\n".encode())
+    return pid
+
+
+def main() -> None:
+    socket_path, script = Path(sys.argv[1]), Path(sys.argv[2]).resolve()
+    parent_pid = os.getppid()
+    sys.path.insert(0, str(script.parent))
+    _preload(script)
+
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    tmp_socket_path = socket_path.with_suffix(".tmp")
+    listener.bind(str(tmp_socket_path))
+    listener.listen(64)
+    # The client waits for the socket path to appear
+    tmp_socket_path.rename(socket_path)
+
+    cleanup = [listener.fileno(), wakeup_r, wakeup_w]
+    children: dict[int, socket.socket] = {}
+    with selectors.DefaultSelector() as selector:
+        selector.register(listener, selectors.EVENT_READ)
+        selector.register(wakeup_r, selectors.EVENT_READ)
+        while os.getppid() == parent_pid:
+            for key, _ in selector.select(timeout=_PARENT_CHECK_INTERVAL):
+                if key.fileobj is listener:
+                    conn, _ = listener.accept()
+                    pid = _fork(script, conn, cleanup)
+                    if pid is not None:
+                        children[pid] = conn
+                else:
+                    try:
+                        while os.read(wakeup_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+            while children:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                conn = children.pop(pid)
+                try:
+                    conn.sendall(f"{os.waitstatus_to_exitcode(status)}\n".encode())
+                except OSError:
+                    pass
+                conn.close()
+
+
+if __name__ == "__main__":
+    main()
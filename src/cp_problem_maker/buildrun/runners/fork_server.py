@@ -0,0 +1,322 @@
+import atexit
+import json
+import locale
+import os
+import selectors
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+
+from cp_problem_maker.logging.setup import get_logger
+
+logger = get_logger(__name__)
+
+_SERVER_MAIN = Path(__file__).with_name("_fork_server_main.py")
+_SCHEME = "fork-server:"
+"""Prefix of the pseudo executable in the commands run on a fork server"""
+_STARTUP_TIMEOUT = 30.0
+"""Timeout for the server to preload the imports of the script in seconds"""
+
+
+class ForkServerError(Exception):
+    pass
+
+
+class ForkedProcess:
+    """Process forked by a fork server
+
+    It implements the subset of `subprocess.Popen` used by `runner.run`.
+    The stdout and the stderr are captured, and decoded as text.
+    """
+
+    def __init__(
+        self, args: list[str], conn: socket.socket, stdout_fd: int, stderr_fd: int
+    ) -> None:
+        self.args = args
+        self.returncode: int | None = None
+        self._conn = conn
+        self._stdout_fd = stdout_fd
+        self._stderr_fd = stderr_fd
+        self._buffers: dict[int, bytearray] = {
+            stdout_fd: bytearray(),
+            stderr_fd: bytearray(),
+            conn.fileno(): bytearray(),
+        }
+        self.pid = int(self._read_line())
+
+    def _read_line(self) -> bytes:
+        buffer = self._buffers[self._conn.fileno()]
+        while b"\n" not in buffer:
+            chunk = self._conn.recv(4096)
+            if not chunk:
+                raise ForkServerError("The fork server closed the connection")
+            buffer += chunk
+        line, _, rest = bytes(buffer).partition(b"\n")
+        buffer[:] = rest
+        return line
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+    def kill(self) -> None:
+        if self.returncode is not None:
+            return
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def _decode(data: bytearray) -> str:
+        # Same as the universal newlines mode of `subprocess.Popen`
+        text = data.decode(locale.getpreferredencoding(False))
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def communicate(self, timeout: float | None = None) -> tuple[str, str]:
+        """Wait for the process to exit, and read its stdout and stderr
+
+        Args:
+            timeout (float | None): Timeout in seconds
+        Returns:
+            tuple[str, str]: stdout and stderr
+        Raises:
+            subprocess.TimeoutExpired: If the process does not exit in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        conn_fd = self._conn.fileno()
+        with selectors.DefaultSelector() as selector:
+            for fd in self._buffers:
+                selector.register(fd, selectors.EVENT_READ)
+            open_fds = set(self._buffers)
+            while open_fds:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        assert timeout is not None
+                        raise subprocess.TimeoutExpired(self.args, timeout)
+                for key, _ in selector.select(remaining):
+                    fd = int(key.fd)
+                    chunk = os.read(fd, 65536)
+                    if chunk:
+                        self._buffers[fd] += chunk
+                    else:
+                        selector.unregister(fd)
+                        open_fds.remove(fd)
+        status = bytes(self._buffers[conn_fd]).strip()
+        if not status:
+            raise ForkServerError("The fork server closed the connection")
+        self.returncode = int(status)
+        return (
+            self._decode(self._buffers[self._stdout_fd]),
+            self._decode(self._buffers[self._stderr_fd]),
+        )
+
+    def __enter__(self) -> "ForkedProcess":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        # Do not leave the process running, e.g. on KeyboardInterrupt
+        self.kill()
+        os.close(self._stdout_fd)
+        os.close(self._stderr_fd)
+        self._conn.close()
+
+
+class ForkServer:
+    """Long-lived Python process that forks a child per run of a script
+
+    The server imports the top-level imports of the script once,
+    so that the runs do not pay for importing them.
+    It is started on the first run.
+    """
+
+    def __init__(self, python: list[str], script: Path) -> None:
+        self.python = python
+        self.script = script
+        self._tmp_dir = Path(tempfile.mkdtemp(prefix="cp_problem_maker-fork-server-"))
+        self.socket_path = self._tmp_dir / "server.sock"
+        self._process: subprocess.Popen[bytes] | None = None
+        self._start_error: ForkServerError | None = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        cmd = [*self.python, str(_SERVER_MAIN), str(self.socket_path), str(self.script)]
+        logger.debug("Starting the fork server: %s", cmd)
+        try:
+            # A new session keeps the server alive on Ctrl+C,
+            # so that the forked processes are always killed by us.
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            raise ForkServerError(f"Failed to start the fork server: {e}") from e
+        deadline = time.monotonic() + _STARTUP_TIMEOUT
+        while not self.socket_path.exists():
+            if self._process.poll() is not None:
+                raise ForkServerError(
+                    f"The fork server exited with code {self._process.returncode}"
+                )
+            if time.monotonic() > deadline:
+                raise ForkServerError("The fork server did not start in time")
+            time.sleep(0.01)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._start_error is not None:
+                raise self._start_error
+            if self._process is not None:
+                return
+            try:
+                self._start()
+            except ForkServerError as e:
+                self._start_error = e
+                self.close()
+                raise
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def command(self) -> list[str]:
+        """Command to run the script on the server
+
+        The command can be run by `runner.run` like a usual command.
+
+        Returns:
+            list[str]: Command to run the script
+        """
+        return [f"{_SCHEME}{self.socket_path}", str(self.script)]
+
+    def spawn(
+        self, args: list[str], *, stdin: int, memory_limit: int | None
+    ) -> ForkedProcess:
+        """Run the script with the arguments on the server
+
+        Args:
+            args (list[str]): Arguments passed to the script
+            stdin (int): File descriptor for the standard input
+            memory_limit (int | None): Memory limit in MiB
+        Returns:
+            ForkedProcess: Forked process
+        Raises:
+            ForkServerError: If the server is not available
+        """
+        self._ensure_started()
+        request = json.dumps(
+            {"args": args, "cwd": str(Path.cwd()), "memory_limit": memory_limit}
+        ).encode()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(str(self.socket_path))
+            socket.send_fds(conn, [request], [stdin, stdout_w, stderr_w])
+            return ForkedProcess(
+                [*self.command(), *args], conn, stdout_fd=stdout_r, stderr_fd=stderr_r
+            )
+        except (OSError, ForkServerError, ValueError) as e:
+            conn.close()
+            os.close(stdout_r)
+            os.close(stderr_r)
+            raise ForkServerError(f"Failed to run {self.script}: {e}") from e
+        finally:
+            os.close(stdout_w)
+            os.close(stderr_w)
+
+
+_servers: dict[tuple[tuple[str, ...], Path], ForkServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_server(python: list[str], script: Path) -> ForkServer:
+    """Get the fork server for the script
+
+    Args:
+        python (list[str]): Python executable followed by the interpreter flags
+        script (Path): Resolved path to the script
+    Returns:
+        ForkServer: Fork server, which is started on the first run
+    """
+    with _servers_lock:
+        key = (tuple(python), script)
+        if key not in _servers:
+            _servers[key] = ForkServer(python, script)
+        return _servers[key]
+
+
+def _find_server(cmd: list[str]) -> ForkServer:
+    with _servers_lock:
+        for server in _servers.values():
+            if server.command()[0] == cmd[0]:
+                return server
+    raise ForkServerError(f"No fork server for {cmd[0]}")
+
+
+def is_forked_command(cmd: list[str]) -> bool:
+    """Whether the command runs on a fork server
+
+    Args:
+        cmd (list[str]): Command
+    Returns:
+        bool: True if the command is created by `ForkServer.command`
+    """
+    return bool(cmd) and cmd[0].startswith(_SCHEME)
+
+
+def spawn(cmd: list[str], *, stdin: int, memory_limit: int | None) -> ForkedProcess:
+    """Run the command created by `ForkServer.command`
+
+    Args:
+        cmd (list[str]): Command followed by the arguments
+        stdin (int): File descriptor for the standard input
+        memory_limit (int | None): Memory limit in MiB
+    Returns:
+        ForkedProcess: Forked process
+    Raises:
+        ForkServerError: If the server is not available
+    """
+    server = _find_server(cmd)
+    if stdin == subprocess.DEVNULL:
+        stdin = os.open(os.devnull, os.O_RDONLY)
+        try:
+            return server.spawn(cmd[2:], stdin=stdin, memory_limit=memory_limit)
+        finally:
+            os.close(stdin)
+    return server.spawn(cmd[2:], stdin=stdin, memory_limit=memory_limit)
+
+
+def cold_command(cmd: list[str]) -> list[str]:
+    """Convert the command created by `ForkServer.command` to a usual command
+
+    Args:
+        cmd (list[str]): Command followed by the arguments
+    Returns:
+        list[str]: Command to run the script in a new interpreter
+    """
+    server = _find_server(cmd)
+    return [*server.python, *cmd[1:]]
+
+
+@atexit.register
+def _close_servers() -> None:
+    with _servers_lock:
+        for server in _servers.values():
+            server.close()
+        _servers.clear()
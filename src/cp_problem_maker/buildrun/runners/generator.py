@@ -11,6 +11,10 @@ class GeneratorParams(BaseModel):
 
     case_group: str = Field(..., description="Group of the test case")
     case_id: int = Field(..., description="ID of the test case in the group")
+    seed: int | None = Field(
+        None,
+        description="Seed of the test case. Derived from the group and the ID if omitted.",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         frozen=True,
@@ -31,6 +35,19 @@ class ITestcaseGenerator(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def seed(cls, *, generator_params: GeneratorParams) -> int:
+        """Seed passed to the generator
+
+        Args:
+            generator_params (GeneratorParams): Parameters for generating test cases
+        Returns:
+            int: Seed in the parameters, or the seed derived from the test case
+        """
+        if generator_params.seed is not None:
+            return generator_params.seed
+        return cls._random_seed(generator_params=generator_params)
+
     @classmethod
     @abc.abstractmethod
     def _generator_cmd(
@@ -90,7 +107,7 @@ class SourceTestcaseGenerator(ITestcaseGenerator):
     ) -> list[str]:
         return cmd + [
             str(generator_params.case_id),
-            str(cls._random_seed(generator_params=generator_params)),
+            str(cls.seed(generator_params=generator_params)),
         ]
 
     @classmethod
@@ -0,0 +1,300 @@
+"""Forwarding of the messages between an interactive judge and a solver
+
+When the messages are counted, each side writes to a pipe of a `Channel`,
+whose data a `Forwarder` moves to the pipe read by the other side.
+A message is a line. Counting the chunks moved instead would depend on how the
+programs buffer their output, e.g. Python may write a line and its newline
+by separate system calls.
+
+A `Transcript` records the last lines in a ring buffer with their timestamps.
+The channels only append to it, and the file is written after the run.
+"""
+
+import gzip
+import os
+import select
+import time
+from collections import deque
+from pathlib import Path
+from threading import Thread
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
+
+_CHUNK_SIZE = 1 << 20
+"""Maximum number of bytes moved at once"""
+
+
+class ChannelStats(BaseModel):
+    messages: int
+    """Number of lines moved"""
+    bytes: int
+    """Number of bytes moved"""
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+class InteractionStats(BaseModel):
+    to_solver: ChannelStats
+    """Messages from the judge to the solver"""
+    to_judge: ChannelStats
+    """Messages from the solver to the judge"""
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+Direction = Literal[">", "<"]
+TO_SOLVER: Direction = ">"
+TO_JUDGE: Direction = "<"
+
+_MAX_LINE_BYTES = 256
+"""Bytes recorded per line in a transcript. The rest is only counted."""
+
+
+class Transcript:
+    """Last lines exchanged between the judge and the solver, with timestamps
+
+    The memory is bounded by `max_lines` lines of `max_line_bytes` bytes.
+    """
+
+    def __init__(self, max_lines: int, *, max_line_bytes: int = _MAX_LINE_BYTES):
+        """
+        Args:
+            max_lines (int): Number of the last lines to keep
+            max_line_bytes (int): Bytes to keep per line
+        """
+        if max_lines <= 0:
+            raise ValueError("Number of lines must be positive")
+        self.max_lines = max_lines
+        self.max_line_bytes = max_line_bytes
+        self.start_time = time.perf_counter()
+        self._lines: deque[tuple[float, Direction, bytes, int]] = deque(
+            maxlen=max_lines
+        )
+        """Time, direction, head and length of each line"""
+        self._partial: dict[Direction, tuple[float, bytes, int]] = {}
+        """Time, head and length of the line being sent in each direction"""
+        self._counts: dict[Direction, int] = {TO_SOLVER: 0, TO_JUDGE: 0}
+
+    def record(self, direction: Direction, data: bytes) -> None:
+        """Record the data sent in a direction
+
+        Only the lines that stay in the ring buffer are split out of the data,
+        so a large chunk costs a scan in C.
+
+        Args:
+            direction (Direction): Direction of the data
+            data (bytes): Data read from the sender
+        """
+        elapsed_time = time.perf_counter() - self.start_time
+        _, head, length = self._partial.pop(direction, (0.0, b"", 0))
+        n_lines = data.count(b"\n")
+        if n_lines == 0:
+            self._partial[direction] = (
+                elapsed_time,
+                *self._extend(head, length, data),
+            )
+            return
+        self._counts[direction] += n_lines
+        n_kept = min(n_lines, self.max_lines)
+        *lines, rest = data.rsplit(b"\n", n_kept)
+        if n_kept < n_lines:
+            # The first part holds the lines pushed out of the buffer
+            # by the others, followed by the first line kept
+            head, length = b"", 0
+            lines[0] = lines[0][lines[0].rfind(b"\n") + 1 :]
+        for line in lines:
+            head, length = self._extend(head, length, line)
+            self._lines.append((elapsed_time, direction, head, length))
+            head, length = b"", 0
+        if rest:
+            self._partial[direction] = (elapsed_time, *self._extend(b"", 0, rest))
+
+    def _extend(self, head: bytes, length: int, data: bytes) -> tuple[bytes, int]:
+        if len(head) < self.max_line_bytes:
+            head += data[: self.max_line_bytes - len(head)]
+        return head, length + len(data)
+
+    def format(self) -> str:
+        """Format the transcript, one line per message
+
+        Returns:
+            str: Lines of "<time in ms> <direction> <message>", where the
+                direction is ">" from the judge to the solver and "<" back
+        """
+        lines = list(self._lines)
+        for direction, (line_time, head, length) in list(self._partial.items()):
+            # Lines without a newline at the end of the run
+            lines.append((line_time, direction, head, length))
+        # The channels record after forwarding, so a reply may be recorded
+        # before its query, but it is always read later
+        lines.sort(key=lambda line: line[0])
+        n_lines = sum(self._counts.values())
+        header = f"# {len(self._lines)} of {n_lines} lines."
+        header += " > is from the judge to the solver, < is back.\n"
+        body = []
+        for line_time, direction, head, length in lines:
+            text = head.decode(errors="backslashreplace")
+            if length > len(head):
+                text += f" ... ({length} bytes)"
+            body.append(f"{line_time * 1000:12.3f} {direction} {text}\n")
+        return header + "".join(body)
+
+    def save(self, transcript_file: Path) -> None:
+        """Write the transcript to a gzip file"""
+        transcript_file.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(transcript_file, "wt") as f:
+            f.write(self.format())
+
+
+class Channel:
+    """Data moved from a pipe to another in a direction, until the writer closes it
+
+    Both pipes are closed when the channel ends, so that the reader sees EOF
+    and the writer sees a broken pipe in the same way as a direct pipe.
+    """
+
+    def __init__(
+        self,
+        src: int,
+        dst: int,
+        *,
+        direction: Direction,
+        transcript: Transcript | None = None,
+    ) -> None:
+        """
+        Args:
+            src (int): Read end of the pipe the sender writes to
+            dst (int): Write end of the pipe the receiver reads from
+            direction (Direction): Direction of the channel
+            transcript (Transcript | None): Transcript to record the data in
+        """
+        self.src = src
+        self.dst = dst
+        self.direction = direction
+        self.transcript = transcript
+        self.messages = 0
+        self.bytes = 0
+        self.pending = memoryview(b"")
+        """Data read but not written yet, when the receiver is slow to read"""
+
+    def account(self, data: bytes) -> None:
+        self.messages += data.count(b"\n")
+        self.bytes += len(data)
+        if self.transcript is not None:
+            self.transcript.record(self.direction, data)
+
+    def close(self) -> None:
+        os.close(self.src)
+        os.close(self.dst)
+
+    def stats(self) -> ChannelStats:
+        return ChannelStats(messages=self.messages, bytes=self.bytes)
+
+
+class Forwarder(Thread):
+    """Forwards the channels of both directions by a single polling loop
+
+    A round trip wakes up only this thread, rather than handing the GIL over
+    between a thread per direction. The loop polls by `select.epoll`, or
+    `select.poll` where it is not available, rather than by `selectors`,
+    whose bookkeeping costs more than the system calls for small messages.
+    The data is read and written back rather than duplicated by `tee(2)`,
+    which needs the data read out anyway to count it, and costs more through
+    `ctypes` than a copy of a message. A channel waits for its receiver to
+    read before it reads more from its sender, so the pipes keep their
+    backpressure.
+    """
+
+    def __init__(self, channels: list[Channel]) -> None:
+        super().__init__(daemon=True)
+        self.channels = channels
+        self._poller: select.epoll | select.poll = (
+            select.epoll() if hasattr(select, "epoll") else select.poll()
+        )
+        self._readers: dict[int, Channel] = {}
+        """Channels waiting for their senders to write, by the read ends"""
+        self._writers: dict[int, Channel] = {}
+        """Channels waiting for their receivers to read, by the write ends"""
+
+    def run(self) -> None:
+        try:
+            for channel in self.channels:
+                os.set_blocking(channel.src, False)
+                os.set_blocking(channel.dst, False)
+                self._poller.register(channel.src, select.POLLIN)
+                self._readers[channel.src] = channel
+            while self._readers or self._writers:
+                for fd, _ in self._poller.poll():
+                    if fd in self._readers:
+                        self._forward(self._readers[fd])
+                    elif fd in self._writers:
+                        self._drain(self._writers[fd])
+        finally:
+            for channel in [*self._readers.values(), *self._writers.values()]:
+                channel.close()
+            if isinstance(self._poller, select.epoll):
+                self._poller.close()
+
+    def _forward(self, channel: Channel) -> None:
+        """Move the data the sender has written"""
+        data = os.read(channel.src, _CHUNK_SIZE)
+        if not data:
+            # The sender has closed the pipe
+            self._end(channel)
+            return
+        try:
+            written = os.write(channel.dst, data)
+        except BlockingIOError:
+            # The pipe of the receiver is full
+            written = 0
+        except BrokenPipeError:
+            # The receiver has exited
+            self._end(channel)
+            return
+        if written < len(data):
+            channel.pending = memoryview(data)[written:]
+            self._drain(channel)
+        # After forwarding, so that the receiver does not wait
+        channel.account(data)
+
+    def _drain(self, channel: Channel) -> None:
+        """Write the data read to the receiver as far as its pipe takes it
+
+        The channel waits for the receiver while any data is left, and for
+        the sender otherwise.
+        """
+        try:
+            while channel.pending:
+                written = os.write(channel.dst, channel.pending)
+                channel.pending = channel.pending[written:]
+        except BlockingIOError:
+            # The pipe of the receiver is full
+            pass
+        except BrokenPipeError:
+            # The receiver has exited
+            self._end(channel)
+            return
+        if channel.pending:
+            self._wait_on(channel, channel.dst, select.POLLOUT, self._writers)
+        else:
+            self._wait_on(channel, channel.src, select.POLLIN, self._readers)
+
+    def _wait_on(
+        self, channel: Channel, fd: int, event: int, waiting: dict[int, Channel]
+    ) -> None:
+        if fd in waiting:
+            return
+        self._unregister(channel)
+        self._poller.register(fd, event)
+        waiting[fd] = channel
+
+    def _unregister(self, channel: Channel) -> None:
+        if self._readers.pop(channel.src, None) is not None:
+            self._poller.unregister(channel.src)
+        if self._writers.pop(channel.dst, None) is not None:
+            self._poller.unregister(channel.dst)
+
+    def _end(self, channel: Channel) -> None:
+        self._unregister(channel)
+        channel.close()
@@ -1,22 +1,36 @@
+import fcntl
+import functools
 import os
 import resource
+import signal
 import subprocess
 import sys
 import time
 from io import BytesIO, TextIOWrapper
 from pathlib import Path
 from threading import Thread
-from typing import IO, Any, TextIO, TypedDict
+from typing import IO, Any, Callable, Literal, TextIO, TypedDict
 
 import psutil
 from pydantic import BaseModel, ConfigDict, Field
 
+from cp_problem_maker.buildrun.runners import fork_server
+from cp_problem_maker.buildrun.runners.interaction import (
+    TO_JUDGE,
+    TO_SOLVER,
+    Channel,
+    Forwarder,
+    InteractionStats,
+    Transcript,
+)
 from cp_problem_maker.logging.setup import get_logger
 
 logger = get_logger(__name__)
 
 FileDescriptor = int
 File = TextIO | BytesIO | TextIOWrapper | FileDescriptor
+StackLimit = int | Literal["unlimited"]
+"""Stack limit in MiB, or "unlimited"""
 
 
 class RunnerParams(BaseModel):
@@ -35,6 +49,10 @@ class RunnerParams(BaseModel):
     memory_limit: int | None = Field(
         None, description="Memory limit for the command in MiB"
     )
+    stack_limit: StackLimit | None = Field(
+        None,
+        description="Stack limit for the command. Not applied to the commands run on a fork server.",  # noqa: E501
+    )
     check_returncode: bool = Field(
         ...,
         description="Check the returncode of the command. If True, an exception is raised if the exit code is non-zero",  # noqa: E501
@@ -55,6 +73,12 @@ class RunResult(BaseModel):
     """Elapsed time in seconds"""
     used_memory_mb: float
     """Memory usage in MiB"""
+    cpu_time: float | None = None
+    """CPU time (user + system) of the solver in seconds. Set by interactive runs."""
+    judge_cpu_time: float | None = None
+    """CPU time (user + system) of the judge in seconds. Set by interactive runs."""
+    interaction: InteractionStats | None = None
+    """Messages between the judge and the solver. Set if they are counted."""
 
     model_config = ConfigDict(
         frozen=True,
@@ -83,23 +107,79 @@ def _limit_memory(max_memory_mb: int | None) -> None:
         ) from e
 
 
+@functools.cache
+def _stack_rlimit(stack_limit: StackLimit | None) -> int | None:
+    """Convert the stack limit to the soft limit of `RLIMIT_STACK`
+
+    The limit is clamped to the hard limit, which an unprivileged process
+    cannot raise.
+
+    Args:
+        stack_limit (StackLimit | None): Stack limit
+    Returns:
+        int | None: Soft limit in bytes, or None to keep the current limit
+    """
+    if stack_limit is None:
+        return None
+    if stack_limit == "unlimited":
+        soft_limit = resource.RLIM_INFINITY
+    elif stack_limit <= 0:
+        raise ValueError("Stack limit must be positive")
+    else:
+        soft_limit = stack_limit * 1024 * 1024
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_STACK)
+    if hard_limit != resource.RLIM_INFINITY and (
+        soft_limit == resource.RLIM_INFINITY or soft_limit > hard_limit
+    ):
+        logger.warning(
+            "Stack limit %s is clamped to the hard limit %d MiB",
+            stack_limit,
+            hard_limit // 1024 // 1024,
+        )
+        soft_limit = hard_limit
+    return soft_limit
+
+
+def _limit_resources(max_memory_mb: int | None, stack_rlimit: int | None) -> None:
+    """Limit the resources of the process. Called in the child process.
+
+    Args:
+        max_memory_mb (int | None): Maximum memory usage in MiB
+        stack_rlimit (int | None): Soft limit of the stack size in bytes
+    """
+    _limit_memory(max_memory_mb)
+    if stack_rlimit is not None:
+        _, hard_limit = resource.getrlimit(resource.RLIMIT_STACK)
+        resource.setrlimit(resource.RLIMIT_STACK, (stack_rlimit, hard_limit))
+
+
 class _MemoryUsageDict(TypedDict):
     rss: float
 
 
 def monitor_memory(
-    process: "subprocess.Popen[Any]", memory_usage_dict: _MemoryUsageDict
+    process: "subprocess.Popen[Any] | fork_server.ForkedProcess",
+    memory_usage_dict: _MemoryUsageDict,
+    is_running: Callable[[], bool] | None = None,
 ) -> None:
-    """Monitor the memory usage of a process."""
+    """Monitor the memory usage of a process.
+
+    Args:
+        process: Process to monitor
+        memory_usage_dict (_MemoryUsageDict): Dictionary to store the peak in
+        is_running (Callable[[], bool] | None): Function telling whether the
+            process is running. Defaults to `process.poll`, which reaps it.
+    """
+    if is_running is None:
+        is_running = lambda: process.poll() is None  # noqa: E731
     try:
         ps_process = psutil.Process(process.pid)
-        max_memory_usage = 0
-        while process.poll() is None:
+        while is_running():
             memory_info = ps_process.memory_info()
-            max_memory_usage = max(max_memory_usage, memory_info.rss)
+            memory_usage_dict["rss"] = max(memory_usage_dict["rss"], memory_info.rss)
             time.sleep(0.01)
-        memory_usage_dict["rss"] = max_memory_usage
     except psutil.NoSuchProcess:
+        # A forked process is reaped by the fork server, not by `poll`
         pass
 
 
@@ -121,11 +201,37 @@ def _dest(f: File) -> IO[Any]:
     return f
 
 
+def _start(
+    cmd: list[str], *, runner_params: RunnerParams
+) -> "subprocess.Popen[str] | fork_server.ForkedProcess":
+    if fork_server.is_forked_command(cmd):
+        stdin = runner_params.stdin
+        try:
+            return fork_server.spawn(
+                cmd,
+                stdin=stdin if isinstance(stdin, FileDescriptor) else stdin.fileno(),
+                memory_limit=runner_params.memory_limit,
+            )
+        except fork_server.ForkServerError as e:
+            logger.warning("Running without the fork server: %s", e)
+            cmd = fork_server.cold_command(cmd)
+    stack_rlimit = _stack_rlimit(runner_params.stack_limit)
+    return subprocess.Popen(
+        cmd,
+        stdin=runner_params.stdin,
+        preexec_fn=lambda: _limit_resources(runner_params.memory_limit, stack_rlimit),
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
 def run(cmd: list[str], *, runner_params: RunnerParams) -> RunResult:
     """Run the command
 
     Args:
-        cmd (list[str]): Command to run
+        cmd (list[str]): Command to run. It may be a command created by
+            `fork_server.ForkServer.command`.
         runner_params (RunnerParams): Parameter set for running the command
     Returns:
         str: Output of the command
@@ -133,14 +239,7 @@ def run(cmd: list[str], *, runner_params: RunnerParams) -> RunResult:
     logger.debug("Running command: %s", cmd)
     memory_usage_dict: _MemoryUsageDict = {"rss": 0}
     # Start the process
-    with subprocess.Popen(
-        cmd,
-        stdin=runner_params.stdin,
-        preexec_fn=lambda: _limit_memory(runner_params.memory_limit),
-        text=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    ) as process:
+    with _start(cmd, runner_params=runner_params) as process:
         memory_monitor = Thread(
             target=monitor_memory, args=(process, memory_usage_dict), daemon=True
         )
@@ -160,6 +259,7 @@ def run(cmd: list[str], *, runner_params: RunnerParams) -> RunResult:
             raise e
         end_time = time.perf_counter_ns()
         memory_monitor.join()
+        assert process.returncode is not None
 
         run_result = RunResult(
             stdout=stdout,
@@ -190,6 +290,9 @@ class InteractiveJudgeParams(BaseModel):
     memory_limit: int | None = Field(
         None, description="Memory limit for the command in MiB"
     )
+    stack_limit: StackLimit | None = Field(
+        None, description="Stack limit for the solver"
+    )
 
     judge_stderr: File = Field(
         default_factory=sys.stderr.fileno, description="Error stream for the command"
@@ -198,6 +301,27 @@ class InteractiveJudgeParams(BaseModel):
         1.0,
         description="Timeout for the judge in seconds after the solver finishes running",  # noqa: E501
     )
+    pipe_size_kb: int | None = Field(
+        None,
+        description="Capacity of the pipes between the judge and the solver in KiB. The system default is used if None.",  # noqa: E501
+    )
+    cpu_time_limit: bool = Field(
+        False,
+        description="Apply the timeout to the CPU time of the solver instead of its wall time, which includes the time waiting for the judge",  # noqa: E501
+    )
+    count_messages: bool = Field(
+        False,
+        description="Forward the messages through the runner to count them",
+    )
+    transcript: Transcript | None = Field(
+        None,
+        description="Transcript to record the messages in. They are forwarded through the runner if set.",  # noqa: E501
+    )
+    idleness_limit: float | None = Field(
+        None,
+        gt=0,
+        description="Stop the run if both the judge and the solver wait to read from each other for this many seconds. Not detected if None.",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         frozen=True,
@@ -206,14 +330,203 @@ class InteractiveJudgeParams(BaseModel):
     )
 
 
-class JudgeTimeoutExpired(subprocess.TimeoutExpired):
+def _set_pipe_size(fd: FileDescriptor, pipe_size_kb: int | None) -> None:
+    """Resize the pipe by `F_SETPIPE_SZ`, keeping the default if it fails
+
+    Args:
+        fd (FileDescriptor): Either end of the pipe
+        pipe_size_kb (int | None): Capacity of the pipe in KiB
+    """
+    if pipe_size_kb is None:
+        return
+    set_pipe_size: int | None = getattr(fcntl, "F_SETPIPE_SZ", None)
+    if set_pipe_size is None:
+        logger.warning("Resizing pipes is not supported on this platform")
+        return
+    try:
+        fcntl.fcntl(fd, set_pipe_size, pipe_size_kb * 1024)
+    except OSError as e:
+        # EPERM above /proc/sys/fs/pipe-max-size
+        logger.warning("Failed to resize the pipe to %d KiB: %s", pipe_size_kb, e)
+
+
+def _open_pipe(pipe_size_kb: int | None) -> tuple[FileDescriptor, FileDescriptor]:
+    read_fd, write_fd = os.pipe()
+    _set_pipe_size(read_fd, pipe_size_kb)
+    return read_fd, write_fd
+
+
+_CPU_TIME_WALL_FACTOR = 5
+"""With a limit on the CPU time, the wall time is limited to this many timeouts"""
+
+
+class _Reaper(Thread):
+    """Waits for a process by `os.wait4`, which also reports its resource usage
+
+    The process must not be waited for by anything else, including `poll`.
+    """
+
+    def __init__(self, process: "subprocess.Popen[Any]") -> None:
+        super().__init__(daemon=True)
+        self.process = process
+        self.cpu_time = 0.0
+        """CPU time (user + system) in seconds"""
+
+    def run(self) -> None:
+        _, status, rusage = os.wait4(self.process.pid, 0)
+        self.cpu_time = rusage.ru_utime + rusage.ru_stime
+        self.process.returncode = os.waitstatus_to_exitcode(status)
+
+    def wait(self, timeout: float | None) -> int:
+        self.join(timeout)
+        if self.is_alive():
+            assert timeout is not None
+            raise subprocess.TimeoutExpired(self.process.args, timeout)
+        assert self.process.returncode is not None
+        return self.process.returncode
+
+    def kill(self) -> None:
+        if self.is_alive():
+            # `Popen.kill` polls the process first, which would reap it behind
+            # `os.wait4`. The process is not reaped while the reaper is alive,
+            # so its PID is still its own.
+            try:
+                os.kill(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.join()
+
+
+_PROC_DIR = Path("/proc")
+
+_IDLENESS_POLL_INTERVAL = 0.05
+"""Interval in seconds to look for the judge and the solver waiting for each other"""
+
+_PIPE_READ_WCHANS = frozenset({"pipe_read", "anon_pipe_read", "pipe_wait"})
+"""Wait channels of a read from a pipe, which differ by the kernel version"""
+
+
+def _pipe_read_io(pid: int) -> tuple[int, int] | None:
+    """Look up a process sleeping on a read from a pipe in `/proc`
+
+    Only a process of a single thread is looked up, since `/proc/<pid>/stat`
+    and `/proc/<pid>/wchan` tell the state of the main thread alone, while
+    another thread may be computing.
+
+    Args:
+        pid (int): Process ID
+    Returns:
+        tuple[int, int] | None: Bytes read and written by the process so far
+            if it sleeps on a pipe read. None if it does not, e.g. it sleeps on
+            a write to a full pipe, it has several threads, or it cannot be
+            told, e.g. the process has exited or `/proc` is not mounted.
+    """
+    proc_dir = _PROC_DIR / str(pid)
+    try:
+        status = dict(
+            line.split(":", 1)
+            for line in (proc_dir / "status").read_text().splitlines()
+        )
+        if int(status["Threads"]) > 1:
+            return None
+        # The state follows the command name in parentheses, which may
+        # contain spaces
+        state = (proc_dir / "stat").read_text().rpartition(")")[2].split()[0]
+        wchan = (proc_dir / "wchan").read_text().strip()
+        if state != "S" or wchan not in _PIPE_READ_WCHANS:
+            return None
+        io = dict(
+            line.split(": ") for line in (proc_dir / "io").read_text().splitlines()
+        )
+        return int(io["rchar"]), int(io["wchar"])
+    except (OSError, IndexError, KeyError, ValueError):
+        return None
+
+
+class _IdlenessWatch:
+    """Tells whether processes have waited for each other to write for long
+
+    The processes are idle while every one of them sleeps on a pipe read, and
+    none of them reads or writes a byte. A message in flight through a
+    `Channel` moves bytes on both sides, so it resets the watch.
+    """
+
+    def __init__(self, pids: list[int], idleness_limit: float) -> None:
+        """
+        Args:
+            pids (list[int]): Processes to watch
+            idleness_limit (float): Seconds of idleness to tolerate
+        """
+        self.pids = pids
+        self.idleness_limit = idleness_limit
+        self._io: list[tuple[int, int] | None] | None = None
+        self._since = 0.0
+
+    def is_idle(self) -> bool:
+        """Sample the processes
+
+        Returns:
+            bool: True if they have been idle for `idleness_limit` seconds
+        """
+        io = [_pipe_read_io(pid) for pid in self.pids]
+        now = time.monotonic()
+        if None in io:
+            self._io = None
+            return False
+        if io != self._io:
+            self._io = io
+            self._since = now
+            return False
+        return now - self._since >= self.idleness_limit
+
+
+def _wait_unless_idle(
+    reaper: _Reaper, timeout: float | None, *, watch: _IdlenessWatch | None
+) -> int:
+    """Wait for the process of a reaper, giving up if the watch finds it idle
+
+    Raises:
+        subprocess.TimeoutExpired: If the process does not exit in time
+        IdlenessLimitExceeded: If the watch finds the processes idle
+    """
+    if watch is None:
+        return reaper.wait(timeout)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        interval = _IDLENESS_POLL_INTERVAL
+        if deadline is not None:
+            interval = min(interval, max(deadline - time.monotonic(), 0.0))
+        reaper.join(interval)
+        if not reaper.is_alive():
+            return reaper.wait(None)
+        if deadline is not None and time.monotonic() >= deadline:
+            return reaper.wait(0.0)
+        if watch.is_idle():
+            raise IdlenessLimitExceeded(reaper.process.args, watch.idleness_limit)
+
+
+class _InteractiveRunError(subprocess.SubprocessError):
+    run_result: RunResult | None = None
+    """What was measured until the run was stopped. Set by `run_interactive_judge`,
+    with `returncode` of the judge after it was stopped."""
+
+
+class JudgeTimeoutExpired(_InteractiveRunError, subprocess.TimeoutExpired):
     pass
 
 
-class SolverTimeoutExpired(subprocess.TimeoutExpired):
+class SolverTimeoutExpired(_InteractiveRunError, subprocess.TimeoutExpired):
     pass
 
 
+class IdlenessLimitExceeded(_InteractiveRunError, subprocess.TimeoutExpired):
+    """Both the judge and the solver wait to read from each other"""
+
+
+class SolverRuntimeError(_InteractiveRunError, subprocess.CalledProcessError):
+    """The solver of an interactive run exits with a non-zero code"""
+
+
 def run_interactive_judge(
     judge_cmd: list[str], solver_cmd: list[str], *, params: InteractiveJudgeParams
 ) -> RunResult:
@@ -227,73 +540,200 @@ def run_interactive_judge(
         RunResult:
             Result of the interactive judge.
             - `returncode` is the return code of the **judge**.
-            - `elapsed_time` is the time taken by the **solver**.
+            - `elapsed_time` is the wall time taken by the **solver**.
             - `used_memory_mb` is the memory usage of the **solver**.
+            - `cpu_time` and `judge_cpu_time` are the CPU times of both.
+            - `interaction` is set if the messages are forwarded, which
+              `params.count_messages` or `params.transcript` enables.
             - `stdout` and `stderr` are empty strings.
     Raises:
         subprocess.TimeoutExpired:
-            If the solver or judge times out.
+            If the solver or judge times out. With `params.cpu_time_limit`,
+            the solver times out if its CPU time exceeds the timeout, or its
+            wall time exceeds `_CPU_TIME_WALL_FACTOR` times of it.
             - If the solver times out, the error message is `SOLVER_TLE_MESSAGE`.
             - If the judge times out, the error message is `JUDGE_TLE_MESSAGE`.
-        subprocess.CalledProcessError:
+        IdlenessLimitExceeded:
+            With `params.idleness_limit`, if both the judge and the solver
+            sleep on reads from each other, moving no bytes for that long,
+            e.g. the solver has not flushed its output. Detected by `/proc`
+            on Linux, and never elsewhere.
+        SolverRuntimeError:
             If the solver returns a non-zero exit
+        The errors above carry the resource usage and the messages measured
+        until the run was stopped in `run_result`.
     """
+    if fork_server.is_forked_command(judge_cmd):
+        # The judge needs both of its stdin and stdout connected to the solver
+        judge_cmd = fork_server.cold_command(judge_cmd)
     logger.debug("Running the interactive judge: %s", judge_cmd)
     logger.debug("Running the interactive solver: %s", solver_cmd)
     memory_usage_dict: _MemoryUsageDict = {"rss": 0}
-    with subprocess.Popen(
-        judge_cmd,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=_dest(params.judge_stderr),
-        text=True,
-    ) as p_judge:
-        with subprocess.Popen(
-            solver_cmd,
-            stdin=p_judge.stdout,
-            stdout=p_judge.stdin,
-            stderr=_dest(params.stderr),
-            text=True,
-            preexec_fn=lambda: _limit_memory(params.memory_limit),
-        ) as p_solver:
-            memory_monitor = Thread(
-                target=monitor_memory, args=(p_solver, memory_usage_dict), daemon=True
+    stack_rlimit = _stack_rlimit(params.stack_limit)
+    # The processes talk over raw pipes. Closing the ends of the parent right
+    # after spawning lets either side see EOF as soon as the other exits.
+    to_solver_r, to_solver_w = _open_pipe(params.pipe_size_kb)
+    to_judge_r, to_judge_w = _open_pipe(params.pipe_size_kb)
+    judge_stdout, solver_stdout = to_solver_w, to_judge_w
+    channels: list[Channel] = []
+    forwarder: Forwarder | None = None
+    if params.count_messages or params.transcript is not None:
+        # Each side writes to a pipe of its own, forwarded by a channel
+        proxy_r, judge_stdout = _open_pipe(params.pipe_size_kb)
+        channels.append(
+            Channel(
+                proxy_r,
+                to_solver_w,
+                direction=TO_SOLVER,
+                transcript=params.transcript,
             )
-            memory_monitor.start()
-
-            start_time = time.perf_counter_ns()
+        )
+        proxy_r, solver_stdout = _open_pipe(params.pipe_size_kb)
+        channels.append(
+            Channel(
+                proxy_r,
+                to_judge_w,
+                direction=TO_JUDGE,
+                transcript=params.transcript,
+            )
+        )
+        forwarder = Forwarder(channels)
+        forwarder.start()
+    child_fds = [to_judge_r, judge_stdout, to_solver_r, solver_stdout]
+    try:
+        p_judge = subprocess.Popen(
+            judge_cmd,
+            stdin=to_judge_r,
+            stdout=judge_stdout,
+            stderr=_dest(params.judge_stderr),
+        )
+        try:
+            p_solver = subprocess.Popen(
+                solver_cmd,
+                stdin=to_solver_r,
+                stdout=solver_stdout,
+                stderr=_dest(params.stderr),
+                preexec_fn=lambda: _limit_resources(params.memory_limit, stack_rlimit),
+            )
+        except BaseException:
+            p_judge.kill()
+            p_judge.wait()
+            raise
+    finally:
+        for fd in child_fds:
+            os.close(fd)
+
+    solver_timeout = params.timeout
+    if params.cpu_time_limit and params.timeout is not None:
+        solver_timeout = params.timeout * _CPU_TIME_WALL_FACTOR
+    judge_reaper = _Reaper(p_judge)
+    solver_reaper = _Reaper(p_solver)
+    with p_judge, p_solver:
+        judge_reaper.start()
+        solver_reaper.start()
+        memory_monitor = Thread(
+            target=monitor_memory,
+            args=(p_solver, memory_usage_dict, solver_reaper.is_alive),
+            daemon=True,
+        )
+        memory_monitor.start()
+        idleness_watch: _IdlenessWatch | None = None
+        if params.idleness_limit is not None:
+            idleness_watch = _IdlenessWatch(
+                [p_judge.pid, p_solver.pid], params.idleness_limit
+            )
+        start_time = time.perf_counter_ns()
+        end_time: int | None = None
+        try:
             try:
-                returncode_solver = p_solver.wait(timeout=params.timeout)
-            except subprocess.TimeoutExpired as e:
-                p_solver.kill()
-                p_judge.kill()
+                try:
+                    returncode_solver = _wait_unless_idle(
+                        solver_reaper, solver_timeout, watch=idleness_watch
+                    )
+                except IdlenessLimitExceeded:
+                    raise
+                except subprocess.TimeoutExpired as e:
+                    assert params.timeout is not None
+                    raise SolverTimeoutExpired(solver_cmd, params.timeout) from e
+                end_time = time.perf_counter_ns()
                 memory_monitor.join()
-                assert params.timeout is not None
-                raise SolverTimeoutExpired(solver_cmd, params.timeout) from e
 
-            end_time = time.perf_counter_ns()
-            memory_monitor.join()
+                if (
+                    params.cpu_time_limit
+                    and params.timeout is not None
+                    and solver_reaper.cpu_time > params.timeout
+                ):
+                    raise SolverTimeoutExpired(solver_cmd, params.timeout)
+                if returncode_solver:
+                    raise SolverRuntimeError(
+                        returncode=returncode_solver, cmd=solver_cmd
+                    )
+
+                try:
+                    returncode_judge = judge_reaper.wait(params.judge_timeout)
+                except subprocess.TimeoutExpired as e:
+                    raise JudgeTimeoutExpired(judge_cmd, params.judge_timeout) from e
+            finally:
+                if end_time is None:
+                    # Stopped while the solver was running
+                    end_time = time.perf_counter_ns()
+                solver_reaper.kill()
+                judge_reaper.kill()
+                memory_monitor.join()
+                if forwarder is not None:
+                    # The channels end when both processes have exited,
+                    # unless a process they spawned keeps the pipes open
+                    forwarder.join(params.judge_timeout)
+        except _InteractiveRunError as e:
+            assert end_time is not None and p_judge.returncode is not None
+            e.run_result = _interactive_run_result(
+                returncode=p_judge.returncode,
+                elapsed_time=(end_time - start_time) / 10**9,
+                memory_usage_dict=memory_usage_dict,
+                reapers=(solver_reaper, judge_reaper),
+                channels=channels,
+            )
+            raise
+        return _interactive_run_result(
+            returncode=returncode_judge,
+            elapsed_time=(end_time - start_time) / 10**9,
+            memory_usage_dict=memory_usage_dict,
+            reapers=(solver_reaper, judge_reaper),
+            channels=channels,
+        )
 
-            assert p_judge.stdin is not None
-            p_judge.stdin.close()
 
-            if returncode_solver:
-                p_judge.kill()
-                raise subprocess.CalledProcessError(
-                    returncode=returncode_solver, cmd=solver_cmd
-                )
+def _interactive_run_result(
+    *,
+    returncode: int,
+    elapsed_time: float,
+    memory_usage_dict: _MemoryUsageDict,
+    reapers: tuple[_Reaper, _Reaper],
+    channels: list[Channel],
+) -> RunResult:
+    """Collect the result of an interactive run after both processes have ended
 
-            try:
-                returncode_judge = p_judge.wait(timeout=params.judge_timeout)
-            except subprocess.TimeoutExpired as e:
-                p_judge.kill()
-                raise JudgeTimeoutExpired(judge_cmd, params.judge_timeout) from e
-
-            run_result = RunResult(
-                stdout="",
-                stderr="",
-                returncode=returncode_judge,
-                elapsed_time=(end_time - start_time) / 10**9,
-                used_memory_mb=memory_usage_dict["rss"] / 1024 / 1024,
-            )
-    return run_result
+    Args:
+        returncode (int): Return code of the judge
+        elapsed_time (float): Wall time of the solver in seconds
+        memory_usage_dict (_MemoryUsageDict): Memory usage of the solver
+        reapers (tuple[_Reaper, _Reaper]): Reapers of the solver and the judge
+        channels (list[Channel]): Channels to the solver and to the judge, if
+            the messages are forwarded
+    """
+    solver_reaper, judge_reaper = reapers
+    stats: InteractionStats | None = None
+    if channels:
+        stats = InteractionStats(
+            to_solver=channels[0].stats(), to_judge=channels[1].stats()
+        )
+    return RunResult(
+        stdout="",
+        stderr="",
+        returncode=returncode,
+        elapsed_time=elapsed_time,
+        used_memory_mb=memory_usage_dict["rss"] / 1024 / 1024,
+        cpu_time=solver_reaper.cpu_time,
+        judge_cpu_time=judge_reaper.cpu_time,
+        interaction=stats,
+    )
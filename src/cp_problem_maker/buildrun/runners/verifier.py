@@ -1,9 +1,19 @@
 import abc
+import time
 from enum import IntEnum
+from pathlib import Path
+from types import CodeType
+from typing import Any, Mapping, Sequence
 
 from pydantic import BaseModel, ConfigDict
 
 from cp_problem_maker.buildrun.runners import runner
+from cp_problem_maker.config import problem_config
+from cp_problem_maker.validlib import ValidationError, Validator
+
+BATCH_FAILURE_SEPARATOR = ": "
+"""Separator between the input file and the message in the failures printed
+by a verifier in the batch mode"""
 
 
 class VerifierStatusEnum(IntEnum):
@@ -80,3 +90,214 @@ class SourceTestcaseVerifier(ITestcaseVerifier):
             run_result=run_result,
             status=status,
         )
+
+    @classmethod
+    def verify_testcases(
+        cls,
+        cmd: list[str],
+        testcase_files: Sequence[Path],
+        *,
+        runner_params: runner.RunnerParams,
+    ) -> VerifyResult:
+        """Verify the test cases by a single process in the batch mode
+
+        The input files are passed as arguments. The verifier prints
+        "<input file>: <message>" to stdout per failed test case, and exits
+        with a non-zero code if any of them fails.
+
+        Args:
+            cmd (list[str]): Command to run the verifier
+            testcase_files (Sequence[Path]): Input files to verify
+            runner_params (runner.RunnerParams): Parameter set for running the verifier
+        Returns:
+            VerifyResult: Result of the verification of all the test cases
+        """
+        return cls.verify_testcase(
+            cmd + [str(file) for file in testcase_files], runner_params=runner_params
+        )
+
+
+_Values = dict[str, Any]
+"""Parameters and the values read so far by their names"""
+
+
+class _Expression:
+    """Bound in the input format, compiled once and evaluated per test case"""
+
+    def __init__(self, expression: int | float | str) -> None:
+        self.expression = expression
+        self._code: CodeType | None = None
+        if isinstance(expression, str):
+            self._code = compile(expression, "<input_format>", "eval")
+
+    def number(self, values: _Values) -> int | float:
+        if self._code is None:
+            assert not isinstance(self.expression, str)
+            return self.expression
+        try:
+            value = eval(self._code, {"__builtins__": {}}, values)
+        except NameError as e:
+            raise ValueError(f"Unknown name in {self.expression!r}: {e}") from e
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            raise ValueError(f"{self.expression!r} is not a number")
+        return value
+
+    def integer(self, values: _Values) -> int:
+        value = self.number(values)
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f"{self.expression!r} = {value} is not an integer")
+            return int(value)
+        return value
+
+
+def _bound(expression: int | float | str | None) -> _Expression | None:
+    return None if expression is None else _Expression(expression)
+
+
+class _Token:
+    def __init__(self, token: problem_config._InputToken) -> None:
+        self.name = token.name
+        self.type = token.type
+        self.min = _bound(token.min)
+        self.max = _bound(token.max)
+        self.length = _bound(token.length)
+        self.pattern = token.pattern
+        self.max_decimals = token.max_decimals
+
+    def int_bounds(self, values: _Values) -> tuple[int, int]:
+        assert self.min is not None and self.max is not None
+        return self.min.integer(values), self.max.integer(values)
+
+    def read_scalar(self, validator: Validator, values: _Values, name: str) -> Any:
+        if self.type == "int":
+            return validator.read_int(*self.int_bounds(values), name)
+        if self.type == "float":
+            assert self.min is not None and self.max is not None
+            return validator.read_real(
+                self.min.number(values),
+                self.max.number(values),
+                name,
+                max_decimals=self.max_decimals,
+            )
+        return validator.read_token(
+            self.pattern,
+            name,
+            min_length=1 if self.min is None else self.min.integer(values),
+            max_length=None if self.max is None else self.max.integer(values),
+        )
+
+    def read(self, validator: Validator, values: _Values) -> Any:
+        if self.length is None:
+            return self.read_scalar(validator, values, self.name)
+        length = self.length.integer(values)
+        if self.type == "int":
+            return validator.read_ints(length, *self.int_bounds(values), self.name)
+        array = []
+        for i in range(length):
+            if i > 0:
+                validator.read_space()
+            array.append(self.read_scalar(validator, values, f"{self.name}[{i}]"))
+        return array
+
+
+class _Line:
+    def __init__(self, line: problem_config._InputLine) -> None:
+        self.tokens = [_Token(token) for token in line.tokens]
+        self.repeat = _bound(line.repeat)
+
+    def read(self, validator: Validator, values: _Values) -> None:
+        if self.repeat is None:
+            for i, token in enumerate(self.tokens):
+                if i > 0:
+                    validator.read_space()
+                values[token.name] = token.read(validator, values)
+            validator.read_eoln()
+            return
+        rows = self.repeat.integer(values)
+        if all(token.type == "int" for token in self.tokens):
+            # Read all the lines at once
+            columns = validator.read_int_columns(
+                rows,
+                [token.int_bounds(values) for token in self.tokens],
+                [token.name for token in self.tokens],
+            )
+        else:
+            columns = [[] for _ in self.tokens]
+            for row in range(rows):
+                for i, token in enumerate(self.tokens):
+                    if i > 0:
+                        validator.read_space()
+                    name = f"{token.name}[{row}]"
+                    columns[i].append(token.read_scalar(validator, values, name))
+                validator.read_eoln()
+        for token, column in zip(self.tokens, columns, strict=True):
+            values[token.name] = column
+
+
+class FormatTestcaseVerifier:
+    """Verifier of the test cases by the input format in the problem config
+
+    The format is compiled once, and the test cases are verified in-process
+    by `validlib`, without running a verifier per test case.
+    """
+
+    def __init__(
+        self,
+        input_format: problem_config._InputFormat,
+        params: Mapping[str, problem_config._ParameterValue],
+    ) -> None:
+        """
+        Args:
+            input_format (problem_config._InputFormat): Format of the input
+            params (Mapping[str, problem_config._ParameterValue]): Parameters
+                the bounds can refer to
+        Raises:
+            ValueError: If a name in the format is also a parameter
+        """
+        self._lines = [_Line(line) for line in input_format.lines]
+        conflicts = sorted(
+            token.name
+            for line in input_format.lines
+            for token in line.tokens
+            if token.name in params
+        )
+        if conflicts:
+            raise ValueError(f"Names in the input format are parameters: {conflicts}")
+        self._params = {
+            name: value for name, value in params.items() if not isinstance(value, str)
+        }
+
+    def verify_testcase(self, testcase_file: Path) -> VerifyResult:
+        """Verify the test case
+
+        Args:
+            testcase_file (Path): Input file of the test case
+        Returns:
+            VerifyResult: Result of the verification. The error is in stderr.
+        Raises:
+            ValueError: If the bounds in the format cannot be evaluated
+        """
+        start = time.perf_counter()
+        stderr = ""
+        with testcase_file.open("rb") as f:
+            validator = Validator(f)
+            try:
+                values = dict(self._params)
+                for line in self._lines:
+                    line.read(validator, values)
+                validator.read_eof()
+            except ValidationError as e:
+                stderr = f"{e}\n"
+            finally:
+                validator.close()
+        return VerifyResult(
+            run_result=runner.RunResult(
+                stdout="",
+                stderr=stderr,
+                returncode=1 if stderr else 0,
+                elapsed_time=time.perf_counter() - start,
+                used_memory_mb=0.0,
+            ),
+            status=VerifierStatusEnum.Failed if stderr else VerifierStatusEnum.Passed,
+        )
@@ -1,5 +1,6 @@
+import ast
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Annotated, Literal, Optional, Self
 
 import pydantic
 from pydantic import BaseModel, ConfigDict, Field
@@ -11,6 +12,10 @@ from cp_problem_maker.utils import _pydantic
 class _Test(BaseModel):
     name: str = Field(..., description="Name of the test case")
     number: int = Field(..., ge=1, description="Number of the test case")
+    virtual: bool = Field(
+        False,
+        description="Store only how to regenerate the test cases and their hashes instead of the files. The inputs are regenerated when checking.",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
@@ -33,18 +38,138 @@ class _Solution(BaseModel):
 
 _ParameterValue = int | float | str
 
+_EXPRESSION_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.FloorDiv,
+    ast.Pow,
+    ast.USub,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+)
+
+
+def _validate_expression(value: int | float | str) -> int | float | str:
+    if not isinstance(value, str):
+        return value
+    try:
+        tree = ast.parse(value, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {value!r}") from e
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPRESSION_NODES) or (
+            isinstance(node, ast.Constant) and not isinstance(node.value, int | float)
+        ):
+            raise ValueError(
+                f"Expressions may only use numbers, names, +, -, *, // and **: {value!r}"  # noqa: E501
+            )
+    return value
+
+
+_Expression = Annotated[
+    int | float | str, pydantic.AfterValidator(_validate_expression)
+]
+"""Number, or an arithmetic expression of parameters and earlier values"""
+
+
+class _InputToken(BaseModel):
+    name: str = Field(..., description="Name of the value")
+    type: Literal["int", "float", "str"] = Field("int", description="Type of the value")
+    min: Optional[_Expression] = Field(
+        None,
+        description="Minimum value. For strings, the minimum length. Required for numbers.",  # noqa: E501
+    )
+    max: Optional[_Expression] = Field(
+        None,
+        description="Maximum value. For strings, the maximum length. Required for numbers.",  # noqa: E501
+    )
+    length: Optional[_Expression] = Field(
+        None,
+        description="If set, the value is an array of this length separated by spaces",
+    )
+    pattern: Optional[str] = Field(
+        None, description="Regular expression that strings must match"
+    )
+    max_decimals: Optional[int] = Field(
+        None, ge=0, description="Maximum number of digits after the point of floats"
+    )
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+    @pydantic.model_validator(mode="after")
+    def _validate_type(self) -> Self:
+        if self.type != "str" and (self.min is None or self.max is None):
+            raise ValueError(f"Bounds of '{self.name}' are required for numbers")
+        if self.type != "str" and self.pattern is not None:
+            raise ValueError(f"Pattern of '{self.name}' is only allowed for strings")
+        if self.type != "float" and self.max_decimals is not None:
+            raise ValueError(f"Decimals of '{self.name}' are only allowed for floats")
+        return self
+
+
+class _InputLine(BaseModel):
+    tokens: list[_InputToken] = Field(
+        ..., min_length=1, description="Values in the line separated by spaces"
+    )
+    repeat: Optional[_Expression] = Field(
+        None,
+        description="If set, the line is repeated this number of times, and each value is an array of the values in the lines",  # noqa: E501
+    )
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+    @pydantic.model_validator(mode="after")
+    def _validate_repeat(self) -> Self:
+        if self.repeat is not None and any(t.length is not None for t in self.tokens):
+            raise ValueError("Arrays are not allowed in repeated lines")
+        return self
+
+
+class _InputFormat(BaseModel):
+    lines: list[_InputLine] = Field(..., description="Lines of the input in order")
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+    @pydantic.field_validator("lines")
+    def _validate_names(cls, lines: list[_InputLine]) -> list[_InputLine]:
+        names = [token.name for line in lines for token in line.tokens]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Names in the input format must be unique: {duplicates}")
+        return lines
+
 
 class _ProblemConfig(BaseModel):
     title: str = Field(..., description="Title of the problem")
 
     timelimit: float = Field(2.0, gt=0, description="Time limit in seconds")
     memorylimit: Optional[int] = Field(None, gt=0, description="Memory limit in MiB")
+    stacklimit: pydantic.PositiveInt | Literal["unlimited"] = Field(
+        "unlimited",
+        description="Stack limit of the solutions in MiB or 'unlimited'. Unlimited if omitted, since the solutions are built without -fsplit-stack.",  # noqa: E501
+    )
 
     tests: list[_Test] = Field(..., description="List of test cases")
     solutions: list[_Solution] = Field(..., description="List of solutions")
 
     params: dict[str, _ParameterValue] = Field({}, description="Constant parameters")
 
+    input_format: Optional[_InputFormat] = Field(
+        None,
+        description="Format of the input. If set, the inputs are verified by it in-process instead of the verifier.",  # noqa: E501
+    )
+
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
     )
@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 from typing import Literal, Optional, Self
 
@@ -73,6 +74,10 @@ class _CppDefault(BaseModel):
         ],
         description="Compiler flags",
     )
+    static_link: bool = Field(
+        False,
+        description="Link statically to cut the startup time. Falls back to dynamic linking if static libraries are missing.",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
@@ -82,6 +87,7 @@ class _CppDefault(BaseModel):
 class _CppOverride(BaseModel):
     compiler: Optional[str] = Field(None, description="Override compiler command")
     flags: Optional[list[str]] = Field(None, description="Override compiler flags.")
+    static_link: Optional[bool] = Field(None, description="Override static linking")
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
@@ -89,26 +95,110 @@ class _CppOverride(BaseModel):
 
 
 class _Cpp(_CppDefault):
+    precompiled_headers: list[str] = Field(
+        ["bits/stdc++.h", "testlib.h"],
+        description="Headers to precompile. Precompiled headers are built per profile and used automatically.",  # noqa: E501
+    )
     solver: Optional[_CppOverride] = Field(
         _CppOverride(
             flags=[
                 "-std=c++20",
                 "-Wall",
                 "-Wextra",
-                "-fsplit-stack",
                 "-O2",
             ]
         ),
         description="Override configuration for the solver",
     )
+    checker: Optional[_CppOverride] = Field(
+        _CppOverride(
+            flags=[
+                "-std=c++20",
+                "-Wall",
+                "-Wextra",
+                "-fsplit-stack",
+                "-O2",
+            ]
+        ),
+        description="Override configuration for the checker",
+    )
+    verifier: Optional[_CppOverride] = Field(
+        None, description="Override configuration for the verifier"
+    )
+    generator: Optional[_CppOverride] = Field(
+        _CppOverride(
+            flags=[
+                "-std=c++20",
+                "-Wall",
+                "-Wextra",
+                "-fsplit-stack",
+                "-O2",
+            ]
+        ),
+        description="Override configuration for the generators",
+    )
+    sanitizer: Optional[_CppOverride] = Field(
+        _CppOverride(
+            flags=[
+                "-std=c++20",
+                "-Wall",
+                "-Wextra",
+                "-g",
+                "-O1",
+                "-fno-omit-frame-pointer",
+                "-fsanitize=address,undefined",
+            ]
+        ),
+        description="Override configuration for the untimed sanitizer builds of the solutions",  # noqa: E501
+    )
+    toolchains: dict[str, _CppOverride] = Field(
+        {},
+        description="Named toolchain variants applied on top of the solver configuration, used by `check --toolchains`",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
     )
 
+    @pydantic.field_validator("toolchains")
+    def _validate_toolchain_names(
+        cls, toolchains: dict[str, _CppOverride]
+    ) -> dict[str, _CppOverride]:
+        for name in toolchains:
+            if not re.fullmatch(r"[\w.+-]+", name):
+                raise ValueError(f"Invalid toolchain name: {name!r}")
+        return toolchains
+
 
 class _Python(BaseModel):
     python: str = Field("python", description="Python executable")
+    flags: list[str] = Field(
+        [], description="Interpreter flags such as -S, -E and -O to run Python with"
+    )
+    fork_server: bool = Field(
+        False,
+        description="Run Python checkers, verifiers and generators on a fork server that preloads their imports",  # noqa: E501
+    )
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+
+class _BuildCache(BaseModel):
+    path: str = Field(
+        "~/.cache/cp_problem_maker/build",
+        description="Directory to store build artifacts shared across problems",
+    )
+    max_size_mb: Optional[int] = Field(
+        4096,
+        gt=0,
+        description="Maximum total size of the build artifacts in MiB. Least recently used artifacts are evicted first.",  # noqa: E501
+    )
+    profile_max_size_mb: dict[str, int] = Field(
+        {"answers": 4096},
+        description="Maximum total size in MiB of the artifacts of each profile evicted apart from the others",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
@@ -122,6 +212,9 @@ class _Language(BaseModel):
     python: _Python = Field(
         default_factory=_Python, description="Configuration for Python"
     )
+    cache: _BuildCache = Field(
+        default_factory=_BuildCache, description="Configuration for the build cache"
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
@@ -148,6 +241,92 @@ class _Path(BaseModel):
         description="Path to the checker source file (without extension)",
     )
     params: str = Field("src/params", description="Path to the parameters file")
+    virtual_tests: str = Field(
+        "test/virtual_tests.json",
+        description="Path to the manifest of the virtual test cases",
+    )
+    transcripts: str = Field(
+        "test/transcripts/",
+        description="Directory to store the transcripts of the interactive runs",
+    )
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+
+# ==== Params ====
+
+
+class _Params(BaseModel):
+    runtime: bool = Field(
+        False,
+        description="Also generate accessors that read the parameters at run time, so that changing their values does not rebuild the programs using them",  # noqa: E501
+    )
+    fastio: bool = Field(
+        False,
+        description="Also generate `fastio.h`, a buffered reader and writer for C++ generators, checkers and verifiers",  # noqa: E501
+    )
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+
+# ==== Answers ====
+
+
+_AnswerStrategy = Literal["expected", "fastest"]
+
+
+class _Answers(BaseModel):
+    strategy: _AnswerStrategy = Field(
+        "expected", description="Strategy to choose the solution generating answers"
+    )
+    sample: int = Field(
+        5,
+        ge=1,
+        description="Number of test cases to benchmark the solutions on with the fastest strategy",  # noqa: E501
+    )
+    cross_check: float = Field(
+        0.1,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of the other answers cross-checked against the expected solution",  # noqa: E501
+    )
+
+    model_config = ConfigDict(
+        revalidate_instances="always", extra="forbid", use_enum_values=True
+    )
+
+
+# ==== Interactive ====
+
+
+class _Interactive(BaseModel):
+    pipe_size_kb: Optional[int] = Field(
+        None,
+        gt=0,
+        description="Capacity of the pipes between the judge and the solver in KiB. The system default is used if not set.",  # noqa: E501
+    )
+    cpu_time_limit: bool = Field(
+        False,
+        description="Judge the time limit of the solutions by their CPU time instead of their wall time",  # noqa: E501
+    )
+    count_messages: bool = Field(
+        False,
+        description="Count the messages and bytes in each direction. They are forwarded through cp-problem-maker.",  # noqa: E501
+    )
+    transcript_lines: Optional[int] = Field(
+        None,
+        gt=0,
+        description="Number of the last lines of each run recorded in a transcript. They are forwarded through cp-problem-maker.",  # noqa: E501
+    )
+    idleness_limit: float = Field(
+        0.0,
+        ge=0.0,
+        description="Seconds for which the judge and the solver may both wait to read from each other before the run is stopped as ILE. 0 disables the detection, which is the default.",  # noqa: E501
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
@@ -167,6 +346,17 @@ class _Config(BaseModel):
     path: _Path = Field(
         default_factory=_Path, description="Configuration for the directories"
     )
+    params: _Params = Field(
+        default_factory=_Params, description="Configuration for the parameters"
+    )
+    answers: _Answers = Field(
+        default_factory=_Answers,
+        description="Configuration for the answer generation",
+    )
+    interactive: _Interactive = Field(
+        default_factory=_Interactive,
+        description="Configuration for the interactive problems",
+    )
 
     model_config = ConfigDict(
         revalidate_instances="always", extra="forbid", use_enum_values=True
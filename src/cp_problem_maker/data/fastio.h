@@ -0,0 +1,270 @@
+// Buffered I/O for generators, checkers and verifiers.
+// This file is generated by cp-problem-maker. Do not edit it by hand.
+#ifndef CP_PROBLEM_MAKER_FASTIO_H
+#define CP_PROBLEM_MAKER_FASTIO_H
+#define CP_PROBLEM_MAKER_FASTIO_VERSION 1
+
+#include <cstddef>
+#include <cstdio>
+#include <cstdlib>
+#include <limits>
+#include <string>
+#include <type_traits>
+
+namespace fastio {
+
+// Reads whitespace-separated tokens from a stream.
+class Reader {
+   public:
+    explicit Reader(std::FILE *stream = stdin) : stream_(stream) {}
+    Reader(const Reader &) = delete;
+    Reader &operator=(const Reader &) = delete;
+
+    // Returns true if only whitespace is left.
+    bool eof() {
+        skip_space();
+        return peek() == EOF;
+    }
+
+    template <class T = long long>
+    T read_int() {
+        static_assert(std::is_integral_v<T>, "T must be an integer type");
+        skip_space();
+        bool negative = false;
+        if (peek() == '-') {
+            negative = true;
+            ++pos_;
+        }
+        using U = std::make_unsigned_t<T>;
+        U value = 0;
+        while (true) {
+            int c = peek();
+            if (c < '0' || '9' < c) break;
+            value = value * 10 + static_cast<U>(c - '0');
+            ++pos_;
+        }
+        return negative ? static_cast<T>(U(0) - value) : static_cast<T>(value);
+    }
+
+    double read_double() { return std::strtod(read_token().c_str(), nullptr); }
+
+    char read_char() {
+        skip_space();
+        int c = peek();
+        if (c != EOF) ++pos_;
+        return static_cast<char>(c);
+    }
+
+    std::string read_token() {
+        skip_space();
+        std::string token;
+        while (true) {
+            int c = peek();
+            if (c == EOF || is_space(c)) break;
+            token.push_back(static_cast<char>(c));
+            ++pos_;
+        }
+        return token;
+    }
+
+   private:
+    static constexpr std::size_t kBufferSize = 1 << 16;
+
+    static bool is_space(int c) { return c == ' ' || ('\t' <= c && c <= '\r'); }
+
+    int peek() {
+        if (pos_ == size_) {
+            size_ = std::fread(buffer_, 1, kBufferSize, stream_);
+            pos_ = 0;
+            if (size_ == 0) return EOF;
+        }
+        return static_cast<unsigned char>(buffer_[pos_]);
+    }
+
+    void skip_space() {
+        while (true) {
+            int c = peek();
+            if (c == EOF || !is_space(c)) break;
+            ++pos_;
+        }
+    }
+
+    std::FILE *stream_;
+    char buffer_[kBufferSize];
+    std::size_t pos_ = 0;
+    std::size_t size_ = 0;
+};
+
+// Writes to a stream through a buffer, which is flushed on destruction.
+class Writer {
+   public:
+    explicit Writer(std::FILE *stream = stdout) : stream_(stream) {}
+    Writer(const Writer &) = delete;
+    Writer &operator=(const Writer &) = delete;
+    ~Writer() { flush(); }
+
+    void flush() {
+        std::fwrite(buffer_, 1, pos_, stream_);
+        pos_ = 0;
+        std::fflush(stream_);
+    }
+
+    void write(char c) {
+        if (pos_ == kBufferSize) flush();
+        buffer_[pos_++] = c;
+    }
+
+    void write(const char *s) {
+        while (*s != '\0') write(*s++);
+    }
+
+    void write(const std::string &s) {
+        for (char c : s) write(c);
+    }
+
+    void write(bool value) { write(value ? '1' : '0'); }
+
+    template <class T,
+              std::enable_if_t<std::is_integral_v<T> && !std::is_same_v<T, bool>, int> = 0>
+    void write(T value) {
+        using U = std::make_unsigned_t<T>;
+        U magnitude = static_cast<U>(value);
+        if constexpr (std::is_signed_v<T>) {
+            if (value < 0) {
+                write('-');
+                magnitude = U(0) - magnitude;
+            }
+        }
+        char digits[std::numeric_limits<U>::digits10 + 1];
+        int n = 0;
+        do {
+            digits[n++] = static_cast<char>('0' + magnitude % 10);
+            magnitude /= 10;
+        } while (magnitude != 0);
+        while (n > 0) write(digits[--n]);
+    }
+
+    void write(double value, int precision = 10) {
+        char s[64];
+        int n = std::snprintf(s, sizeof(s), "%.*f", precision, value);
+        if (n < 0 || static_cast<std::size_t>(n) >= sizeof(s)) {
+            n = std::snprintf(s, sizeof(s), "%.*g", precision, value);
+        }
+        write(static_cast<const char *>(s));
+    }
+
+    // Writes the values separated by spaces and followed by a newline.
+    template <class... Ts>
+    void writeln(const Ts &...values) {
+        int i = 0;
+        ((i++ > 0 ? write(' ') : void(), write(values)), ...);
+        write('\n');
+    }
+
+   private:
+    static constexpr std::size_t kBufferSize = 1 << 16;
+
+    std::FILE *stream_;
+    char buffer_[kBufferSize];
+    std::size_t pos_ = 0;
+};
+
+// Reads the input strictly for verifiers.
+// Every space, newline and the end of the input must be read explicitly.
+// On a format error, the position and the reason are printed to stderr and
+// the program exits with 1.
+class StrictReader {
+   public:
+    explicit StrictReader(std::FILE *stream = stdin) {
+        char buffer[1 << 16];
+        std::size_t n;
+        while ((n = std::fread(buffer, 1, sizeof(buffer), stream)) > 0) {
+            input_.append(buffer, n);
+        }
+    }
+
+    long long read_int(long long lo, long long hi) {
+        std::size_t begin = pos_;
+        std::string token = read_token(1, 20);
+        std::size_t i = token[0] == '-' ? 1 : 0;
+        if (i == token.size()) {
+            fail_at(begin, "expected an integer, found '" + token + "'");
+        }
+        if (token[i] == '0' && (token.size() > i + 1 || i == 1)) {
+            fail_at(begin, "integer '" + token + "' is not in the canonical form");
+        }
+        unsigned long long magnitude = 0;
+        for (std::size_t j = i; j < token.size(); ++j) {
+            if (token[j] < '0' || '9' < token[j]) {
+                fail_at(begin, "expected an integer, found '" + token + "'");
+            }
+            unsigned long long digit = token[j] - '0';
+            if (magnitude > (std::numeric_limits<unsigned long long>::max() - digit) / 10) {
+                fail_at(begin, "integer '" + token + "' is too large");
+            }
+            magnitude = magnitude * 10 + digit;
+        }
+        constexpr unsigned long long kMax = std::numeric_limits<long long>::max();
+        if (magnitude > kMax + (i == 1 ? 1 : 0)) {
+            fail_at(begin, "integer '" + token + "' is too large");
+        }
+        long long value = i == 1 ? static_cast<long long>(0ULL - magnitude)
+                                 : static_cast<long long>(magnitude);
+        if (value < lo || hi < value) {
+            fail_at(begin, "integer " + token + " is out of range [" + std::to_string(lo) +
+                               ", " + std::to_string(hi) + "]");
+        }
+        return value;
+    }
+
+    // Reads a token of non-whitespace characters whose length is in [min_len, max_len].
+    std::string read_token(std::size_t min_len, std::size_t max_len) {
+        std::size_t begin = pos_;
+        while (pos_ < input_.size() && !is_space(input_[pos_])) ++pos_;
+        std::size_t len = pos_ - begin;
+        if (len < min_len || max_len < len) {
+            pos_ = begin;
+            fail(len == 0 ? "expected a token" : "token length is out of range");
+        }
+        return input_.substr(begin, len);
+    }
+
+    void read_space() { expect(' ', "expected a space"); }
+
+    void read_newline() { expect('\n', "expected a newline"); }
+
+    void read_eof() {
+        if (pos_ != input_.size()) fail("expected the end of the input");
+    }
+
+    [[noreturn]] void fail(const std::string &message) const { fail_at(pos_, message); }
+
+   private:
+    static bool is_space(char c) { return c == ' ' || ('\t' <= c && c <= '\r'); }
+
+    [[noreturn]] void fail_at(std::size_t pos, const std::string &message) const {
+        std::size_t line = 1, column = 1;
+        for (std::size_t i = 0; i < pos; ++i) {
+            if (input_[i] == '\n') {
+                ++line;
+                column = 1;
+            } else {
+                ++column;
+            }
+        }
+        std::fprintf(stderr, "line %zu, column %zu: %s\n", line, column, message.c_str());
+        std::exit(1);
+    }
+
+    void expect(char c, const char *message) {
+        if (pos_ == input_.size() || input_[pos_] != c) fail(message);
+        ++pos_;
+    }
+
+    std::string input_;
+    std::size_t pos_ = 0;
+};
+
+}  // namespace fastio
+
+#endif
@@ -0,0 +1,18 @@
+"""Helpers for Python test case generators
+
+This package requires NumPy, which is installed with the `genlib` extra.
+"""
+
+try:
+    import numpy  # noqa: F401
+except ImportError as e:
+    raise ImportError(
+        "cp_problem_maker.genlib requires NumPy. "
+        "Install it with `pip install 'cp-problem-maker[genlib]'`."
+    ) from e
+
+from . import graph
+from .gen import Gen
+from .writer import Writer
+
+__all__ = ["Gen", "Writer", "graph"]
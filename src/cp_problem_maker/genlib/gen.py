@@ -0,0 +1,143 @@
+import string
+import sys
+from typing import Any, Self, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+LOWERCASE = string.ascii_lowercase
+"""Default alphabet of the random strings"""
+
+
+class Gen:
+    """Random generator for test case generators
+
+    The values are drawn in bulk from a NumPy `Generator`,
+    so that generating large test cases does not loop in Python.
+    The same seed always generates the same values.
+    """
+
+    def __init__(self, seed: int, *, case_id: int = 0) -> None:
+        self.seed = seed
+        """Random seed"""
+        self.case_id = case_id
+        """ID of the test case in the group"""
+        self.rng = np.random.Generator(np.random.PCG64(seed))
+        """Underlying NumPy generator for distributions not covered here"""
+
+    @classmethod
+    def from_argv(cls, argv: Sequence[str] | None = None) -> Self:
+        """Create a generator from the arguments passed to the generator
+
+        Generators are run as `<generator> <case_id> <seed>`.
+
+        Args:
+            argv (Sequence[str] | None): Arguments. Defaults to `sys.argv`.
+        Returns:
+            Self: Generator seeded with the seed of the test case
+        """
+        if argv is None:
+            argv = sys.argv
+        if len(argv) < 3:
+            raise ValueError(f"Usage: {argv[0] if argv else 'gen'} <case_id> <seed>")
+        return cls(int(argv[2]), case_id=int(argv[1]))
+
+    def randint(self, lo: int, hi: int) -> int:
+        """Draw an integer in [lo, hi]"""
+        return int(self.rng.integers(lo, hi, endpoint=True))
+
+    def ints(self, n: int, lo: int, hi: int) -> npt.NDArray[np.int64]:
+        """Draw n integers in [lo, hi] independently"""
+        return self.rng.integers(lo, hi, size=n, endpoint=True, dtype=np.int64)
+
+    def floats(self, n: int, lo: float, hi: float) -> npt.NDArray[np.float64]:
+        """Draw n real numbers in [lo, hi) independently"""
+        return self.rng.uniform(lo, hi, size=n)
+
+    def permutation(self, n: int, *, start: int = 1) -> npt.NDArray[np.int64]:
+        """Draw a permutation of [start, start + n)"""
+        return self.rng.permutation(n).astype(np.int64) + start
+
+    def distinct(self, n: int, lo: int, hi: int) -> npt.NDArray[np.int64]:
+        """Draw n distinct integers in [lo, hi] in random order
+
+        Args:
+            n (int): Number of integers
+            lo (int): Minimum value
+            hi (int): Maximum value
+        Returns:
+            npt.NDArray[np.int64]: Distinct integers
+        Raises:
+            ValueError: If [lo, hi] has less than n integers
+        """
+        if hi - lo + 1 < n:
+            raise ValueError(f"Cannot draw {n} distinct integers in [{lo}, {hi}]")
+        offsets = self.rng.choice(hi - lo + 1, size=n, replace=False)
+        return offsets.astype(np.int64) + lo
+
+    def choice(self, values: npt.ArrayLike, n: int) -> npt.NDArray[Any]:
+        """Draw n elements of the values independently"""
+        return self.rng.choice(np.asarray(values), size=n)
+
+    def shuffle(self, values: npt.NDArray[Any]) -> None:
+        """Shuffle the array in place along the first axis"""
+        self.rng.shuffle(values)
+
+    def string(self, n: int, alphabet: str = LOWERCASE) -> str:
+        """Draw a string of length n over the alphabet
+
+        Args:
+            n (int): Length of the string
+            alphabet (str): ASCII characters to use
+        Returns:
+            str: Random string
+        """
+        return self.string_codes(n, alphabet).tobytes().decode("ascii")
+
+    def planted_string(
+        self, n: int, pattern: str, count: int, alphabet: str = LOWERCASE
+    ) -> str:
+        """Draw a string of length n with the pattern planted at random positions
+
+        The pattern is planted `count` times without overlaps, and the rest is
+        drawn over the alphabet, so the pattern may occur more often than that.
+
+        Args:
+            n (int): Length of the string
+            pattern (str): ASCII pattern to plant
+            count (int): Number of occurrences to plant
+            alphabet (str): ASCII characters to fill the rest with
+        Returns:
+            str: Random string
+        Raises:
+            ValueError: If the occurrences do not fit in the string
+        """
+        length = len(pattern)
+        if length == 0 or length * count > n:
+            raise ValueError(f"Cannot plant {pattern!r} {count} times in length {n}")
+        codes = self.string_codes(n, alphabet)
+        # Non-overlapping positions correspond to sorted distinct slots,
+        # shifted by the lengths of the preceding occurrences
+        slots = np.sort(self.distinct(count, 0, n - length * count + count - 1))
+        positions = slots + np.arange(count) * (length - 1)
+        indices = positions[:, None] + np.arange(length)
+        codes[indices] = _ascii_codes(pattern)
+        return codes.tobytes().decode("ascii")
+
+    def string_codes(self, n: int, alphabet: str = LOWERCASE) -> npt.NDArray[np.uint8]:
+        """Draw a string of length n over the alphabet as an array of ASCII codes
+
+        Args:
+            n (int): Length of the string
+            alphabet (str): ASCII characters to use
+        Returns:
+            npt.NDArray[np.uint8]: ASCII codes of the characters
+        """
+        codes = _ascii_codes(alphabet)
+        return codes[self.rng.integers(0, len(codes), size=n)]
+
+
+def _ascii_codes(alphabet: str) -> npt.NDArray[np.uint8]:
+    if not alphabet or not alphabet.isascii():
+        raise ValueError(f"Alphabet must be non-empty ASCII: {alphabet!r}")
+    return np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)
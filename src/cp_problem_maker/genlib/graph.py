@@ -0,0 +1,224 @@
+"""Random trees and graphs
+
+Every function returns the edges as an array of shape (number of edges, 2)
+with the vertices numbered from `start`, which can be written by
+`Writer.matrix`. Unless noted otherwise, the vertex labels and the order of
+the edges are random. All of them run in O(N + M) time.
+"""
+
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .gen import Gen
+
+Edges = npt.NDArray[np.int64]
+"""Edges as an array of shape (number of edges, 2)"""
+
+
+def _check_n(n: int) -> None:
+    if n <= 0:
+        raise ValueError(f"Number of vertices must be positive: {n}")
+
+
+def relabel(
+    gen: Gen, edges: npt.ArrayLike, n: int, *, start: int = 1, directed: bool = False
+) -> Edges:
+    """Relabel the vertices by a random permutation and shuffle the edges
+
+    Args:
+        gen (Gen): Random generator
+        edges (npt.ArrayLike): Edges with the vertices numbered from 0
+        n (int): Number of vertices
+        start (int): Number of the first vertex in the result
+        directed (bool): Keep the direction of the edges. If false,
+            the endpoints of each edge are also swapped at random.
+    Returns:
+        Edges: Relabeled edges
+    """
+    array = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    labels = gen.permutation(n, start=start)
+    result: Edges = labels[array][gen.rng.permutation(len(array))]
+    if not directed:
+        swap = gen.rng.integers(0, 2, size=len(result), dtype=bool)
+        result[swap] = result[swap, ::-1]
+    return result
+
+
+def tree(gen: Gen, n: int, *, start: int = 1) -> Edges:
+    """Draw a tree uniformly at random from the labeled trees
+
+    The tree is decoded from a random Prüfer sequence.
+
+    Args:
+        gen (Gen): Random generator
+        n (int): Number of vertices
+        start (int): Number of the first vertex
+    Returns:
+        Edges: n - 1 edges
+    """
+    _check_n(n)
+    if n == 1:
+        return np.empty((0, 2), dtype=np.int64)
+    sequence = gen.rng.integers(0, n, size=n - 2)
+    degree = (np.bincount(sequence, minlength=n) + 1).tolist()
+    leaves: list[int] = []
+    # Linear-time decoding: `pointer` only moves forward, and a vertex that
+    # becomes a leaf behind it is used immediately
+    pointer = degree.index(1)
+    leaf = pointer
+    for v in sequence.tolist():
+        leaves.append(leaf)
+        degree[v] -= 1
+        if degree[v] == 1 and v < pointer:
+            leaf = v
+        else:
+            pointer += 1
+            while degree[pointer] != 1:
+                pointer += 1
+            leaf = pointer
+    leaves.append(leaf)
+    parents = np.append(sequence, n - 1)
+    edges = np.stack([np.array(leaves, dtype=np.int64), parents], axis=1)
+    return relabel(gen, edges, n, start=start)
+
+
+def path(gen: Gen, n: int, *, start: int = 1) -> Edges:
+    """Draw a path graph with random labels"""
+    _check_n(n)
+    vertices = np.arange(n, dtype=np.int64)
+    return relabel(gen, np.stack([vertices[:-1], vertices[1:]], axis=1), n, start=start)
+
+
+def star(gen: Gen, n: int, *, start: int = 1) -> Edges:
+    """Draw a star graph with a random center"""
+    _check_n(n)
+    leaves = np.arange(1, n, dtype=np.int64)
+    return relabel(
+        gen, np.stack([np.zeros_like(leaves), leaves], axis=1), n, start=start
+    )
+
+
+def caterpillar(gen: Gen, n: int, spine: int, *, start: int = 1) -> Edges:
+    """Draw a caterpillar, a path called the spine with leaves attached to it
+
+    Args:
+        gen (Gen): Random generator
+        n (int): Number of vertices
+        spine (int): Number of vertices on the spine
+        start (int): Number of the first vertex
+    Returns:
+        Edges: n - 1 edges
+    """
+    _check_n(n)
+    if not 1 <= spine <= n:
+        raise ValueError(f"Length of the spine must be in [1, {n}]: {spine}")
+    spine_vertices = np.arange(spine, dtype=np.int64)
+    legs = np.arange(spine, n, dtype=np.int64)
+    edges = np.concatenate(
+        [
+            np.stack([spine_vertices[:-1], spine_vertices[1:]], axis=1),
+            np.stack([gen.rng.integers(0, spine, size=len(legs)), legs], axis=1),
+        ]
+    )
+    return relabel(gen, edges, n, start=start)
+
+
+def _n_pairs(n: int) -> int:
+    return n * (n - 1) // 2
+
+
+def _pair_codes(u: npt.NDArray[Any], v: npt.NDArray[Any], n: int) -> Edges:
+    """Number the pairs u < v in lexicographic order"""
+    u = u.astype(np.int64)
+    v = v.astype(np.int64)
+    codes: Edges = u * (2 * n - u - 1) // 2 + (v - u - 1)
+    return codes
+
+
+def _decode_pairs(codes: npt.NDArray[Any], n: int) -> Edges:
+    """Inverse of `_pair_codes`"""
+    codes = codes.astype(np.int64)
+
+    def first_code(u: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        return u * (2 * n - u - 1) // 2
+
+    # Solve first_code(u) <= code in floating point, then fix rounding errors
+    discriminant = (2 * n - 1) ** 2 - 8 * codes.astype(np.float64)
+    u = np.floor((2 * n - 1 - np.sqrt(np.maximum(discriminant, 0))) / 2)
+    u = np.clip(u.astype(np.int64), 0, n - 2)
+    u -= first_code(u) > codes
+    u += first_code(u + 1) <= codes
+    v = codes - first_code(u) + u + 1
+    return np.stack([u, v], axis=1)
+
+
+def _distinct_pairs(
+    gen: Gen, n: int, m: int, *, exclude: npt.NDArray[np.int64] | None = None
+) -> Edges:
+    """Draw m distinct pairs u < v of vertices in [0, n) not in `exclude`"""
+    n_excluded = 0 if exclude is None else len(exclude)
+    if m > _n_pairs(n) - n_excluded:
+        raise ValueError(f"Too many edges for {n} vertices: {m + n_excluded}")
+    codes = gen.rng.choice(_n_pairs(n), size=m + n_excluded, replace=False)
+    if exclude is not None:
+        # The remaining codes are still a uniformly random sample
+        codes = codes[~np.isin(codes, _pair_codes(exclude[:, 0], exclude[:, 1], n))]
+    return _decode_pairs(codes[:m], n)
+
+
+def simple_graph(gen: Gen, n: int, m: int, *, start: int = 1) -> Edges:
+    """Draw a graph without self-loops and multi-edges uniformly at random
+
+    Args:
+        gen (Gen): Random generator
+        n (int): Number of vertices
+        m (int): Number of edges
+        start (int): Number of the first vertex
+    Returns:
+        Edges: m edges
+    """
+    _check_n(n)
+    return relabel(gen, _distinct_pairs(gen, n, m), n, start=start)
+
+
+def connected_graph(gen: Gen, n: int, m: int, *, start: int = 1) -> Edges:
+    """Draw a connected graph without self-loops and multi-edges
+
+    The graph is a uniformly random tree plus m - n + 1 edges drawn uniformly
+    from the other pairs of vertices.
+
+    Args:
+        gen (Gen): Random generator
+        n (int): Number of vertices
+        m (int): Number of edges, at least n - 1
+        start (int): Number of the first vertex
+    Returns:
+        Edges: m edges
+    """
+    _check_n(n)
+    if m < n - 1:
+        raise ValueError(f"A connected graph with {n} vertices needs {n - 1} edges")
+    tree_edges = np.sort(tree(gen, n, start=0), axis=1)
+    extra_edges = _distinct_pairs(gen, n, m - (n - 1), exclude=tree_edges)
+    return relabel(gen, np.concatenate([tree_edges, extra_edges]), n, start=start)
+
+
+def dag(gen: Gen, n: int, m: int, *, start: int = 1) -> Edges:
+    """Draw a directed acyclic graph without multi-edges
+
+    The edges are m distinct pairs of vertices drawn uniformly at random,
+    directed along a random topological order.
+
+    Args:
+        gen (Gen): Random generator
+        n (int): Number of vertices
+        m (int): Number of edges
+        start (int): Number of the first vertex
+    Returns:
+        Edges: m directed edges (from, to)
+    """
+    _check_n(n)
+    # Edges from a smaller to a larger vertex are acyclic for any labeling
+    return relabel(gen, _distinct_pairs(gen, n, m), n, start=start, directed=True)
@@ -0,0 +1,134 @@
+import sys
+from types import TracebackType
+from typing import Any, BinaryIO, Self
+
+import numpy as np
+import numpy.typing as npt
+
+_POW10 = np.array([10**k for k in range(1, 20)], dtype=np.uint64)
+"""10^1, ..., 10^19, to count the digits of uint64 values"""
+
+_GROUP_WORDS = np.array(
+    [list(f"{i:04d}".encode()) for i in range(10000)], dtype=np.uint8
+).view(np.uint32)[:, 0]
+"""Four zero-padded digits of each value below 10^4 as a 4-byte word"""
+
+_NEWLINE = ord("\n")
+_MINUS = ord("-")
+
+
+def _format_ints(values: npt.NDArray[Any], sep: int) -> bytes:
+    """Format the rows of a 2-D integer array, each followed by a newline
+
+    All the values are formatted at once, four digits at a time,
+    without converting each value to a Python string.
+
+    Args:
+        values (npt.NDArray[Any]): 2-D array of integers
+        sep (int): ASCII code of the separator between the values in a row
+    Returns:
+        bytes: Formatted values
+    """
+    rows, cols = values.shape
+    if values.size == 0:
+        return b"\n" * int(rows)
+    flat = values.ravel()
+    if flat.dtype.kind == "u":
+        negative = np.zeros(flat.shape, dtype=bool)
+        magnitude = flat.astype(np.uint64)
+    else:
+        flat = flat.astype(np.int64)
+        negative = flat < 0
+        # The absolute value of the minimum int64 wraps around to itself,
+        # whose bit pattern is 2^63 as uint64
+        magnitude = np.abs(flat).astype(np.uint64)
+    n_digits = np.searchsorted(_POW10, magnitude, side="right") + 1
+
+    # Format right-aligned into fixed-width rows of 4-byte words, the last of
+    # which holds the separator, then drop the padding.
+    # One more digit is reserved for the sign.
+    n_groups = int(n_digits.max()) // 4 + 1
+    row_width = 4 * n_groups + 4
+    words = np.empty((len(flat), n_groups + 1), dtype=np.uint32)
+    for k in range(n_groups):
+        magnitude, group = np.divmod(magnitude, 10**4)
+        words[:, n_groups - 1 - k] = _GROUP_WORDS[group]
+    chars = words.view(np.uint8)
+    sep_column = row_width - 4
+    chars[:, sep_column] = sep
+    chars[cols - 1 :: cols, sep_column] = _NEWLINE
+    starts = (sep_column - n_digits - negative).astype(np.uint8)
+    chars[negative, starts[negative]] = _MINUS
+    used = np.arange(row_width, dtype=np.uint8) >= starts[:, None]
+    used[:, sep_column + 1 :] = False
+    return chars[used].tobytes()
+
+
+class Writer:
+    """Buffered writer that formats whole arrays at once
+
+    Use it as a context manager, or call `flush` at the end.
+
+    Examples:
+        >>> with Writer() as out:
+        ...     out.line(n, m)
+        ...     out.array(a)
+        ...     out.matrix(edges)
+    """
+
+    def __init__(self, stream: BinaryIO | None = None) -> None:
+        self.stream = sys.stdout.buffer if stream is None else stream
+        self._chunks: list[bytes] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.flush()
+
+    def write(self, data: str | bytes) -> None:
+        """Write the string as it is"""
+        self._chunks.append(data.encode() if isinstance(data, str) else data)
+
+    def line(self, *values: object) -> None:
+        """Write the values separated by spaces and followed by a newline"""
+        self.write(" ".join(map(str, values)) + "\n")
+
+    def array(self, values: npt.ArrayLike, *, sep: str = " ") -> None:
+        """Write a 1-D array in a line
+
+        Args:
+            values (npt.ArrayLike): Values to write
+            sep (str): Separator between the values
+        """
+        self.matrix(np.asarray(values).reshape(1, -1), sep=sep)
+
+    def lines(self, values: npt.ArrayLike) -> None:
+        """Write a 1-D array, a value per line"""
+        self.matrix(np.asarray(values).reshape(-1, 1))
+
+    def matrix(self, values: npt.ArrayLike, *, sep: str = " ") -> None:
+        """Write a 2-D array, a row per line
+
+        Args:
+            values (npt.ArrayLike): Values to write
+            sep (str): Separator between the values in a row
+        """
+        array = np.asarray(values)
+        if array.ndim != 2:
+            raise ValueError(f"Expected a 2-D array, got {array.ndim}-D")
+        if array.dtype.kind in "biu" and len(sep) == 1 and sep.isascii():
+            self._chunks.append(_format_ints(array, ord(sep)))
+            return
+        self.write("".join(sep.join(map(str, row)) + "\n" for row in array.tolist()))
+
+    def flush(self) -> None:
+        """Write the buffered data to the stream"""
+        self.stream.write(b"".join(self._chunks))
+        self._chunks.clear()
+        self.stream.flush()
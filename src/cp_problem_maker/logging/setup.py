@@ -45,8 +45,10 @@ _CONSOLE_HANDLER.setFormatter(
 )
 _CONSOLE_HANDLER.setLevel(LogLevelEnum.INFO.value)
 
+_LOG_DIR = anchor.SOURCE_ROOT / "data/log"
+_LOG_DIR.mkdir(parents=True, exist_ok=True)
 _FILE_HANDLER = RotatingFileHandler(
-    str(anchor.SOURCE_ROOT / "data/log/cp_problem_maker.log"),
+    str(_LOG_DIR / "cp_problem_maker.log"),
     maxBytes=10 * 1024 * 1024,  # 10MB
     backupCount=5,
 )
@@ -98,6 +98,14 @@ class Problem:
     def outputs_dir(self) -> Path:
         return self.root / self.path_config.outputs
 
+    @property
+    def virtual_tests_file(self) -> Path:
+        return self.root / self.path_config.virtual_tests
+
+    @property
+    def transcripts_dir(self) -> Path:
+        return self.root / self.path_config.transcripts
+
     @property
     def params_file(self) -> Path:
         params_file = self.root / Path(self.path_config.params)
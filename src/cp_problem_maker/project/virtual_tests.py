@@ -0,0 +1,283 @@
+"""Virtual test cases, stored as the way to regenerate them instead of files
+
+`gen-cases` records each test case of a group with `virtual = true` in the
+manifest: the generator, the case ID, the seed and the hashes of the input and
+the answer. The answers are kept in the build cache by their hashes.
+`check` regenerates the inputs into memory right before judging, and fails if
+a regenerated input does not have the recorded hash. The inputs beyond a
+budget of memory are regenerated into a temporary directory on disk.
+"""
+
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, Self
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from cp_problem_maker.buildrun.languages import LanguageRegistry
+from cp_problem_maker.buildrun.languages.build_cache import BuildCache, hash_file
+from cp_problem_maker.buildrun.runners.generator import (
+    GeneratorParams,
+    SourceTestcaseGenerator,
+)
+from cp_problem_maker.buildrun.runners.runner import RunnerParams
+from cp_problem_maker.logging.setup import get_logger
+from cp_problem_maker.utils import _path
+
+logger = get_logger(__name__)
+
+ANSWERS_PROFILE = "answers"
+"""Profile of the build cache to keep the answers in"""
+
+_MEMORY_DIR = Path("/dev/shm")
+"""Directory backed by memory to regenerate the inputs in, if it exists"""
+
+_MEMORY_BUDGET_MB = 256
+"""Default size of the inputs kept in memory at once"""
+
+
+class VirtualTestError(Exception):
+    pass
+
+
+class VirtualTest(BaseModel):
+    generator: str = Field(..., description="Name of the generator")
+    case_id: int = Field(..., description="ID of the test case in the group")
+    seed: int = Field(..., description="Seed passed to the generator")
+    input_sha256: str = Field(..., description="Hash of the input")
+    answer_sha256: str = Field(..., description="Hash of the answer")
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+class VirtualTestManifest(BaseModel):
+    tests: dict[str, VirtualTest] = Field(
+        {}, description="Virtual test cases keyed by the names of the input files"
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+def load_manifest(manifest_file: Path) -> VirtualTestManifest:
+    """Load the manifest of the virtual test cases
+
+    Args:
+        manifest_file (Path): Path to the manifest
+    Returns:
+        VirtualTestManifest: Manifest. Empty if the file does not exist.
+    Raises:
+        VirtualTestError: If the manifest is broken
+    """
+    try:
+        return VirtualTestManifest.model_validate_json(manifest_file.read_bytes())
+    except FileNotFoundError:
+        return VirtualTestManifest()
+    except ValidationError as e:
+        raise VirtualTestError(f"Broken manifest {manifest_file}: {e}") from e
+
+
+def save_manifest(manifest_file: Path, manifest: VirtualTestManifest) -> None:
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest.tests = dict(sorted(manifest.tests.items()))
+    manifest_file.write_text(manifest.model_dump_json(indent=2) + "\n")
+
+
+class VirtualTestStore:
+    """Regenerates the virtual test cases into memory
+
+    The regenerated inputs are kept until the store is closed, so that every
+    solution is judged on the same files.
+    """
+
+    def __init__(
+        self,
+        manifest: VirtualTestManifest,
+        *,
+        generators_dir: Path,
+        solve: Callable[[Path, Path], None] | None = None,
+        build_cache: BuildCache | None = None,
+        memory_budget_mb: int = _MEMORY_BUDGET_MB,
+    ) -> None:
+        """
+        Args:
+            manifest (VirtualTestManifest): Virtual test cases to regenerate
+            generators_dir (Path): Directory of the generators
+            solve (Callable[[Path, Path], None] | None): Function writing the
+                answer for an input file to an output file, called if the
+                answer is not in the cache
+            build_cache (BuildCache | None): Cache to keep the answers in.
+                Defaults to the one of `LanguageRegistry`.
+            memory_budget_mb (int): Size of the inputs kept in memory in MiB,
+                at most half of the free space of the memory filesystem.
+                The other inputs are regenerated on disk.
+        """
+        self.manifest = manifest
+        self.generators_dir = generators_dir
+        self.solve = solve
+        self.build_cache = build_cache or LanguageRegistry.get_build_cache()
+        self._memory_dir = tempfile.TemporaryDirectory(
+            prefix="cp_problem_maker-",
+            dir=_MEMORY_DIR if _MEMORY_DIR.is_dir() else None,
+        )
+        self.memory_dir = Path(self._memory_dir.name)
+        """Directory to write the regenerated test cases in"""
+        self._disk_dir = tempfile.TemporaryDirectory(prefix="cp_problem_maker-")
+        self.disk_dir = Path(self._disk_dir.name)
+        """Directory to write the test cases beyond the memory budget in"""
+        self._memory_budget = min(
+            memory_budget_mb * 1024 * 1024,
+            shutil.disk_usage(self.memory_dir).free // 2,
+        )
+        self._memory_used = 0
+        """Size of the inputs kept in memory"""
+        self._input_files: dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._memory_dir.cleanup()
+        self._disk_dir.cleanup()
+
+    def generate_input(
+        self, name: str, *, generator: str, case_id: int, seed: int
+    ) -> Path:
+        """Run the generator to write the input into memory
+
+        The input is written on disk if the inputs kept in memory exceed the
+        budget, or writing into memory fails, e.g. the memory filesystem is
+        full.
+
+        Args:
+            name (str): Name of the input file
+            generator (str): Name of the generator
+            case_id (int): ID of the test case in the group
+            seed (int): Seed passed to the generator
+        Returns:
+            Path: Input file
+        """
+        generator_file = self.generators_dir / generator
+        lang = LanguageRegistry.get_languege_for_role(generator_file, "generator")
+        cmd = lang.compile(generator_file).exec_cmd
+        generator_params = GeneratorParams(
+            case_group=generator, case_id=case_id, seed=seed
+        )
+
+        def generate(input_file: Path) -> Path:
+            with input_file.open("w") as f:
+                SourceTestcaseGenerator.generate_testcase(
+                    cmd,
+                    generator_params=generator_params,
+                    runner_params=RunnerParams(
+                        stdin=subprocess.DEVNULL, stdout=f, check_returncode=True
+                    ),
+                )
+            return input_file
+
+        if self._memory_used >= self._memory_budget:
+            return generate(self.disk_dir / name)
+        try:
+            return generate(self.memory_dir / name)
+        except (OSError, subprocess.CalledProcessError) as e:
+            (self.memory_dir / name).unlink(missing_ok=True)
+            logger.warning("Regenerating %s on disk: %s", name, e)
+            return generate(self.disk_dir / name)
+
+    def store_answer(self, answer_file: Path) -> str:
+        """Copy the answer into the cache
+
+        Args:
+            answer_file (Path): Answer file
+        Returns:
+            str: Hash of the answer
+        """
+        answer_sha256 = hash_file(answer_file)
+        with self.build_cache.staging_dir(ANSWERS_PROFILE) as staging_dir:
+            # The staging directory is on the same filesystem as the cache
+            staged_file = staging_dir / answer_file.name
+            _path.copy_file(answer_file, staged_file)
+            self.build_cache.store(
+                ANSWERS_PROFILE, answer_sha256, artifact=staged_file, deps=[]
+            )
+        return answer_sha256
+
+    def _test(self, name: str) -> VirtualTest:
+        if name not in self.manifest.tests:
+            raise VirtualTestError(
+                f"Virtual test case {name} is not recorded. Run `gen-cases` first."
+            )
+        return self.manifest.tests[name]
+
+    def input_file(self, name: str) -> Path:
+        """Regenerate the input of the test case, once per store
+
+        Args:
+            name (str): Name of the input file
+        Returns:
+            Path: Input file in memory
+        Raises:
+            VirtualTestError: If the regenerated input has a different hash
+        """
+        with self._lock:
+            if name in self._input_files:
+                return self._input_files[name]
+            test = self._test(name)
+            logger.info("Regenerating the virtual test case %s", name)
+            input_file = self.generate_input(
+                name, generator=test.generator, case_id=test.case_id, seed=test.seed
+            )
+            if hash_file(input_file) != test.input_sha256:
+                raise VirtualTestError(
+                    f"Regenerated input {name} differs from the recorded one. "
+                    f"The generator {test.generator} has changed or is not "
+                    "deterministic. Run `gen-cases` again."
+                )
+            if input_file.parent == self.memory_dir:
+                self._memory_used += input_file.stat().st_size
+            self._input_files[name] = input_file
+            return input_file
+
+    def answer_file(self, name: str) -> Path:
+        """Look up the answer of the test case in the cache
+
+        The answer is generated again from the input if it is not cached.
+
+        Args:
+            name (str): Name of the input file
+        Returns:
+            Path: Answer file
+        Raises:
+            VirtualTestError: If the generated answer has a different hash
+        """
+        test = self._test(name)
+        cached = self.build_cache.lookup(ANSWERS_PROFILE, test.answer_sha256)
+        if cached is not None:
+            return cached
+        if self.solve is None:
+            raise VirtualTestError(f"Answer of {name} is not in the cache")
+        input_file = self.input_file(name)
+        answer_file = input_file.with_suffix(".out")
+        self.solve(input_file, answer_file)
+        answer_sha256 = self.store_answer(answer_file)
+        answer_file.unlink()
+        if answer_sha256 != test.answer_sha256:
+            raise VirtualTestError(
+                f"Answer of {name} differs from the recorded one. "
+                "Run `gen-cases` again."
+            )
+        cached = self.build_cache.lookup(ANSWERS_PROFILE, answer_sha256)
+        assert cached is not None
+        return cached
@@ -1,11 +1,14 @@
 import argparse
 
+from . import bench as BenchCommand
+from . import build as BuildCommand
 from . import check as CheckCommand
 from . import config as ConfigCommand
 from . import gen_cases as GenCasesCommand
 from . import gen_params as GenParamsCommand
 from . import init as InitCommand
 from . import test as TestCommand
+from . import verify as VerifyCommand
 
 SUBCOMMAND_DEST = "subcommand"
 
@@ -13,17 +16,24 @@ SUBCOMMAND_DEST = "subcommand"
 def add_parsers(
     subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
 ) -> None:
+    BenchCommand.add_parser(subparsers)
+    BuildCommand.add_parser(subparsers)
     CheckCommand.add_parser(subparsers)
     ConfigCommand.add_parser(subparsers)
     GenCasesCommand.add_parser(subparsers)
     GenParamsCommand.add_parser(subparsers)
     InitCommand.add_parser(subparsers)
     TestCommand.add_parser(subparsers)
+    VerifyCommand.add_parser(subparsers)
 
 
 def run(args: argparse.Namespace) -> None:
     subcommand: str = getattr(args, SUBCOMMAND_DEST)
     match subcommand:
+        case BenchCommand._COMMAND_NAME:
+            BenchCommand.run(args)
+        case BuildCommand._COMMAND_NAME:
+            BuildCommand.run(args)
         case CheckCommand._COMMAND_NAME:
             CheckCommand.run(args)
         case ConfigCommand._COMMAND_NAME:
@@ -36,5 +46,7 @@ def run(args: argparse.Namespace) -> None:
             InitCommand.run(args)
         case TestCommand._COMMAND_NAME:
             TestCommand.run(args)
+        case VerifyCommand._COMMAND_NAME:
+            VerifyCommand.run(args)
         case _:
             raise ValueError(f"Unknown subcommand: {subcommand}")
@@ -0,0 +1,431 @@
+import argparse
+import itertools
+import statistics
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from cp_problem_maker.buildrun.languages import (
+    ILanguage,
+    LanguageRegistry,
+    SolverCpp,
+)
+from cp_problem_maker.buildrun.languages.build_cache import BuildCache
+from cp_problem_maker.buildrun.runners import runner
+from cp_problem_maker.buildrun.runners.checker import CheckerParams, get_checker_type
+from cp_problem_maker.config import tool_config
+from cp_problem_maker.logging.setup import get_logger
+from cp_problem_maker.project.problem import Problem, ProblemWithConfig
+from cp_problem_maker.subcommands import gen_params
+
+_COMMAND_NAME = "bench"
+
+logger = get_logger(__name__)
+
+_EMPTY_PROGRAMS: dict[str, str] = {
+    "empty.cpp": "#include <iostream>\nint main() { std::cout << std::flush; }\n",
+    "empty.py": "pass\n",
+}
+"""Programs that do nothing but start up, keyed by their file names"""
+
+_WARMUP_RUNS = 2
+"""Runs excluded from the statistics, so that the page cache is warm"""
+
+_PING_INTERACTOR = """\
+#include <cstdio>
+#include <cstdlib>
+int main(int, char** argv) {
+    long rounds = std::atol(argv[1]);
+    for (long i = 0; i < rounds; i++) {
+        std::printf("%ld\\n", i);
+        std::fflush(stdout);
+        long x;
+        if (std::scanf("%ld", &x) != 1 || x != i) return 1;
+    }
+    std::printf("-1\\n");
+    std::fflush(stdout);
+}
+"""
+"""Interactor sending a number per round trip, and expecting it back"""
+
+_ECHO_SOLVERS: dict[str, str] = {
+    "echo.cpp": """\
+#include <cstdio>
+int main() {
+    long x;
+    while (std::scanf("%ld", &x) == 1 && x >= 0) {
+        std::printf("%ld\\n", x);
+        std::fflush(stdout);
+    }
+}
+""",
+    "echo.py": """\
+import sys
+
+for line in sys.stdin:
+    if line == "-1\\n":
+        break
+    sys.stdout.write(line)
+    sys.stdout.flush()
+""",
+}
+"""Solvers answering each query of `_PING_INTERACTOR`, keyed by their file names"""
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = subparsers.add_parser(
+        _COMMAND_NAME,
+        help="Measure the overhead of running programs",
+        description="Measure the overhead of running programs",
+    )
+    parser.add_argument(
+        "target",
+        help="What to measure. 'startup' measures the startup time of an empty program per language and build profile. 'interaction' measures the round trips per second between an interactive judge and a solver that do nothing else.",  # noqa: E501
+        choices=["startup", "interaction"],
+    )
+    parser.add_argument("-p", "--path", help="Path to the project")
+    parser.add_argument(
+        "-n", "--runs", type=int, default=20, help="Number of runs per program"
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=10000,
+        help="Number of round trips per run of 'interaction'",
+    )
+    parser.add_argument(
+        "-s",
+        "--solution",
+        help="Solution to run against the interactor of the problem on each test case in 'interaction', in addition to the echo solvers",  # noqa: E501
+    )
+    return parser
+
+
+def run(args: argparse.Namespace) -> None:
+    path: Path | None = None
+    if args.path is not None:
+        path = Path(args.path)
+    bench(
+        path,
+        target=args.target,
+        runs=args.runs,
+        rounds=args.rounds,
+        solution=args.solution,
+    )
+
+
+@dataclass
+class StartupStat:
+    label: str
+    """Language and build profile"""
+    times: list[float]
+    """Elapsed times in seconds"""
+
+
+@dataclass
+class InteractionStat:
+    label: str
+    """Language of the solver and size of the pipes"""
+    rounds: int
+    """Number of round trips per run"""
+    times: list[float]
+    """Elapsed times of the solver in seconds"""
+
+
+@dataclass
+class MessageRateStat:
+    label: str
+    """Name of the test case"""
+    messages: int
+    """Number of messages exchanged per run, in both directions"""
+    times: list[float]
+    """Elapsed times of the solver in seconds"""
+
+
+def _solver_languages(
+    config: tool_config._Language, file: Path
+) -> list[tuple[str, ILanguage]]:
+    language_type = ILanguage.detect_language(file).for_role("solver")
+    language = LanguageRegistry.get_languege(language_type)
+    label = f"{language.get_name()} ({getattr(language, 'profile', 'default')})"
+    languages = [(label, language)]
+    if isinstance(language, SolverCpp):
+        # Compare static and dynamic linking regardless of the configuration
+        build_cache = BuildCache(
+            Path(config.cache.path).expanduser(),
+            max_size_mb=config.cache.max_size_mb,
+            profile_max_size_mb=config.cache.profile_max_size_mb,
+        )
+        languages = []
+        for static_link in (False, True):
+            cpp_config = config.cpp.model_copy(deep=True)
+            cpp_config.solver = (
+                cpp_config.solver or tool_config._CppOverride()
+            ).model_copy(update={"static_link": static_link})
+            cpp = SolverCpp(cpp_config, build_cache)
+            linkage = "static" if cpp.links_statically() else "dynamic"
+            languages.append((f"{label}, {linkage}", cpp))
+    return languages
+
+
+def bench_startup(config: tool_config._Language, *, runs: int) -> list[StartupStat]:
+    """Measure the startup time of an empty program per language and build profile
+
+    The programs are run by `runner.run`, so the times are measured in the
+    same way as the execution times of the solutions.
+
+    Args:
+        config (tool_config._Language): Language configuration
+        runs (int): Number of measured runs per program
+    Returns:
+        list[StartupStat]: Elapsed times per language and build profile
+    """
+    stats: list[StartupStat] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, code in _EMPTY_PROGRAMS.items():
+            file = Path(tmp_dir) / name
+            file.write_text(code)
+            for label, language in _solver_languages(config, file):
+                exec_cmd = language.compile(file).exec_cmd
+                times: list[float] = []
+                for i in range(_WARMUP_RUNS + runs):
+                    run_result = runner.run(
+                        exec_cmd,
+                        runner_params=runner.RunnerParams(
+                            stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL,
+                            check_returncode=True,
+                        ),
+                    )
+                    if i >= _WARMUP_RUNS:
+                        times.append(run_result.elapsed_time)
+                stats.append(StartupStat(label=label, times=times))
+    return stats
+
+
+def bench_interaction(
+    config: tool_config._Config, *, runs: int, rounds: int
+) -> list[InteractionStat]:
+    """Measure the round trips per second between an interactive judge and a solver
+
+    A C++ interactor sends a number per round trip, and solvers in each
+    language echo it back. They are run by `runner.run_interactive_judge`,
+    with the default pipes and the ones of `pipe_size_kb` if configured, so
+    the rate is the upper bound of any interactive solution. Each is also run
+    with the messages counted, which forwards them through the runner, to
+    measure the cost of `count_messages` and of the transcripts.
+
+    Args:
+        config (tool_config._Config): Tool configuration
+        runs (int): Number of measured runs per solver and pipe size
+        rounds (int): Number of round trips per run
+    Returns:
+        list[InteractionStat]: Elapsed times per solver and pipe size
+    """
+    pipe_sizes: list[int | None] = [None]
+    if config.interactive.pipe_size_kb is not None:
+        pipe_sizes.append(config.interactive.pipe_size_kb)
+    stats: list[InteractionStat] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        interactor_file = Path(tmp_dir) / "ping.cpp"
+        interactor_file.write_text(_PING_INTERACTOR)
+        interactor_lang = LanguageRegistry.get_languege_for_role(
+            interactor_file, "checker"
+        )
+        judge_cmd = [*interactor_lang.compile(interactor_file).exec_cmd, str(rounds)]
+        for name, code in _ECHO_SOLVERS.items():
+            solver_file = Path(tmp_dir) / name
+            solver_file.write_text(code)
+            solver_lang = LanguageRegistry.get_languege_for_role(solver_file, "solver")
+            solver_cmd = solver_lang.compile(solver_file).exec_cmd
+            for pipe_size_kb, forwarded in itertools.product(pipe_sizes, (False, True)):
+                times: list[float] = []
+                for i in range(_WARMUP_RUNS + runs):
+                    run_result = runner.run_interactive_judge(
+                        judge_cmd,
+                        solver_cmd,
+                        params=runner.InteractiveJudgeParams(
+                            stderr=subprocess.DEVNULL,
+                            judge_stderr=subprocess.DEVNULL,
+                            pipe_size_kb=pipe_size_kb,
+                            count_messages=forwarded,
+                        ),
+                    )
+                    if run_result.returncode:
+                        raise RuntimeError(f"Interaction with {name} failed")
+                    if i >= _WARMUP_RUNS:
+                        times.append(run_result.elapsed_time)
+                pipe = "default" if pipe_size_kb is None else f"{pipe_size_kb} KiB"
+                label = f"{solver_lang.get_name()} ({pipe} pipes"
+                label += ", counted)" if forwarded else ")"
+                stats.append(InteractionStat(label=label, rounds=rounds, times=times))
+    return stats
+
+
+def bench_solution_interaction(
+    problem_with_config: ProblemWithConfig, solution: str, *, runs: int
+) -> list[MessageRateStat]:
+    """Measure the messages per second between the interactor and a solution
+
+    The interactor of the problem is run against the solution on each test
+    case as `check --interactive` does, with the messages counted by the
+    runner. Virtual test cases are skipped.
+
+    Args:
+        problem_with_config (ProblemWithConfig): Problem and its configuration
+        solution (str): Name of the solution
+        runs (int): Number of measured runs per test case
+    Returns:
+        list[MessageRateStat]: Messages and elapsed times per test case
+    Raises:
+        RuntimeError: If the interactor does not accept the solution, or the
+            interaction exceeds the time limit
+    """
+    problem = problem_with_config.problem
+    problem_cfg = problem_with_config.problem_config
+    config = problem_with_config.config
+    solution_file = problem.solutions_dir / solution
+    if not solution_file.exists():
+        raise FileNotFoundError(f"Solution '{solution}' does not exist")
+    checker = get_checker_type(config.checker.style)(config.checker)
+    checker_exec_cmd = (
+        LanguageRegistry.get_languege_for_role(problem.checker_file, "checker")
+        .compile(problem.checker_file)
+        .exec_cmd
+    )
+    solver_cmd = (
+        LanguageRegistry.get_languege_for_role(solution_file, "solver")
+        .compile(solution_file)
+        .exec_cmd
+    )
+    stats: list[MessageRateStat] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = Path(tmp_dir) / "output"
+        for test in problem_cfg.tests:
+            if test.virtual:
+                logger.info("Skipping the virtual test cases of %s", test.name)
+                continue
+            for test_id in range(test.number):
+                input_file = Problem.input_file(problem.inputs_dir, test.name, test_id)
+                checker_cmd = checker.checker_cmd(
+                    checker_exec_cmd,
+                    checker_params=CheckerParams(
+                        input_file=input_file,
+                        output_file=output_file,
+                        answer_file=Problem.output_file(
+                            problem.outputs_dir, test.name, test_id
+                        ),
+                    ),
+                )
+                messages = 0
+                times: list[float] = []
+                for i in range(_WARMUP_RUNS + runs):
+                    try:
+                        run_result = runner.run_interactive_judge(
+                            checker_cmd,
+                            solver_cmd,
+                            params=runner.InteractiveJudgeParams(
+                                stderr=subprocess.DEVNULL,
+                                judge_stderr=subprocess.DEVNULL,
+                                timeout=problem_cfg.timelimit,
+                                memory_limit=problem_cfg.memorylimit,
+                                stack_limit=problem_cfg.stacklimit,
+                                pipe_size_kb=config.interactive.pipe_size_kb,
+                                count_messages=True,
+                            ),
+                        )
+                    except subprocess.TimeoutExpired as e:
+                        raise RuntimeError(
+                            f"Interaction with {solution} on {input_file.name} exceeded the time limit of {problem_cfg.timelimit} sec"  # noqa: E501
+                        ) from e
+                    if run_result.returncode:
+                        raise RuntimeError(
+                            f"Interactor did not accept {solution} on {input_file.name}"
+                        )
+                    if i >= _WARMUP_RUNS:
+                        assert run_result.interaction is not None
+                        messages = (
+                            run_result.interaction.to_solver.messages
+                            + run_result.interaction.to_judge.messages
+                        )
+                        times.append(run_result.elapsed_time)
+                stats.append(
+                    MessageRateStat(
+                        label=input_file.name, messages=messages, times=times
+                    )
+                )
+    return stats
+
+
+def bench(
+    path: Path | None,
+    *,
+    target: str,
+    runs: int,
+    rounds: int,
+    solution: str | None = None,
+) -> None:
+    logger.debug("Passed path: %s", path)
+    if runs <= 0:
+        raise ValueError("Number of runs must be positive")
+    problem_with_config = ProblemWithConfig(path, search_root=True)
+    LanguageRegistry.load_config(problem_with_config.config.language)
+    # The interactor and the solution may read the runtime parameters
+    gen_params.export_runtime_params(problem_with_config)
+    match target:
+        case "startup":
+            logger.info("Measuring the startup time (%d runs per program)", runs)
+            stats = bench_startup(problem_with_config.config.language, runs=runs)
+            label_width = max(len(stat.label) for stat in stats)
+            print(f"{'Profile':<{label_width}}  {'Mean':>8}  {'Min':>8}  {'Max':>8}")
+            for stat in stats:
+                mean_ms = statistics.mean(stat.times) * 1000
+                min_ms = min(stat.times) * 1000
+                max_ms = max(stat.times) * 1000
+                print(
+                    f"{stat.label:<{label_width}}  {mean_ms:6.2f}ms  {min_ms:6.2f}ms  {max_ms:6.2f}ms"  # noqa: E501
+                )
+        case "interaction":
+            if rounds <= 0:
+                raise ValueError("Number of round trips must be positive")
+            logger.info(
+                "Measuring the round trips (%d runs of %d round trips)", runs, rounds
+            )
+            interaction_stats = bench_interaction(
+                problem_with_config.config, runs=runs, rounds=rounds
+            )
+            label_width = max(len(stat.label) for stat in interaction_stats)
+            print(f"{'Solver':<{label_width}}  {'Round trip':>10}  {'Rate':>12}")
+            for interaction_stat in interaction_stats:
+                seconds = statistics.median(interaction_stat.times)
+                round_trip_us = seconds / interaction_stat.rounds * 10**6
+                rate = interaction_stat.rounds / seconds
+                print(
+                    f"{interaction_stat.label:<{label_width}}  {round_trip_us:8.2f}us  {rate:8.0f} /sec"  # noqa: E501
+                )
+            if solution is None:
+                return
+            logger.info(
+                "Measuring the messages of %s (%d runs per test case)", solution, runs
+            )
+            message_stats = bench_solution_interaction(
+                problem_with_config, solution, runs=runs
+            )
+            if not message_stats:
+                logger.warning("No test case to run %s on", solution)
+                return
+            label_width = max(len(stat.label) for stat in message_stats)
+            print()
+            print(f"{'Test case':<{label_width}}  {'Messages':>8}  {'Rate':>12}")
+            for message_stat in message_stats:
+                seconds = statistics.median(message_stat.times)
+                rate = message_stat.messages / seconds
+                print(
+                    f"{message_stat.label:<{label_width}}  {message_stat.messages:8d}  {rate:8.0f} /sec"  # noqa: E501
+                )
+        case _:
+            raise ValueError(f"Unknown target: {target}")
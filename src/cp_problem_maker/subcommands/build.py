@@ -0,0 +1,155 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from cp_problem_maker.buildrun.languages import (
+    CompileError,
+    ILanguage,
+    LanguageRegistry,
+    Role,
+    TextCat,
+)
+from cp_problem_maker.logging.setup import get_logger
+from cp_problem_maker.project.problem import ProblemWithConfig
+
+_COMMAND_NAME = "build"
+
+logger = get_logger(__name__)
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = subparsers.add_parser(
+        _COMMAND_NAME,
+        help="Compile all the solutions, generators, the checker and the verifier",
+        description="Compile all the solutions, generators, the checker and the verifier",  # noqa: E501
+    )
+    parser.add_argument("-p", "--path", help="Path to the project")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of parallel compilations. Defaults to the number of CPUs.",
+    )
+    return parser
+
+
+def run(args: argparse.Namespace) -> None:
+    path: Path | None = None
+    if args.path is not None:
+        path = Path(args.path)
+    build(path, jobs=args.jobs)
+
+
+class BuildError(Exception):
+    pass
+
+
+@dataclass
+class _BuildTarget:
+    file: Path
+    language: ILanguage
+
+
+def _collect_targets(
+    problem_with_config: ProblemWithConfig,
+    *,
+    extra_solutions: list[Path],
+    sanitize: bool,
+) -> list[_BuildTarget]:
+    problem = problem_with_config.problem
+    problem_cfg = problem_with_config.problem_config
+
+    files: list[tuple[Path, Role]] = []
+    for solution in problem_cfg.solutions:
+        files.append((problem.solutions_dir / solution.name, "solver"))
+    for file in extra_solutions:
+        files.append((file, "solver"))
+    if sanitize:
+        files += [
+            (file, "sanitizer")
+            for file, _ in files
+            if ILanguage.detect_language(file).has_sanitizer()
+        ]
+    for test in problem_cfg.tests:
+        file = problem.generators_dir / test.name
+        if ILanguage.detect_language(file) != TextCat:
+            files.append((file, "generator"))
+    files.append((problem.checker_file, "checker"))
+    if problem_cfg.input_format is None:
+        files.append((problem.verifier_file, "verifier"))
+
+    targets = [
+        _BuildTarget(
+            file=file, language=LanguageRegistry.get_languege_for_role(file, role)
+        )
+        for file, role in files
+    ]
+
+    unique_targets: dict[tuple[Path, int], _BuildTarget] = {}
+    for target in targets:
+        if not target.file.exists():
+            logger.debug("Skipping missing file %s", target.file)
+            continue
+        unique_targets.setdefault((target.file.resolve(), id(target.language)), target)
+    return list(unique_targets.values())
+
+
+def _compile(target: _BuildTarget) -> CompileError | None:
+    try:
+        target.language.compile(target.file)
+    except CompileError as e:
+        return e
+    return None
+
+
+def build_problem(
+    problem_with_config: ProblemWithConfig,
+    *,
+    jobs: int | None,
+    strict: bool,
+    extra_solutions: list[Path] | None = None,
+    sanitize: bool = False,
+) -> None:
+    """Compile all the artifacts of the problem concurrently
+
+    `LanguageRegistry` must be loaded with the configuration of the problem.
+
+    Args:
+        problem_with_config (ProblemWithConfig): Problem to build
+        jobs (int | None):
+            Number of parallel compilations. Defaults to the number of CPUs.
+        strict (bool):
+            If True, raise an error if some files fail to compile.
+            Otherwise the failures are only reported, and are raised again
+            when the files are actually used.
+        extra_solutions (list[Path] | None):
+            Solutions to build in addition to the configured ones
+        sanitize (bool): If True, also build the sanitizer builds of the
+            solutions in the languages that have them
+    Raises:
+        BuildError: If `strict` is True and some files fail to compile
+    """
+    targets = _collect_targets(
+        problem_with_config, extra_solutions=extra_solutions or [], sanitize=sanitize
+    )
+    logger.info("Building %d files", len(targets))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        errors = [e for e in executor.map(_compile, targets) if e is not None]
+
+    for error in errors:
+        logger.error("Failed to compile %s:\n%s", error.file_path, error.stderr)
+    if errors and strict:
+        raise BuildError(
+            f"Failed to compile: {sorted(str(e.file_path) for e in errors)}"
+        )
+
+
+def build(path: Path | None, *, jobs: int | None) -> None:
+    logger.debug("Passed path: %s", path)
+    logger.info("Building the problem")
+    problem_with_config = ProblemWithConfig(path, search_root=True)
+    LanguageRegistry.load_config(problem_with_config.config.language)
+    build_problem(problem_with_config, jobs=jobs, strict=True)
@@ -1,17 +1,22 @@
 import argparse
+import contextlib
+import dataclasses
 import os
+import re
+import shutil
 import subprocess
 import sys
 from collections import defaultdict
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Mapping, Optional
+from typing import Callable, Mapping, Optional
 
 from pydantic import BaseModel, ConfigDict
 
-from cp_problem_maker.buildrun.languages.cpp import Cpp, SolverCpp
+from cp_problem_maker.buildrun.languages.language import CompileError, ILanguage
 from cp_problem_maker.buildrun.languages.registry import LanguageRegistry
 from cp_problem_maker.buildrun.runners import runner
 from cp_problem_maker.buildrun.runners.checker import (
@@ -21,21 +26,27 @@ from cp_problem_maker.buildrun.runners.checker import (
     ITestcaseChecker,
     get_checker_type,
 )
+from cp_problem_maker.buildrun.runners.interaction import Transcript
 from cp_problem_maker.buildrun.runners.runner import (
+    IdlenessLimitExceeded,
     InteractiveJudgeParams,
     JudgeTimeoutExpired,
     RunnerParams,
     RunResult,
+    SolverRuntimeError,
     SolverTimeoutExpired,
+    StackLimit,
 )
 from cp_problem_maker.buildrun.runners.solver import (
     SolveResult,
     SolverStatusEnum,
     SourceTestcaseSolver,
 )
-from cp_problem_maker.config import problem_config
+from cp_problem_maker.config import problem_config, tool_config
 from cp_problem_maker.logging.setup import get_logger
 from cp_problem_maker.project.problem import Problem, ProblemWithConfig
+from cp_problem_maker.project.virtual_tests import VirtualTestStore, load_manifest
+from cp_problem_maker.subcommands import build, gen_params
 
 _COMMAND_NAME = "check"
 
@@ -62,6 +73,16 @@ def add_parser(
         action="store_true",
         help="Use interactive judge",
     )
+    parser.add_argument(
+        "--sanitize",
+        action="store_true",
+        help="Also run sanitizer builds of the C++ solutions on all tests, untimed",
+    )
+    parser.add_argument(
+        "--toolchains",
+        action="store_true",
+        help="Also judge the solutions built with every toolchain variant in 'language.cpp.toolchains'",  # noqa: E501
+    )
     return parser
 
 
@@ -75,6 +96,8 @@ def run(args: argparse.Namespace) -> None:
         check_all=args.all,
         no_stderr=args.no_stderr,
         interactive=args.interactive,
+        sanitize=args.sanitize,
+        toolchains=args.toolchains,
     )
 
 
@@ -120,6 +143,7 @@ class JudgeStatusEnum(Enum):
     RuntimeError = "RE"
     TimeLimitExceeded = "TLE"
     JudgeTimeLimitExceeded = "J_TLE"
+    IdlenessLimitExceeded = "ILE"
     PresentationError = "PE"
     Fail = "FAIL"
 
@@ -135,7 +159,22 @@ class JudgeResult(BaseModel):
         lines.append(f"Status = {self.status.value}")
         if self.run_result is not None:
             lines.append(f"Time = {self.run_result.elapsed_time * 1000:.0f} ms")
+            if self.run_result.cpu_time is not None:
+                lines.append(f"CPU = {self.run_result.cpu_time * 1000:.0f} ms")
+            if self.run_result.judge_cpu_time is not None:
+                lines.append(
+                    f"Judge CPU = {self.run_result.judge_cpu_time * 1000:.0f} ms"
+                )
             lines.append(f"Memory = {self.run_result.used_memory_mb:.0f} MiB")
+            if self.run_result.interaction is not None:
+                to_judge = self.run_result.interaction.to_judge
+                to_solver = self.run_result.interaction.to_solver
+                lines.append(
+                    f"Sent = {to_judge.messages} messages ({to_judge.bytes} B)"
+                )
+                lines.append(
+                    f"Received = {to_solver.messages} messages ({to_solver.bytes} B)"
+                )
         else:
             lines.append("Time = N/A ms")
             lines.append("Memory = N/A MiB")
@@ -146,6 +185,8 @@ class JudgeSummary(BaseModel):
     status_count: Mapping[JudgeStatusEnum, int]
     max_time: float
     max_memory: float
+    statuses: Mapping[str, JudgeStatusEnum]
+    """Status of each test, keyed by the name of the input file"""
 
 
 @dataclass
@@ -153,7 +194,75 @@ class _SolutionParams:
     file: Path
     timeout: float
     memory_limit: int | None
+    stack_limit: StackLimit | None
     no_stderr: bool
+    language: ILanguage | None = None
+    """Language to build the solution with. Defaults to the solver language."""
+    interactive: tool_config._Interactive = field(
+        default_factory=tool_config._Interactive
+    )
+    """Configuration for the interactive judge"""
+    transcripts_dir: Path | None = None
+    """Directory to write the transcripts of the interactive runs in"""
+
+
+@dataclass
+class _Testcases:
+    inputs_dir: Path
+    outputs_dir: Path
+    virtual_tests: VirtualTestStore | None = None
+    """Store of the virtual test cases. Required if a test group is virtual."""
+
+    def files(self, test: problem_config._Test, test_id: int) -> tuple[Path, Path]:
+        """Get the input and the answer of the test case
+
+        Virtual test cases are regenerated into memory.
+
+        Args:
+            test (problem_config._Test): Test group
+            test_id (int): ID of the test case in the group
+        Returns:
+            tuple[Path, Path]: Input file and answer file
+        """
+        input_file = Problem.input_file(self.inputs_dir, test.name, test_id)
+        if not test.virtual:
+            return input_file, Problem.output_file(self.outputs_dir, test.name, test_id)
+        assert self.virtual_tests is not None
+        return (
+            self.virtual_tests.input_file(input_file.name),
+            self.virtual_tests.answer_file(input_file.name),
+        )
+
+
+def _answer_solver(
+    problem_with_config: ProblemWithConfig, *, interactive: bool
+) -> Callable[[Path, Path], None]:
+    """Get the function generating the answers of the virtual test cases
+    missing in the cache, in the same way as `gen-cases`"""
+    problem = problem_with_config.problem
+    problem_cfg = problem_with_config.problem_config
+    solution_file = problem.solutions_dir / problem_cfg.expected_solution.name
+
+    def solve(input_file: Path, answer_file: Path) -> None:
+        if interactive:
+            shutil.copyfile(input_file, answer_file)
+            return
+        logger.info("Generating the answer of the virtual test case %s", input_file)
+        lang = LanguageRegistry.get_languege_for_role(solution_file, "solver")
+        with input_file.open() as inf, answer_file.open("w") as ouf:
+            SourceTestcaseSolver.solve_testcase(
+                lang.compile(solution_file).exec_cmd,
+                runner_params=RunnerParams(
+                    stdin=inf,
+                    stdout=ouf,
+                    check_returncode=True,
+                    timeout=problem_cfg.timelimit,
+                    memory_limit=problem_cfg.memorylimit,
+                    stack_limit=problem_cfg.stacklimit,
+                ),
+            )
+
+    return solve
 
 
 @dataclass
@@ -172,9 +281,9 @@ def _solve(
     logger.info(
         "Solving the testcase %s by the solution %s", input_file.name, params.file.name
     )
-    lang = LanguageRegistry.get_languege(params.file)
-    if isinstance(lang, Cpp):
-        lang = LanguageRegistry.get_languege(SolverCpp)
+    lang = params.language or LanguageRegistry.get_languege_for_role(
+        params.file, "solver"
+    )
     exec_cmd = lang.compile(params.file).exec_cmd
     with input_file.open("r") as inf, output_file.open("w") as ouf:
         solve_result = SourceTestcaseSolver.solve_testcase(
@@ -186,6 +295,7 @@ def _solve(
                 check_returncode=False,
                 timeout=params.timeout,
                 memory_limit=params.memory_limit,
+                stack_limit=params.stack_limit,
             ),
         )
     return solve_result
@@ -197,7 +307,9 @@ def _check(checker: ITestcaseChecker, *, params: _CheckerParams) -> CheckResult:
         params.input_file.name,
         params.checker_file.name,
     )
-    checker_lang = LanguageRegistry.get_languege(params.checker_file)
+    checker_lang = LanguageRegistry.get_languege_for_role(
+        params.checker_file, "checker"
+    )
     checker_cmd = checker_lang.compile(params.checker_file).exec_cmd
     with params.output_file.open("r") as ouf:
         check_result = checker.check_testcase(
@@ -271,8 +383,12 @@ def _check_interactive(
     checker_params: _CheckerParams,
     solution_params: _SolutionParams,
 ) -> CheckResult:
-    checker_lang = LanguageRegistry.get_languege(checker_params.checker_file)
-    solver_lang = LanguageRegistry.get_languege(solution_params.file)
+    checker_lang = LanguageRegistry.get_languege_for_role(
+        checker_params.checker_file, "checker"
+    )
+    solver_lang = solution_params.language or LanguageRegistry.get_languege_for_role(
+        solution_params.file, "solver"
+    )
     checker = checker_params.checker
     checker_cmd = checker.checker_cmd(
         checker_lang.compile(checker_params.checker_file).exec_cmd,
@@ -284,16 +400,35 @@ def _check_interactive(
     )
     solver_cmd = solver_lang.compile(solution_params.file).exec_cmd
     stderr = Path(os.devnull).open("w") if solution_params.no_stderr else sys.stderr
-    run_result = runner.run_interactive_judge(
-        judge_cmd=checker_cmd,
-        solver_cmd=solver_cmd,
-        params=InteractiveJudgeParams(
-            stderr=stderr,
-            timeout=solution_params.timeout,
-            memory_limit=solution_params.memory_limit,
-            judge_stderr=stderr,
-        ),
-    )
+    transcript: Transcript | None = None
+    transcript_lines = solution_params.interactive.transcript_lines
+    if solution_params.transcripts_dir is not None and transcript_lines is not None:
+        transcript = Transcript(transcript_lines)
+    try:
+        run_result = runner.run_interactive_judge(
+            judge_cmd=checker_cmd,
+            solver_cmd=solver_cmd,
+            params=InteractiveJudgeParams(
+                stderr=stderr,
+                timeout=solution_params.timeout,
+                memory_limit=solution_params.memory_limit,
+                stack_limit=solution_params.stack_limit,
+                judge_stderr=stderr,
+                pipe_size_kb=solution_params.interactive.pipe_size_kb,
+                cpu_time_limit=solution_params.interactive.cpu_time_limit,
+                count_messages=solution_params.interactive.count_messages,
+                transcript=transcript,
+                idleness_limit=solution_params.interactive.idleness_limit or None,
+            ),
+        )
+    finally:
+        if transcript is not None:
+            # Also on TLE and RE, where the transcript matters most
+            assert solution_params.transcripts_dir is not None
+            transcript_file = solution_params.transcripts_dir / (
+                checker_params.input_file.stem + ".txt.gz"
+            )
+            transcript.save(transcript_file)
     status = checker.get_status_from_exit_code(run_result.returncode)
     return CheckResult(run_result=run_result, status=status)
 
@@ -307,14 +442,21 @@ def _judge_interactive(
         check_result = _check_interactive(
             checker_params=checker_params, solution_params=solution_params
         )
-    except SolverTimeoutExpired:
-        return JudgeResult(run_result=None, status=JudgeStatusEnum.TimeLimitExceeded)
-    except JudgeTimeoutExpired:
+    # The partial results tell a slow judge from a slow solver
+    except SolverTimeoutExpired as e:
         return JudgeResult(
-            run_result=None, status=JudgeStatusEnum.JudgeTimeLimitExceeded
+            run_result=e.run_result, status=JudgeStatusEnum.TimeLimitExceeded
         )
-    except subprocess.CalledProcessError:
-        return JudgeResult(run_result=None, status=JudgeStatusEnum.RuntimeError)
+    except IdlenessLimitExceeded as e:
+        return JudgeResult(
+            run_result=e.run_result, status=JudgeStatusEnum.IdlenessLimitExceeded
+        )
+    except JudgeTimeoutExpired as e:
+        return JudgeResult(
+            run_result=e.run_result, status=JudgeStatusEnum.JudgeTimeLimitExceeded
+        )
+    except SolverRuntimeError as e:
+        return JudgeResult(run_result=e.run_result, status=JudgeStatusEnum.RuntimeError)
 
     check_status = check_result.status
     match check_status:
@@ -332,11 +474,112 @@ def _judge_interactive(
     return JudgeResult(run_result=check_result.run_result, status=status)
 
 
+_SANITIZER_REPORT_PATTERN = re.compile(r"ERROR: \w*Sanitizer|runtime error:")
+
+_SANITIZER_TIMEOUT_FACTOR = 10
+"""Sanitizer builds are not timed, but are stopped after this many time limits"""
+
+_JUDGE_JOBS = 1
+"""Timed runs judged at once"""
+
+
+def _spare_cpus() -> int:
+    """Count the CPUs available to this process besides the timed runs
+
+    Returns:
+        int: CPUs the sanitizer builds may run on while the solutions are
+            judged. 0 or less if none is spare.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        # Respects the CPUs of a container or of `taskset`
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return cpus - _JUDGE_JOBS
+
+
+def _sanitize(input_file: Path, *, params: _SolutionParams) -> bool:
+    """Run the sanitizer build of the solution on the testcase
+
+    The run is not timed and no memory limit is applied,
+    because sanitizers reserve a huge amount of virtual memory.
+
+    Args:
+        input_file (Path): Input file of the testcase
+        params (_SolutionParams): Parameters of the solution
+    Returns:
+        bool: True if a sanitizer reported an error
+    """
+    lang = LanguageRegistry.get_languege_for_role(params.file, "sanitizer")
+    exec_cmd = lang.compile(params.file).exec_cmd
+    with input_file.open("r") as inf:
+        try:
+            run_result = runner.run(
+                exec_cmd,
+                runner_params=RunnerParams(
+                    stdin=inf,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check_returncode=False,
+                    timeout=params.timeout * _SANITIZER_TIMEOUT_FACTOR,
+                    stack_limit=params.stack_limit,
+                ),
+            )
+        except subprocess.TimeoutExpired:
+            logger.debug(
+                "Sanitizer build of %s timed out on %s",
+                params.file.name,
+                input_file.name,
+            )
+            return False
+    if _SANITIZER_REPORT_PATTERN.search(run_result.stderr) is None:
+        return False
+    logger.warning(
+        "Sanitizer reported an error for the solution %s on the testcase %s:\n%s",
+        params.file.name,
+        input_file.name,
+        run_result.stderr,
+    )
+    return True
+
+
+def _sanitize_all_tests(
+    tests: list[problem_config._Test],
+    *,
+    executor: ThreadPoolExecutor,
+    testcases: _Testcases,
+    solution_params: _SolutionParams,
+) -> list["Future[bool]"]:
+    """Queue the runs of the sanitizer build of the solution on all the tests
+
+    Returns:
+        list[Future[bool]]: Whether a sanitizer reported an error on each test.
+            Empty if the language has no sanitizer build.
+    Raises:
+        CompileError: If the sanitizer build fails to compile
+    """
+    language_type = ILanguage.detect_language(solution_params.file)
+    if not language_type.has_sanitizer():
+        logger.debug("No sanitizer build for the solution %s", solution_params.file)
+        return []
+    # Built up front by `build_problem`. A failed build is compiled again to
+    # raise its error here, before the runs are queued.
+    LanguageRegistry.get_languege_for_role(solution_params.file, "sanitizer").compile(
+        solution_params.file
+    )
+    return [
+        executor.submit(
+            _sanitize, testcases.files(test, test_id)[0], params=solution_params
+        )
+        for test in tests
+        for test_id in range(test.number)
+    ]
+
+
 def _judge_all_tests(
     tests: list[problem_config._Test],
     *,
-    inputs_dir: Path,
-    outputs_dir: Path,
+    testcases: _Testcases,
     solution_params: _SolutionParams,
     checker: ITestcaseChecker,
     checker_file: Path,
@@ -347,10 +590,10 @@ def _judge_all_tests(
     max_time = 0.0
     max_memory = 0.0
     status_count: defaultdict[JudgeStatusEnum, int] = defaultdict(int)
+    statuses: dict[str, JudgeStatusEnum] = {}
     for test in tests:
         for test_id in range(test.number):
-            input_file = Problem.input_file(inputs_dir, test.name, test_id)
-            answer_file = Problem.output_file(outputs_dir, test.name, test_id)
+            input_file, answer_file = testcases.files(test, test_id)
             with NamedTemporaryFile() as tmpfile:
                 output_file = Path(tmpfile.name)
                 judge_result = judge(
@@ -366,11 +609,23 @@ def _judge_all_tests(
                 )
             logger.info(judge_result.pretty_print_str())
             status_count[judge_result.status] += 1
+            statuses[input_file.name] = judge_result.status
             if judge_result.run_result is not None:
-                max_time = max(max_time, judge_result.run_result.elapsed_time)
-                max_memory = max(max_memory, judge_result.run_result.used_memory_mb)
+                run_result = judge_result.run_result
+                elapsed_time = run_result.elapsed_time
+                if (
+                    interactive
+                    and solution_params.interactive.cpu_time_limit
+                    and run_result.cpu_time is not None
+                ):
+                    elapsed_time = run_result.cpu_time
+                max_time = max(max_time, elapsed_time)
+                max_memory = max(max_memory, run_result.used_memory_mb)
     return JudgeSummary(
-        status_count=status_count, max_time=max_time, max_memory=max_memory
+        status_count=status_count,
+        max_time=max_time,
+        max_memory=max_memory,
+        statuses=statuses,
     )
 
 
@@ -380,7 +635,10 @@ def _collect_error_messages(
     msg_lines: list[str] = []
 
     wa_count = status_count.get(JudgeStatusEnum.WrongAnswer, 0)
-    tle_count = status_count.get(JudgeStatusEnum.TimeLimitExceeded, 0)
+    # The solutions waiting forever would exceed the time limit
+    tle_count = status_count.get(
+        JudgeStatusEnum.TimeLimitExceeded, 0
+    ) + status_count.get(JudgeStatusEnum.IdlenessLimitExceeded, 0)
     re_count = status_count.get(JudgeStatusEnum.RuntimeError, 0)
     match solution.wa:
         case "never":
@@ -406,18 +664,133 @@ def _collect_error_messages(
     return msg_lines
 
 
+_TIMED_OUT_STATUSES = (
+    JudgeStatusEnum.TimeLimitExceeded,
+    JudgeStatusEnum.IdlenessLimitExceeded,
+)
+"""Statuses of the runs stopped before the solver finished, without a time"""
+
+
 def _summary_message(judge_summary: JudgeSummary) -> str:
     status_count = judge_summary.status_count
     counts_joined = ", ".join(
         f"{status.value}:{count}" for status, count in status_count.items()
     )
     status_summary = "{" + counts_joined + "}"
-    is_tle = status_count.get(JudgeStatusEnum.TimeLimitExceeded, 0) > 0
+    is_tle = any(status_count.get(status, 0) > 0 for status in _TIMED_OUT_STATUSES)
     time_summary = "N/A ms" if is_tle else f"{judge_summary.max_time * 1000:.0f} ms"
     memory_summary = f"{judge_summary.max_memory:.0f} MiB"
     return f"Status={status_summary}, Time={time_summary}, Memory={memory_summary}"
 
 
+_DEFAULT_TOOLCHAIN = "default"
+"""Name of the solver build in the toolchain matrix"""
+
+
+def _build_toolchains(
+    solution_files: list[Path],
+) -> dict[Path, dict[str, ILanguage | None]]:
+    """Compile the solutions with every toolchain variant in parallel
+
+    Args:
+        solution_files (list[Path]): Solutions to compile
+    Returns:
+        dict[Path, dict[str, ILanguage | None]]:
+            Toolchain variants of each solution, keyed by the toolchain names.
+            None if the solution fails to compile with the toolchain.
+    """
+    targets = [
+        (file, name, language)
+        for file in solution_files
+        for name, language in LanguageRegistry.get_toolchains(file).items()
+    ]
+
+    def compile_target(target: tuple[Path, str, ILanguage]) -> ILanguage | None:
+        file, name, language = target
+        try:
+            language.compile(file)
+        except CompileError as e:
+            logger.error(
+                "Failed to compile %s with the toolchain '%s':\n%s",
+                file,
+                name,
+                e.stderr,
+            )
+            return None
+        return language
+
+    builds: dict[Path, dict[str, ILanguage | None]] = {
+        file: {} for file in solution_files
+    }
+    with ThreadPoolExecutor() as executor:
+        for (file, name, _), language in zip(
+            targets, executor.map(compile_target, targets), strict=True
+        ):
+            builds[file][name] = language
+    return builds
+
+
+def _toolchain_cell(judge_summary: JudgeSummary) -> str:
+    status_count = judge_summary.status_count
+    timed_out = [
+        status.value
+        for status in _TIMED_OUT_STATUSES
+        if status_count.get(status, 0) > 0
+    ]
+    if timed_out:
+        cell = "/".join(timed_out)
+    else:
+        cell = f"{judge_summary.max_time * 1000:.0f} ms"
+    other_statuses = [
+        status.value
+        for status in status_count
+        if status != JudgeStatusEnum.Accepted and status not in _TIMED_OUT_STATUSES
+    ]
+    if other_statuses:
+        cell += f" ({'/'.join(other_statuses)})"
+    return cell
+
+
+def _verdict_flips(judge_summaries: Mapping[str, JudgeSummary]) -> list[str]:
+    """List the tests whose statuses differ between the toolchains
+
+    Args:
+        judge_summaries (Mapping[str, JudgeSummary]): Summaries keyed by toolchains
+    Returns:
+        list[str]: Description of each flip
+    """
+    flips: list[str] = []
+    tests = next(iter(judge_summaries.values())).statuses
+    for test in tests:
+        statuses = {
+            toolchain: summary.statuses[test]
+            for toolchain, summary in judge_summaries.items()
+        }
+        if len(set(statuses.values())) > 1:
+            flips.append(
+                f"{test}: "
+                + ", ".join(f"{t}={status.value}" for t, status in statuses.items())
+            )
+    return flips
+
+
+def _log_time_matrix(
+    time_matrix: Mapping[str, Mapping[str, str]], toolchains: list[str]
+) -> None:
+    columns = ["Solution", *toolchains]
+    rows = [
+        [name, *(cells.get(toolchain, "-") for toolchain in toolchains)]
+        for name, cells in time_matrix.items()
+    ]
+    widths = [max(len(row[i]) for row in [columns, *rows]) for i in range(len(columns))]
+    logger.info("Time matrix of the toolchains:")
+    for row in [columns, *rows]:
+        line = "  ".join(
+            cell.ljust(width) for cell, width in zip(row, widths, strict=True)
+        )
+        logger.info(line.rstrip())
+
+
 def check(
     path: Path | None,
     targets: list[str],
@@ -425,6 +798,8 @@ def check(
     check_all: bool,
     no_stderr: bool,
     interactive: bool,
+    sanitize: bool,
+    toolchains: bool = False,
 ) -> None:
     logger.debug("Passed path: %s", path)
     logger.debug("Passed targets: %s", targets)
@@ -436,6 +811,11 @@ def check(
     problem_cfg = problem_with_config.problem_config
     cfg = problem_with_config.config
     LanguageRegistry.load_config(cfg.language)
+    gen_params.export_runtime_params(problem_with_config)
+    if sanitize and interactive:
+        logger.warning("Sanitizer builds are not supported for interactive problems")
+        sanitize = False
+    build.build_problem(problem_with_config, jobs=None, strict=False, sanitize=sanitize)
 
     target_solutions: list[problem_config._Solution] = _get_target_solutions(
         targets, all_solutions=check_all, solutions_config=problem_cfg.solutions
@@ -447,31 +827,160 @@ def check(
     checker_type: type[ITestcaseChecker] = get_checker_type(cfg.checker.style)
     checker = checker_type(cfg.checker)
 
+    toolchain_builds: dict[Path, dict[str, ILanguage | None]] = {}
+    if toolchains:
+        toolchain_builds = _build_toolchains(
+            [problem.solutions_dir / solution.name for solution in target_solutions]
+        )
+        if not any(toolchain_builds.values()):
+            logger.warning("No toolchain variant is configured for the solutions")
+    toolchain_names = [_DEFAULT_TOOLCHAIN]
+    for builds in toolchain_builds.values():
+        toolchain_names += [name for name in builds if name not in toolchain_names]
+    time_matrix: dict[str, dict[str, str]] = {}
+
+    testcases = _Testcases(
+        inputs_dir=problem.inputs_dir, outputs_dir=problem.outputs_dir
+    )
     error_messages: dict[str, list[str]] = {}
     summary_messages: dict[str, str] = {}
-    for solution in target_solutions:
-        solution_params = _SolutionParams(
-            file=problem.solutions_dir / solution.name,
-            timeout=problem_cfg.timelimit,
-            memory_limit=problem_cfg.memorylimit,
-            no_stderr=no_stderr,
-        )
-        judge_summary = _judge_all_tests(
-            problem_cfg.tests,
-            inputs_dir=problem.inputs_dir,
-            outputs_dir=problem.outputs_dir,
-            solution_params=solution_params,
-            checker=checker,
-            checker_file=problem.checker_file,
-            no_stderr=no_stderr,
-            interactive=interactive,
-        )
-        error_messages[solution.name] = _collect_error_messages(
-            solution, judge_summary.status_count
-        )
-        summary_msg = _summary_message(judge_summary)
-        summary_messages[solution.name] = summary_msg
-        logger.info("Summary of the solution: %s", summary_msg)
+    with contextlib.ExitStack() as stack:
+        if any(test.virtual for test in problem_cfg.tests):
+            testcases.virtual_tests = stack.enter_context(
+                VirtualTestStore(
+                    load_manifest(problem.virtual_tests_file),
+                    generators_dir=problem.generators_dir,
+                    solve=_answer_solver(problem_with_config, interactive=interactive),
+                )
+            )
+        # Sanitizer builds run on the spare cores while the timed runs are
+        # judged, or after all of them without a spare core, so that they do
+        # not skew the times. If judging fails, the queued runs are cancelled
+        # before the virtual test cases are removed.
+        spare_cpus = _spare_cpus()
+        sanitizer_executor = ThreadPoolExecutor(max_workers=max(1, spare_cpus))
+        stack.callback(sanitizer_executor.shutdown, cancel_futures=True)
+        sanitizer_futures: dict[str, list[Future[bool]]] = {}
+        sanitizer_failed: set[str] = set()
+        deferred_sanitizers: list[tuple[str, _SolutionParams]] = []
+
+        def queue_sanitizer(name: str, solution_params: _SolutionParams) -> None:
+            try:
+                sanitizer_futures[name] = _sanitize_all_tests(
+                    problem_cfg.tests,
+                    executor=sanitizer_executor,
+                    testcases=testcases,
+                    solution_params=solution_params,
+                )
+            except CompileError as e:
+                logger.error(
+                    "Failed to compile the sanitizer build of %s:\n%s", name, e.stderr
+                )
+                sanitizer_failed.add(name)
+
+        for solution in target_solutions:
+            solution_params = _SolutionParams(
+                file=problem.solutions_dir / solution.name,
+                timeout=problem_cfg.timelimit,
+                memory_limit=problem_cfg.memorylimit,
+                stack_limit=problem_cfg.stacklimit,
+                no_stderr=no_stderr,
+                interactive=cfg.interactive,
+            )
+            if interactive and cfg.interactive.transcript_lines is not None:
+                solution_params.transcripts_dir = (
+                    problem.transcripts_dir / solution.name
+                )
+                shutil.rmtree(solution_params.transcripts_dir, ignore_errors=True)
+            if sanitize and spare_cpus > 0:
+                queue_sanitizer(solution.name, solution_params)
+            elif sanitize:
+                deferred_sanitizers.append((solution.name, solution_params))
+            judge_summary = _judge_all_tests(
+                problem_cfg.tests,
+                testcases=testcases,
+                solution_params=solution_params,
+                checker=checker,
+                checker_file=problem.checker_file,
+                no_stderr=no_stderr,
+                interactive=interactive,
+            )
+            error_messages[solution.name] = _collect_error_messages(
+                solution, judge_summary.status_count
+            )
+            summary_msg = _summary_message(judge_summary)
+            summary_messages[solution.name] = summary_msg
+            logger.info("Summary of the solution: %s", summary_msg)
+
+            if not toolchains:
+                continue
+            toolchain_summaries = {_DEFAULT_TOOLCHAIN: judge_summary}
+            time_matrix[solution.name] = {
+                _DEFAULT_TOOLCHAIN: _toolchain_cell(judge_summary)
+            }
+            for name, language in toolchain_builds[solution_params.file].items():
+                if language is None:
+                    time_matrix[solution.name][name] = "CE"
+                    error_messages[solution.name].append(
+                        f"failed to compile with the toolchain '{name}'"
+                    )
+                    continue
+                logger.info(
+                    "Judging the solution '%s' built with the toolchain '%s'",
+                    solution.name,
+                    name,
+                )
+                toolchain_summary = _judge_all_tests(
+                    problem_cfg.tests,
+                    testcases=testcases,
+                    solution_params=dataclasses.replace(
+                        solution_params,
+                        language=language,
+                        transcripts_dir=(
+                            None
+                            if solution_params.transcripts_dir is None
+                            else solution_params.transcripts_dir / name
+                        ),
+                    ),
+                    checker=checker,
+                    checker_file=problem.checker_file,
+                    no_stderr=no_stderr,
+                    interactive=interactive,
+                )
+                toolchain_summaries[name] = toolchain_summary
+                time_matrix[solution.name][name] = _toolchain_cell(toolchain_summary)
+                error_messages[solution.name] += [
+                    f"[toolchain '{name}'] {msg}"
+                    for msg in _collect_error_messages(
+                        solution, toolchain_summary.status_count
+                    )
+                ]
+            error_messages[solution.name] += [
+                f"verdict depends on the toolchain on {flip}"
+                for flip in _verdict_flips(toolchain_summaries)
+            ]
+
+        if deferred_sanitizers:
+            logger.info("Running the sanitizer builds after judging (no spare CPU)")
+        for name, solution_params in deferred_sanitizers:
+            queue_sanitizer(name, solution_params)
+        for solution in target_solutions:
+            if solution.name in sanitizer_failed:
+                error_messages[solution.name].append(
+                    "failed to compile the sanitizer build"
+                )
+            futures = sanitizer_futures.get(solution.name, [])
+            report_count = sum(future.result() for future in futures)
+            if not report_count:
+                continue
+            msg = f"sanitizer reported errors on {report_count} tests"
+            if solution.re == "never":
+                error_messages[solution.name].append(msg)
+            else:
+                logger.warning("Solution '%s': %s", solution.name, msg)
+
+    if toolchains:
+        _log_time_matrix(time_matrix, toolchain_names)
 
     has_error = False
     for name, error_msgs in error_messages.items():
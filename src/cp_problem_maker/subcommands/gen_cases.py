@@ -1,30 +1,57 @@
 import argparse
+import dataclasses
+import random
 import shutil
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 
 from cp_problem_maker.buildrun.languages import (
     ILanguage,
     LanguageRegistry,
     TextCat,
 )
-from cp_problem_maker.buildrun.languages.cpp import Cpp, SolverCpp
+from cp_problem_maker.buildrun.languages.build_cache import hash_file
+from cp_problem_maker.buildrun.runners.checker import (
+    CheckerStatusEnum,
+    ITestcaseChecker,
+    get_checker_type,
+)
 from cp_problem_maker.buildrun.runners.generator import (
     GeneratorParams,
     ITestcaseGenerator,
     RawTestcaseGenerator,
     SourceTestcaseGenerator,
 )
-from cp_problem_maker.buildrun.runners.runner import RunnerParams
-from cp_problem_maker.buildrun.runners.solver import SourceTestcaseSolver
-from cp_problem_maker.buildrun.runners.verifier import SourceTestcaseVerifier
-from cp_problem_maker.config import problem_config
+from cp_problem_maker.buildrun.runners.runner import RunnerParams, StackLimit
+from cp_problem_maker.buildrun.runners.solver import (
+    SolveResult,
+    SolverStatusEnum,
+    SourceTestcaseSolver,
+)
+from cp_problem_maker.buildrun.runners.verifier import (
+    FormatTestcaseVerifier,
+    SourceTestcaseVerifier,
+    VerifierStatusEnum,
+)
+from cp_problem_maker.config import problem_config, tool_config
 from cp_problem_maker.logging.setup import get_logger
 from cp_problem_maker.project.problem import Problem, ProblemWithConfig
-from cp_problem_maker.subcommands import check, gen_params
+from cp_problem_maker.project.virtual_tests import (
+    VirtualTest,
+    VirtualTestManifest,
+    VirtualTestStore,
+    save_manifest,
+)
+from cp_problem_maker.subcommands import build, check, gen_params
+from cp_problem_maker.utils import _path
 
 _COMMAND_NAME = "gen-cases"
 
+_EXPECTED_TIMEOUT_FACTOR = 10
+"""With the fastest strategy, the expected solution may take this many times
+the time limit, since it is the reference and not the solution being timed"""
+
 logger = get_logger(__name__)
 
 
@@ -81,6 +108,31 @@ class _GeneratorParams:
 @dataclass
 class _VerifierParams:
     file: Path
+    format_verifier: FormatTestcaseVerifier | None = None
+    """Verifier by the input format, used instead of the file if set"""
+
+
+@dataclass
+class _FastestSolutionParams:
+    """State of the fastest strategy to generate the answers
+
+    The solutions are benchmarked on the first `sample` test cases, and the
+    other answers are generated by the fastest one.
+    """
+
+    expected_file: Path
+    checker: ITestcaseChecker
+    checker_file: Path
+    sample: int
+    cross_check: float
+    elapsed_times: dict[Path, float]
+    """Total elapsed time of each solution that agreed with the expected one"""
+    benchmarked: int = 0
+    rng: random.Random = field(default_factory=random.Random)
+
+    @property
+    def solution_file(self) -> Path:
+        return min(self.elapsed_times, key=lambda file: self.elapsed_times[file])
 
 
 @dataclass
@@ -89,6 +141,9 @@ class _SolutionParams:
     answers_dir: Path
     timeout: float
     memory_limit: int | None
+    stack_limit: StackLimit | None
+    fastest: _FastestSolutionParams | None = None
+    """Used instead of the file if set"""
 
 
 def _generator_type(lang_type: type[ILanguage]) -> type[ITestcaseGenerator]:
@@ -111,11 +166,27 @@ def _generate_input(*, params: _GeneratorParams) -> Path:
     return dest_file
 
 
+def _import_input(raw_input_file: Path, *, params: _GeneratorParams) -> Path:
+    dest_file = Problem.input_file(params.inputs_dir, params.test_name, params.test_id)
+    logger.info("Importing input file '%s'", dest_file.name)
+    _path.copy_file(raw_input_file, dest_file)
+    return dest_file
+
+
 def _verify_testcase(testcase_file: Path, *, params: _VerifierParams) -> None:
+    if params.format_verifier is not None:
+        logger.info("Verifying testcase %s by the input format", testcase_file.name)
+        result = params.format_verifier.verify_testcase(testcase_file)
+        if result.status != VerifierStatusEnum.Passed:
+            raise ValueError(
+                f"Testcase {testcase_file.name} does not follow the input format: "
+                f"{result.run_result.stderr.strip()}"
+            )
+        return
     logger.info(
         "Verifying testcase %s by the verifier %s", testcase_file.name, params.file.name
     )
-    lang = LanguageRegistry.get_languege(params.file)
+    lang = LanguageRegistry.get_languege_for_role(params.file, "verifier")
     exec_cmd = lang.compile(params.file).exec_cmd
     with testcase_file.open() as f:
         SourceTestcaseVerifier.verify_testcase(
@@ -123,9 +194,181 @@ def _verify_testcase(testcase_file: Path, *, params: _VerifierParams) -> None:
         )
 
 
+def _solve(
+    solution_file: Path,
+    testcase_file: Path,
+    output_file: Path,
+    *,
+    params: _SolutionParams,
+) -> SolveResult:
+    lang = LanguageRegistry.get_languege_for_role(solution_file, "solver")
+    exec_cmd = lang.compile(solution_file).exec_cmd
+    with testcase_file.open(mode="r") as inf, output_file.open(mode="w") as ouf:
+        return SourceTestcaseSolver.solve_testcase(
+            exec_cmd,
+            runner_params=RunnerParams(
+                stdin=inf,
+                stdout=ouf,
+                check_returncode=True,
+                timeout=params.timeout,
+                memory_limit=params.memory_limit,
+                stack_limit=params.stack_limit,
+            ),
+        )
+
+
+def _is_accepted(
+    testcase_file: Path,
+    output_file: Path,
+    answer_file: Path,
+    *,
+    fastest: _FastestSolutionParams,
+) -> bool:
+    """Check the output of a solution against the answer of the expected one"""
+    check_result = check._check(
+        fastest.checker,
+        params=check._CheckerParams(
+            checker=fastest.checker,
+            checker_file=fastest.checker_file,
+            input_file=testcase_file,
+            output_file=output_file,
+            answer_file=answer_file,
+            no_stderr=True,
+        ),
+    )
+    return check_result.status == CheckerStatusEnum.Accepted
+
+
+def _solve_expected(
+    testcase_file: Path,
+    output_file: Path,
+    *,
+    params: _SolutionParams,
+    fastest: _FastestSolutionParams,
+) -> SolveResult:
+    """Run the expected solution to get the reference answer
+
+    Raises:
+        ValueError: If the expected solution fails or times out
+    """
+    timeout = params.timeout * _EXPECTED_TIMEOUT_FACTOR
+    result = _solve(
+        fastest.expected_file,
+        testcase_file,
+        output_file,
+        params=dataclasses.replace(params, timeout=timeout),
+    )
+    if result.status != SolverStatusEnum.Success:
+        raise ValueError(
+            f"Expected solution {fastest.expected_file.name} ended with "
+            f"{result.status.value} on testcase {testcase_file.name} "
+            f"with the time limit of {timeout} sec"
+        )
+    return result
+
+
+def _benchmark_solutions(
+    testcase_file: Path,
+    output_file: Path,
+    *,
+    params: _SolutionParams,
+    fastest: _FastestSolutionParams,
+) -> None:
+    """Generate the answer by the expected solution, and time the others on it
+
+    A solution is excluded if it fails or its output is not accepted.
+    """
+    logger.info("Benchmarking the solutions on testcase %s", testcase_file.name)
+    expected_result = _solve_expected(
+        testcase_file, output_file, params=params, fastest=fastest
+    )
+    for solution_file, elapsed_time in fastest.elapsed_times.items():
+        if solution_file == fastest.expected_file or elapsed_time == float("inf"):
+            continue
+        with NamedTemporaryFile(suffix=".out") as f:
+            result = _solve(solution_file, testcase_file, Path(f.name), params=params)
+            if result.status != SolverStatusEnum.Success or not _is_accepted(
+                testcase_file, Path(f.name), output_file, fastest=fastest
+            ):
+                logger.warning(
+                    "Solution %s does not agree with the expected solution on "
+                    "testcase %s, and is not used to generate the answers",
+                    solution_file.name,
+                    testcase_file.name,
+                )
+                fastest.elapsed_times[solution_file] = float("inf")
+                continue
+        assert result.run_result is not None
+        fastest.elapsed_times[solution_file] += result.run_result.elapsed_time
+    assert expected_result.run_result is not None
+    fastest.elapsed_times[fastest.expected_file] += (
+        expected_result.run_result.elapsed_time
+    )
+    fastest.benchmarked += 1
+    if fastest.benchmarked == fastest.sample:
+        for solution_file, elapsed_time in fastest.elapsed_times.items():
+            if elapsed_time == float("inf"):
+                continue
+            logger.info(
+                "Solution %s took %.3f sec in total", solution_file.name, elapsed_time
+            )
+        logger.info(
+            "Generating the other answers by the fastest solution %s",
+            fastest.solution_file.name,
+        )
+
+
+def _generate_answer_by_fastest(
+    testcase_file: Path,
+    output_file: Path,
+    *,
+    params: _SolutionParams,
+    fastest: _FastestSolutionParams,
+) -> None:
+    if fastest.benchmarked < fastest.sample:
+        _benchmark_solutions(testcase_file, output_file, params=params, fastest=fastest)
+        return
+
+    solution_file = fastest.solution_file
+    logger.info(
+        "Generating answer for testcase %s by the solution %s",
+        testcase_file.name,
+        solution_file.name,
+    )
+    if solution_file == fastest.expected_file:
+        _solve_expected(testcase_file, output_file, params=params, fastest=fastest)
+        return
+    result = _solve(solution_file, testcase_file, output_file, params=params)
+    if result.status != SolverStatusEnum.Success:
+        raise ValueError(
+            f"Solution {solution_file.name} failed on testcase {testcase_file.name}"
+        )
+    if fastest.rng.random() >= fastest.cross_check:
+        return
+    logger.info(
+        "Cross-checking the answer for testcase %s by the expected solution %s",
+        testcase_file.name,
+        fastest.expected_file.name,
+    )
+    with NamedTemporaryFile(suffix=".out") as f:
+        _solve_expected(testcase_file, Path(f.name), params=params, fastest=fastest)
+        if not _is_accepted(testcase_file, output_file, Path(f.name), fastest=fastest):
+            raise ValueError(
+                f"Answer for testcase {testcase_file.name} by the solution "
+                f"{solution_file.name} is not accepted against the expected "
+                f"solution {fastest.expected_file.name}"
+            )
+
+
 def _generate_answer(testcase_file: Path, *, params: _SolutionParams) -> None:
     output_file = (params.answers_dir / testcase_file.name).with_suffix(".out")
 
+    if params.fastest is not None:
+        _generate_answer_by_fastest(
+            testcase_file, output_file, params=params, fastest=params.fastest
+        )
+        return
+
     if params.file is None:
         logger.warning("No solver is provided. Answer file will be the same as input.")
         shutil.copy(testcase_file, output_file)
@@ -136,21 +379,45 @@ def _generate_answer(testcase_file: Path, *, params: _SolutionParams) -> None:
         testcase_file.name,
         params.file.name,
     )
-    lang = LanguageRegistry.get_languege(params.file)
-    if isinstance(lang, Cpp):
-        lang = LanguageRegistry.get_languege(SolverCpp)
-    exec_cmd = lang.compile(params.file).exec_cmd
-    with testcase_file.open(mode="r") as inf, output_file.open(mode="w") as ouf:
-        SourceTestcaseSolver.solve_testcase(
-            exec_cmd,
-            runner_params=RunnerParams(
-                stdin=inf,
-                stdout=ouf,
-                check_returncode=True,
-                timeout=params.timeout,
-                memory_limit=params.memory_limit,
-            ),
+    _solve(params.file, testcase_file, output_file, params=params)
+
+
+def _fastest_solution_params(
+    problem_with_config: ProblemWithConfig, *, answers: tool_config._Answers
+) -> _FastestSolutionParams | None:
+    """Set up the fastest strategy, or None if no solution can replace the expected one
+
+    Args:
+        problem_with_config (ProblemWithConfig): Problem to generate the answers of
+        answers (tool_config._Answers): Configuration of the strategy
+    Returns:
+        _FastestSolutionParams | None: State of the strategy
+    """
+    problem = problem_with_config.problem
+    problem_cfg = problem_with_config.problem_config
+    cfg = problem_with_config.config
+    expected_file = problem.solutions_dir / problem_cfg.expected_solution.name
+    candidate_files = [
+        problem.solutions_dir / solution.name
+        for solution in problem_cfg.solutions
+        if not solution.expected
+        and solution.tle == solution.wa == solution.re == "never"
+    ]
+    if not candidate_files:
+        logger.info(
+            "No solution other than the expected one is correct by its policies. "
+            "Generating the answers by the expected solution."
         )
+        return None
+    checker_type: type[ITestcaseChecker] = get_checker_type(cfg.checker.style)
+    return _FastestSolutionParams(
+        expected_file=expected_file,
+        checker=checker_type(cfg.checker),
+        checker_file=problem.checker_file,
+        sample=answers.sample,
+        cross_check=answers.cross_check,
+        elapsed_times={file: 0.0 for file in [expected_file, *candidate_files]},
+    )
 
 
 def _generate_testcase(
@@ -165,6 +432,52 @@ def _generate_testcase(
     return testcase_file
 
 
+def _record_virtual_testcase(
+    *,
+    generator_params: _GeneratorParams,
+    verifier_params: _VerifierParams,
+    solution_params: _SolutionParams,
+    virtual_tests: VirtualTestStore,
+) -> None:
+    """Generate a virtual test case in memory, and record it in the manifest"""
+    input_file = Problem.input_file(
+        generator_params.inputs_dir,
+        generator_params.test_name,
+        generator_params.test_id,
+    )
+    name = input_file.name
+    # The files generated before the group became virtual are not used anymore
+    input_file.unlink(missing_ok=True)
+    (solution_params.answers_dir / name).with_suffix(".out").unlink(missing_ok=True)
+    logger.info("Generating virtual input '%s'", name)
+    seed = SourceTestcaseGenerator.seed(
+        generator_params=GeneratorParams(
+            case_group=generator_params.test_name, case_id=generator_params.test_id
+        )
+    )
+    input_file = virtual_tests.generate_input(
+        name,
+        generator=generator_params.test_name,
+        case_id=generator_params.test_id,
+        seed=seed,
+    )
+    _verify_testcase(input_file, params=verifier_params)
+    _generate_answer(
+        input_file,
+        params=dataclasses.replace(solution_params, answers_dir=input_file.parent),
+    )
+    answer_file = input_file.with_suffix(".out")
+    virtual_tests.manifest.tests[name] = VirtualTest(
+        generator=generator_params.test_name,
+        case_id=generator_params.test_id,
+        seed=seed,
+        input_sha256=hash_file(input_file),
+        answer_sha256=virtual_tests.store_answer(answer_file),
+    )
+    input_file.unlink()
+    answer_file.unlink()
+
+
 def _generate_testcases(
     test: problem_config._Test,
     *,
@@ -172,14 +485,21 @@ def _generate_testcases(
     inputs_dir: Path,
     verifier_params: _VerifierParams,
     solution_params: _SolutionParams,
+    virtual_tests: VirtualTestStore | None = None,
 ) -> tuple[list[Path], list[str]]:
     logger.info("Generating %d test cases for the group: %s", test.number, test.name)
     generator_file = generators_dir / test.name
     generator_lang_type: type[ILanguage] = ILanguage.detect_language(generator_file)
     generator_type = _generator_type(generator_lang_type)
-    generator_lang = LanguageRegistry.get_languege(generator_lang_type)
-    generator_cmd = generator_lang.compile(generator_file).exec_cmd
     is_textcat = generator_lang_type == TextCat
+    if test.virtual and is_textcat:
+        raise ValueError(f"Raw test cases cannot be virtual: {test.name}")
+    generator_cmd: list[str] = []
+    if not is_textcat:
+        generator_lang = LanguageRegistry.get_languege_for_role(
+            generator_file, "generator"
+        )
+        generator_cmd = generator_lang.compile(generator_file).exec_cmd
 
     generator_params = _GeneratorParams(
         generator_type=generator_type,
@@ -193,19 +513,31 @@ def _generate_testcases(
     used_generators = []
     for test_id in range(test.number):
         generator_params.test_id = test_id
+        if test.virtual:
+            assert virtual_tests is not None
+            _record_virtual_testcase(
+                generator_params=generator_params,
+                verifier_params=verifier_params,
+                solution_params=solution_params,
+                virtual_tests=virtual_tests,
+            )
+            continue
         if is_textcat:
+            # Raw inputs are copied as they are, without running `cat`
             raw_input_file = Problem.input_file(
                 generators_dir, test.name, test_id
             ).with_suffix(generator_file.suffix)
-            generator_params.cmd = TextCat().compile(raw_input_file).exec_cmd
-        input_file = _generate_testcase(
-            generator_params=generator_params,
-            verifier_params=verifier_params,
-            solution_params=solution_params,
-        )
-        input_files.append(input_file)
-        if is_textcat:
+            input_file = _import_input(raw_input_file, params=generator_params)
+            _verify_testcase(raw_input_file, params=verifier_params)
+            _generate_answer(input_file, params=solution_params)
             used_generators.append(input_file.name)
+        else:
+            input_file = _generate_testcase(
+                generator_params=generator_params,
+                verifier_params=verifier_params,
+                solution_params=solution_params,
+            )
+        input_files.append(input_file)
     if not is_textcat:
         used_generators.append(test.name)
         used_generators.append(Path(test.name).stem)
@@ -234,9 +566,20 @@ def gen_cases(
     problem_cfg = problem_with_config.problem_config
     cfg = problem_with_config.config
     LanguageRegistry.load_config(cfg.language)
+    gen_params.export_runtime_params(problem_with_config)
+    build.build_problem(
+        problem_with_config,
+        jobs=None,
+        strict=False,
+        extra_solutions=[solver] if solver is not None else [],
+    )
 
     verifier_file = problem.verifier_file
     verifier_params = _VerifierParams(file=verifier_file)
+    if problem_cfg.input_format is not None:
+        verifier_params.format_verifier = FormatTestcaseVerifier(
+            problem_cfg.input_format, problem_cfg.params
+        )
 
     solution_file: Path | None = None
     if solver is not None:
@@ -248,21 +591,32 @@ def gen_cases(
         answers_dir=problem.outputs_dir,
         timeout=problem_cfg.timelimit,
         memory_limit=problem_cfg.memorylimit,
+        stack_limit=problem_cfg.stacklimit,
     )
+    if solver is None and not interactive and cfg.answers.strategy == "fastest":
+        solution_params.fastest = _fastest_solution_params(
+            problem_with_config, answers=cfg.answers
+        )
 
     unused_generators = set(
         f.name for f in problem.generators_dir.iterdir() if f.is_file()
     )
 
-    for test in problem_cfg.tests:
-        _, used_generators = _generate_testcases(
-            test,
-            generators_dir=problem.generators_dir,
-            inputs_dir=problem.inputs_dir,
-            verifier_params=verifier_params,
-            solution_params=solution_params,
-        )
-        unused_generators -= set(used_generators)
+    with VirtualTestStore(
+        VirtualTestManifest(), generators_dir=problem.generators_dir
+    ) as virtual_tests:
+        for test in problem_cfg.tests:
+            _, used_generators = _generate_testcases(
+                test,
+                generators_dir=problem.generators_dir,
+                inputs_dir=problem.inputs_dir,
+                verifier_params=verifier_params,
+                solution_params=solution_params,
+                virtual_tests=virtual_tests,
+            )
+            unused_generators -= set(used_generators)
+    if virtual_tests.manifest.tests or problem.virtual_tests_file.exists():
+        save_manifest(problem.virtual_tests_file, virtual_tests.manifest)
 
     if unused_generators:
         if error_on_unused:
@@ -276,4 +630,5 @@ def gen_cases(
             check_all=False,
             no_stderr=False,
             interactive=interactive,
+            sanitize=False,
         )
@@ -1,12 +1,20 @@
 import argparse
+import os
 from pathlib import Path
 
+from cp_problem_maker import anchor
 from cp_problem_maker.config import problem_config, tool_config
 from cp_problem_maker.logging.setup import get_logger
 from cp_problem_maker.project.problem import ProblemWithConfig
 
 _COMMAND_NAME = "gen-params"
 
+PARAM_ENV_PREFIX = "CP_PROBLEM_MAKER_PARAM_"
+"""Prefix of the environment variables to pass the parameters at run time"""
+
+FASTIO_HEADER = anchor.SOURCE_ROOT / "data" / "fastio.h"
+"""Buffered I/O header for C++ programs, copied next to the parameters file"""
+
 
 logger = get_logger(__name__)
 
@@ -70,11 +78,156 @@ def _declare_params(
     return "\n".join(lines)
 
 
+def _declare_runtime_param(
+    name: str, value: problem_config._ParameterValue, lang: tool_config._DefaultLanguage
+) -> str:
+    env_name = f"{PARAM_ENV_PREFIX}{name}"
+    match lang:
+        case "C++":
+            get = f'cp_problem_maker_params::get("{env_name}")'
+            if isinstance(value, str):
+                return f"inline const std::string {name} = {get};"
+            if isinstance(value, int):
+                return f"inline const long long {name} = std::stoll({get});"
+            return f"inline const double {name} = std::stod({get});"
+        case "Python":
+            if isinstance(value, str):
+                return f'{name} = _get("{env_name}")'
+            if isinstance(value, int):
+                return f'{name} = int(_get("{env_name}"))'
+            return f'{name} = float(_get("{env_name}"))'
+        case _:
+            raise ValueError(f"Unknown language: {lang}")
+
+
+_RUNTIME_PRELUDE_CPP = """\
+#ifndef CP_PROBLEM_MAKER_PARAMS_RUNTIME_H
+#define CP_PROBLEM_MAKER_PARAMS_RUNTIME_H
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+
+namespace cp_problem_maker_params {
+inline std::string get(const char *name) {
+    const char *value = std::getenv(name);
+    if (value == nullptr) {
+        std::fprintf(stderr, "Parameter %s is not set\\n", name);
+        std::exit(1);
+    }
+    return value;
+}
+}  // namespace cp_problem_maker_params
+"""
+
+_RUNTIME_PRELUDE_PYTHON = """\
+import os
+
+
+def _get(name: str) -> str:
+    try:
+        return os.environ[name]
+    except KeyError:
+        raise RuntimeError(f"Parameter {name} is not set") from None
+
+"""
+
+
+def _declare_runtime_params(
+    params: dict[str, problem_config._ParameterValue],
+    lang: tool_config._DefaultLanguage,
+) -> str:
+    """Declare the parameters read from the environment variables at run time
+
+    The result depends only on the names and the types of the parameters.
+
+    Args:
+        params (dict[str, problem_config._ParameterValue]): Parameters
+        lang (tool_config._DefaultLanguage): Language of the accessor
+    Returns:
+        str: Content of the accessor
+    """
+    prefix_lines: list[str] = []
+    suffix_lines: list[str] = []
+    match lang:
+        case "C++":
+            prefix_lines = [_RUNTIME_PRELUDE_CPP]
+            suffix_lines = ["#endif"]
+        case "Python":
+            prefix_lines = [_RUNTIME_PRELUDE_PYTHON]
+        case _:
+            raise ValueError(f"Unknown language: {lang}")
+    lines = (
+        prefix_lines
+        + [_declare_runtime_param(name, value, lang) for name, value in params.items()]
+        + suffix_lines
+        + [""]  # Add a newline at the end of the file
+    )
+    return "\n".join(lines)
+
+
+def runtime_params_file(params_file: Path) -> Path:
+    """Get the path to the accessor of the parameters at run time
+
+    Args:
+        params_file (Path): Path to the parameters file, e.g. `src/params.h`
+    Returns:
+        Path: Path to the accessor, e.g. `src/params_runtime.h`
+    """
+    return params_file.with_name(f"{params_file.stem}_runtime{params_file.suffix}")
+
+
+def runtime_param_env(
+    params: dict[str, problem_config._ParameterValue],
+) -> dict[str, str]:
+    """Get the environment variables to pass the parameters at run time
+
+    Args:
+        params (dict[str, problem_config._ParameterValue]): Parameters
+    Returns:
+        dict[str, str]: Environment variables
+    """
+    return {f"{PARAM_ENV_PREFIX}{name}": str(value) for name, value in params.items()}
+
+
+def export_runtime_params(problem_with_config: ProblemWithConfig) -> None:
+    """Export the parameters to the programs run by this process
+
+    Nothing is exported unless `params.runtime` is enabled.
+
+    Args:
+        problem_with_config (ProblemWithConfig): Problem to export the parameters of
+    """
+    if not problem_with_config.config.params.runtime:
+        return
+    env = runtime_param_env(problem_with_config.problem_config.params)
+    logger.debug("Exporting the parameters: %s", env)
+    os.environ.update(env)
+
+
+def _write_if_changed(file: Path, content: str) -> None:
+    # Keep the file untouched if it is unchanged, so that nothing is rebuilt
+    if file.exists() and file.read_text() == content:
+        return
+    logger.info("Updating %s", file)
+    file.write_text(content)
+
+
 def gen_params(path: Path | None) -> None:
     logger.debug("Passed path: %s", path)
     logger.info("Generating problem parameters")
     problem_with_config = ProblemWithConfig(path, search_root=True)
     params_file = problem_with_config.problem.params_file
     params = problem_with_config.problem_config.params
+    lang = problem_with_config.config.language.default
     with params_file.open(mode="w") as f:
-        f.write(_declare_params(params, problem_with_config.config.language.default))
+        f.write(_declare_params(params, lang))
+
+    if problem_with_config.config.params.runtime:
+        _write_if_changed(
+            runtime_params_file(params_file), _declare_runtime_params(params, lang)
+        )
+    if problem_with_config.config.params.fastio:
+        # The header is for C++ programs regardless of the default language
+        _write_if_changed(
+            params_file.with_name(FASTIO_HEADER.name), FASTIO_HEADER.read_text()
+        )
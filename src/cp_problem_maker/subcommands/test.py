@@ -27,6 +27,11 @@ def add_parser(
         help="Use interactive judge",
     )
     parser.add_argument("-s", "--solver", help="Path to the answer generator.")
+    parser.add_argument(
+        "--sanitize",
+        action="store_true",
+        help="Also run sanitizer builds of the C++ solutions on all tests, untimed",
+    )
     return parser
 
 
@@ -44,5 +49,10 @@ def run(args: argparse.Namespace) -> None:
         no_check=False,
     )
     check.check(
-        path, [], check_all=True, no_stderr=args.no_stderr, interactive=args.interactive
+        path,
+        [],
+        check_all=True,
+        no_stderr=args.no_stderr,
+        interactive=args.interactive,
+        sanitize=args.sanitize,
     )
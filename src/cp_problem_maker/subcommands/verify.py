@@ -0,0 +1,229 @@
+import argparse
+import os
+import subprocess
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from cp_problem_maker.buildrun.languages import LanguageRegistry
+from cp_problem_maker.buildrun.languages.language import Role
+from cp_problem_maker.buildrun.runners.runner import RunnerParams
+from cp_problem_maker.buildrun.runners.verifier import (
+    BATCH_FAILURE_SEPARATOR,
+    FormatTestcaseVerifier,
+    SourceTestcaseVerifier,
+    VerifierStatusEnum,
+)
+from cp_problem_maker.config import problem_config
+from cp_problem_maker.logging.setup import get_logger
+from cp_problem_maker.project.problem import Problem, ProblemWithConfig
+from cp_problem_maker.project.virtual_tests import VirtualTestStore, load_manifest
+from cp_problem_maker.subcommands import gen_params
+
+_COMMAND_NAME = "verify"
+
+logger = get_logger(__name__)
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = subparsers.add_parser(
+        _COMMAND_NAME,
+        help="Verify the generated test cases",
+        description="Verify the generated test cases",
+    )
+    parser.add_argument("-p", "--path", help="Path to the project")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of parallel verifications. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Pass the test cases to each verifier process as arguments. The verifier must support the batch mode.",  # noqa: E501
+    )
+    return parser
+
+
+def run(args: argparse.Namespace) -> None:
+    path: Path | None = None
+    if args.path is not None:
+        path = Path(args.path)
+    verify(path, jobs=args.jobs, batch=args.batch)
+
+
+class VerifyError(Exception):
+    pass
+
+
+@dataclass
+class _Failure:
+    testcase_file: Path
+    message: str
+
+
+def _verify_testcase(cmd: list[str], testcase_file: Path) -> list[_Failure]:
+    with testcase_file.open() as f:
+        result = SourceTestcaseVerifier.verify_testcase(
+            cmd,
+            runner_params=RunnerParams(
+                stdin=f,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check_returncode=False,
+            ),
+        )
+    if result.status == VerifierStatusEnum.Passed:
+        return []
+    run_result = result.run_result
+    return [_Failure(testcase_file, (run_result.stderr or run_result.stdout).strip())]
+
+
+def _verify_batch(cmd: list[str], testcase_files: list[Path]) -> list[_Failure]:
+    with Path(os.devnull).open() as f:
+        result = SourceTestcaseVerifier.verify_testcases(
+            cmd,
+            testcase_files,
+            runner_params=RunnerParams(
+                stdin=f,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check_returncode=False,
+            ),
+        )
+    if result.status == VerifierStatusEnum.Passed:
+        return []
+    files = {str(file): file for file in testcase_files}
+    failures = []
+    for line in result.run_result.stdout.splitlines():
+        name, _, message = line.partition(BATCH_FAILURE_SEPARATOR)
+        if name in files:
+            failures.append(_Failure(files[name], message))
+    if not failures:
+        # The verifier crashed without reporting the failed test cases
+        message = result.run_result.stderr.strip()
+        failures = [_Failure(file, message) for file in testcase_files]
+    return failures
+
+
+def _verify_testcases(
+    problem_with_config: ProblemWithConfig,
+    testcase_files: list[Path],
+    *,
+    jobs: int | None,
+    batch: bool,
+) -> list[_Failure]:
+    """Verify the test cases in parallel, and collect all the failures
+
+    The test cases are verified by the input format in the problem config if
+    it is set, and by the verifier otherwise. The verifier must be compiled.
+
+    Args:
+        problem_with_config (ProblemWithConfig): Problem of the test cases
+        testcase_files (list[Path]): Input files to verify
+        jobs (int | None):
+            Number of parallel verifications. Defaults to the number of CPUs.
+        batch (bool):
+            If True, run a verifier process per batch of test cases, passed as
+            arguments. The verifier prints a line
+            "<input file>: <message>" to stdout per failed test case.
+    Returns:
+        list[_Failure]: Failed test cases in the order of `testcase_files`
+    """
+    jobs = jobs or os.cpu_count() or 1
+    problem_cfg = problem_with_config.problem_config
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        if problem_cfg.input_format is not None:
+            format_verifier = FormatTestcaseVerifier(
+                problem_cfg.input_format, problem_cfg.params
+            )
+            results = executor.map(format_verifier.verify_testcase, testcase_files)
+            return [
+                _Failure(file, result.run_result.stderr.strip())
+                for file, result in zip(testcase_files, results, strict=True)
+                if result.status != VerifierStatusEnum.Passed
+            ]
+
+        verifier_file = problem_with_config.problem.verifier_file
+        lang = LanguageRegistry.get_languege_for_role(verifier_file, "verifier")
+        cmd = lang.compile(verifier_file).exec_cmd
+        if batch:
+            batches = [testcase_files[i::jobs] for i in range(jobs)]
+            futures = [
+                executor.submit(_verify_batch, cmd, files) for files in batches if files
+            ]
+        else:
+            futures = [
+                executor.submit(_verify_testcase, cmd, file) for file in testcase_files
+            ]
+        failures = [failure for future in futures for failure in future.result()]
+    order = {file: i for i, file in enumerate(testcase_files)}
+    return sorted(failures, key=lambda failure: order[failure.testcase_file])
+
+
+def _build(
+    problem_with_config: ProblemWithConfig,
+    virtual_groups: Sequence[problem_config._Test],
+) -> None:
+    """Compile the verifier and the generators of the virtual test groups
+
+    A compile error is raised once here, instead of from every verification.
+
+    Raises:
+        CompileError: If a file fails to compile
+    """
+    problem = problem_with_config.problem
+    files: list[tuple[Path, Role]] = [
+        (problem.generators_dir / test.name, "generator") for test in virtual_groups
+    ]
+    if problem_with_config.problem_config.input_format is None:
+        files.append((problem.verifier_file, "verifier"))
+    for file, role in files:
+        LanguageRegistry.get_languege_for_role(file, role).compile(file)
+
+
+def verify(path: Path | None, *, jobs: int | None, batch: bool) -> None:
+    logger.debug("Passed path: %s", path)
+    logger.info("Verifying the test cases")
+    problem_with_config = ProblemWithConfig(path, search_root=True)
+    problem = problem_with_config.problem
+    LanguageRegistry.load_config(problem_with_config.config.language)
+    gen_params.export_runtime_params(problem_with_config)
+    virtual_groups = [
+        test for test in problem_with_config.problem_config.tests if test.virtual
+    ]
+    _build(problem_with_config, virtual_groups)
+
+    virtual_names = {
+        Problem.input_file(problem.inputs_dir, test.name, test_id).name
+        for test in virtual_groups
+        for test_id in range(test.number)
+    }
+    testcase_files = [
+        file
+        for file in sorted(problem.inputs_dir.glob("*.in"))
+        if file.name not in virtual_names
+    ]
+    with VirtualTestStore(
+        load_manifest(problem.virtual_tests_file),
+        generators_dir=problem.generators_dir,
+    ) as virtual_tests:
+        # The inputs of the virtual test groups are not kept on disk
+        testcase_files += [
+            virtual_tests.input_file(name) for name in sorted(virtual_names)
+        ]
+        failures = _verify_testcases(
+            problem_with_config, testcase_files, jobs=jobs, batch=batch
+        )
+    for failure in failures:
+        logger.error("%s: %s", failure.testcase_file.name, failure.message)
+    if failures:
+        raise VerifyError(
+            f"{len(failures)} of {len(testcase_files)} test cases failed: "
+            f"{[failure.testcase_file.name for failure in failures]}"
+        )
+    logger.info("All the %d test cases are verified", len(testcase_files))
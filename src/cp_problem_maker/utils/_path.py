@@ -1,3 +1,6 @@
+import errno
+import os
+import shutil
 from pathlib import Path
 
 
@@ -16,3 +19,34 @@ def search_root(path: Path, marker: str) -> Path:
         if path == path.parent:
             raise FileNotFoundError(f"Could not find {marker}")
         path = path.parent
+
+
+def copy_file(src: Path, dest: Path) -> None:
+    """Copy a file without reading its content into the process.
+
+    The content is copied in the kernel by `copy_file_range`, which shares the
+    blocks on file systems supporting reflinks. `shutil.copyfile` is used where
+    it is not supported. The destination is replaced rather than overwritten,
+    so that files hard-linked to it are left untouched.
+
+    Args:
+        src (Path): File to copy
+        dest (Path): Destination of the copy
+    """
+    dest.unlink(missing_ok=True)
+    if hasattr(os, "copy_file_range"):
+        try:
+            with src.open("rb") as fsrc, dest.open("xb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30) > 0:
+                    pass
+            return
+        except OSError as e:
+            if e.errno not in (
+                errno.EXDEV,
+                errno.ENOSYS,
+                errno.EOPNOTSUPP,
+                errno.EINVAL,
+            ):
+                raise
+            dest.unlink(missing_ok=True)
+    shutil.copyfile(src, dest)
@@ -99,8 +99,10 @@ def update_model(model: BaseModel, update_dict: dict[str, Any]) -> None:
         if isinstance(curr_value, BaseModel):
             update_model(curr_value, value)
         else:
-            setattr(model, key, value)
-            type(model).model_validate(model)
+            # Validate the value with the field type, so that nested models
+            # in containers such as `dict[str, Model]` are not left as dicts
+            validated = type(model).model_validate({**model.model_dump(), key: value})
+            setattr(model, key, getattr(validated, key))
 
 
 class ModelAttributeAccessor:
@@ -0,0 +1,430 @@
+"""Strict input reader for Python verifiers
+
+The rules follow the validators of testlib: every space, newline and the end
+of the input must be read explicitly, and integers must be in the canonical
+form, i.e. without leading zeros, a plus sign or "-0".
+
+The input is memory-mapped, and arrays are checked with bulk operations on
+bytes and converted with `int` at once, so large inputs are verified without
+a Python loop per token.
+
+Examples:
+    >>> with Validator() as inf:
+    ...     n = inf.read_int(1, 2 * 10**5, "n")
+    ...     inf.read_eoln()
+    ...     a = inf.read_ints(n, 1, 10**9, "a")
+    ...     inf.read_eoln()
+    ...     inf.read_eof()
+
+    A verifier supporting the batch mode of `cp-problem-maker verify --batch`
+    wraps the verification in a function:
+
+    >>> def verify(inf: Validator) -> None:
+    ...     a = inf.read_int(0, 99, "a")
+    ...     inf.read_eoln()
+    ...     inf.read_eof()
+    >>> verify_inputs(verify)
+"""
+
+import io
+import mmap
+import re
+import sys
+from itertools import repeat
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Callable, NoReturn, Self, Sequence
+
+_INT = rb"(?:0|-?[1-9][0-9]*)"
+_INT_RE = re.compile(_INT)
+_REAL_RE = re.compile(rb"-?(?:0|[1-9][0-9]*)(?:\.([0-9]+))?")
+_TOKEN_RE = re.compile(rb"[^ \t\n\v\f\r]*")
+_WHITESPACE = b" \t\n\v\f\r"
+
+
+def _are_canonical_ints(data: bytes, tokens: list[bytes], sep: bytes) -> bool:
+    """Check that the tokens split from the data by the separator are integers
+    in the canonical form, with bulk operations on bytes"""
+    return not (
+        b"" in tokens
+        # Only digits, minus signs and separators
+        or data.translate(None, b"0123456789-" + sep)
+        # Minus signs only at the beginning of the tokens, followed by 1-9
+        or data.count(b"-") != (sep + data).count(sep + b"-")
+        or b"-0" in data
+        or b"-" in tokens
+        # No leading zeros
+        or (sep + data).count(sep + b"0") != tokens.count(b"0")
+    )
+
+
+def _max_int_length(lo: int, hi: int) -> int:
+    """Upper bound of the length of the integers in [lo, hi] in decimal
+
+    Longer tokens are out of range, and are not converted by `int`, which
+    fails on more than `sys.get_int_max_str_digits()` digits.
+    """
+    # log10(2) < 0.302, and 1 for the sign
+    return max(lo.bit_length(), hi.bit_length()) * 302 // 1000 + 2
+
+
+class ValidationError(Exception):
+    """The input does not follow the format"""
+
+
+class Validator:
+    """Strict reader of the input of a test case
+
+    Used as a context manager, a `ValidationError` is printed to stderr and
+    the verifier exits with 1.
+    """
+
+    def __init__(self, stream: BinaryIO | None = None) -> None:
+        """
+        Args:
+            stream (BinaryIO | None): Input to verify. Defaults to stdin.
+        """
+        if stream is None:
+            stream = sys.stdin.buffer
+        self._data: bytes | mmap.mmap
+        try:
+            self._data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, io.UnsupportedOperation):
+            # Pipes and empty files cannot be mapped
+            self._data = stream.read()
+        self._pos = 0
+        self._array_patterns: dict[tuple[int, bytes], re.Pattern[bytes]] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+        if isinstance(exc_value, ValidationError):
+            print(exc_value, file=sys.stderr)
+            raise SystemExit(1)
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def fail(self, message: str, pos: int | None = None) -> NoReturn:
+        """Raise a `ValidationError` with the position in the input
+
+        Args:
+            message (str): Reason of the error
+            pos (int | None): Offset of the error. Defaults to the current one.
+        Raises:
+            ValidationError: Always
+        """
+        if pos is None:
+            pos = self._pos
+        line = self._data[:pos].count(b"\n") + 1
+        column = pos - (self._data.rfind(b"\n", 0, pos) + 1) + 1
+        raise ValidationError(f"line {line}, column {column}: {message}")
+
+    def ensure(self, condition: bool, message: str) -> None:
+        """Fail with the message unless the condition holds"""
+        if not condition:
+            self.fail(message)
+
+    def _read_raw_token(self, name: str) -> bytes:
+        match = _TOKEN_RE.match(self._data, self._pos)
+        assert match is not None  # The pattern matches the empty string
+        token = match.group()
+        if not token:
+            self.fail(f"expected {name}")
+        self._pos = match.end()
+        return token
+
+    def read_token(
+        self,
+        pattern: str | None = None,
+        name: str = "a token",
+        *,
+        min_length: int = 1,
+        max_length: int | None = None,
+    ) -> str:
+        """Read a token of non-whitespace characters
+
+        Args:
+            pattern (str | None): Regular expression the whole token must match
+            name (str): Name of the token in error messages
+            min_length (int): Minimum number of characters
+            max_length (int | None): Maximum number of characters
+        Returns:
+            str: Token
+        """
+        start = self._pos
+        raw = self._read_raw_token(name)
+        try:
+            token = raw.decode()
+        except UnicodeDecodeError:
+            self.fail(f"{name} is not valid UTF-8", start)
+        if len(token) < min_length or (
+            max_length is not None and len(token) > max_length
+        ):
+            self.fail(
+                f"length of {name} = {len(token)} is out of range "
+                f"[{min_length}, {max_length}]",
+                start,
+            )
+        if pattern is not None and re.fullmatch(pattern, token) is None:
+            self.fail(f"{name} {token!r} does not match {pattern!r}", start)
+        return token
+
+    def read_int(self, lo: int, hi: int, name: str = "an integer") -> int:
+        """Read an integer in [lo, hi]
+
+        Args:
+            lo (int): Minimum value
+            hi (int): Maximum value
+            name (str): Name of the integer in error messages
+        Returns:
+            int: Integer
+        """
+        start = self._pos
+        token = self._read_raw_token(name)
+        if _INT_RE.fullmatch(token) is None:
+            self.fail(f"expected {name}, found {token!r}", start)
+        if len(token) > _max_int_length(lo, hi):
+            self.fail(
+                f"{name} of {len(token)} digits is out of range [{lo}, {hi}]", start
+            )
+        value = int(token)
+        if not lo <= value <= hi:
+            self.fail(f"{name} = {value} is out of range [{lo}, {hi}]", start)
+        return value
+
+    def read_ints(
+        self, n: int, lo: int, hi: int, name: str = "integers", sep: str = " "
+    ) -> list[int]:
+        """Read n integers in [lo, hi] separated by the separator
+
+        Args:
+            n (int): Number of integers
+            lo (int): Minimum value
+            hi (int): Maximum value
+            name (str): Name of the integers in error messages
+            sep (str): Separator between the integers, e.g. " " or "\\n"
+        Returns:
+            list[int]: Integers
+        """
+        if n <= 0:
+            return []
+        sep_bytes = sep.encode()
+        if b"\n" not in sep_bytes:
+            values = self._read_ints_in_line(n, lo, hi, sep_bytes)
+            if values is not None:
+                return values
+        key = (n, sep_bytes)
+        if key not in self._array_patterns:
+            self._array_patterns[key] = re.compile(
+                _INT + b"(?:" + re.escape(sep_bytes) + _INT + b"){%d}" % (n - 1)
+            )
+        match = self._array_patterns[key].match(self._data, self._pos)
+        if match is not None and (
+            match.end() == len(self._data)
+            or self._data[match.end() : match.end() + 1] in _WHITESPACE
+        ):
+            tokens = match.group().split(sep_bytes)
+            if max(map(len, tokens)) <= _max_int_length(lo, hi):
+                values = list(map(int, tokens))
+                if lo <= min(values) and max(values) <= hi:
+                    self._pos = match.end()
+                    return values
+        # Read one by one to report the position of the error
+        values = []
+        for i in range(n):
+            if i > 0:
+                self._expect(sep_bytes, f"expected {sep!r} in {name}")
+            values.append(self.read_int(lo, hi, f"{name}[{i}]"))
+        return values
+
+    def _read_ints_in_line(
+        self, n: int, lo: int, hi: int, sep: bytes
+    ) -> list[int] | None:
+        """Read n integers forming the rest of the line with bulk operations
+
+        Returns:
+            list[int] | None: Integers, or None if the line is not exactly
+                n valid integers in [lo, hi]
+        """
+        end = self._data.find(b"\n", self._pos)
+        if end == -1:
+            end = len(self._data)
+        line = self._data[self._pos : end]
+        tokens = line.split(sep)
+        if len(tokens) != n or not _are_canonical_ints(line, tokens, sep):
+            return None
+        if max(map(len, tokens)) > _max_int_length(lo, hi):
+            return None
+        values = list(map(int, tokens))
+        if not (lo <= min(values) and max(values) <= hi):
+            return None
+        self._pos = end
+        return values
+
+    def read_int_columns(
+        self, rows: int, bounds: Sequence[tuple[int, int]], names: Sequence[str]
+    ) -> list[list[int]]:
+        """Read lines of integers separated by spaces, e.g. the edges of a graph
+
+        Each line is followed by a newline.
+
+        Args:
+            rows (int): Number of lines
+            bounds (Sequence[tuple[int, int]]): Minimum and maximum value of
+                each column
+            names (Sequence[str]): Name of each column in error messages
+        Returns:
+            list[list[int]]: Integers in each column
+        """
+        if rows <= 0:
+            return [[] for _ in bounds]
+        columns = self._read_int_columns_in_bulk(rows, bounds)
+        if columns is not None:
+            return columns
+        # Read one by one to report the position of the error
+        columns = [[] for _ in bounds]
+        for i in range(rows):
+            for j, ((lo, hi), name) in enumerate(zip(bounds, names, strict=True)):
+                if j > 0:
+                    self.read_space()
+                columns[j].append(self.read_int(lo, hi, f"{name}[{i}]"))
+            self.read_eoln()
+        return columns
+
+    def _read_int_columns_in_bulk(
+        self, rows: int, bounds: Sequence[tuple[int, int]]
+    ) -> list[list[int]] | None:
+        lines = self._data[self._pos :].split(b"\n", rows)
+        if len(lines) <= rows:
+            return None
+        del lines[rows:]
+        if set(map(bytes.count, lines, repeat(b" "))) != {len(bounds) - 1}:
+            return None
+        data = b" ".join(lines)
+        tokens = data.split(b" ")
+        if not _are_canonical_ints(data, tokens, b" "):
+            return None
+        max_length = max(_max_int_length(lo, hi) for lo, hi in bounds)
+        if max(map(len, tokens)) > max_length:
+            return None
+        values = list(map(int, tokens))
+        columns = [values[j :: len(bounds)] for j in range(len(bounds))]
+        for column, (lo, hi) in zip(columns, bounds, strict=True):
+            if not (lo <= min(column) and max(column) <= hi):
+                return None
+        self._pos += len(data) + 1
+        return columns
+
+    def read_real(
+        self,
+        lo: float,
+        hi: float,
+        name: str = "a real number",
+        *,
+        max_decimals: int | None = None,
+    ) -> float:
+        """Read a real number in [lo, hi] in the fixed-point notation
+
+        Args:
+            lo (float): Minimum value
+            hi (float): Maximum value
+            name (str): Name of the number in error messages
+            max_decimals (int | None): Maximum number of digits after the point
+        Returns:
+            float: Real number
+        """
+        start = self._pos
+        token = self._read_raw_token(name)
+        match = _REAL_RE.fullmatch(token)
+        if match is None:
+            self.fail(f"expected {name}, found {token!r}", start)
+        value = float(token)
+        if value == 0 and token.startswith(b"-"):
+            self.fail(f"{name} {token!r} is a negative zero", start)
+        decimals = match.group(1)
+        if max_decimals is not None and decimals and len(decimals) > max_decimals:
+            self.fail(f"{name} has more than {max_decimals} decimals", start)
+        if not lo <= value <= hi:
+            self.fail(f"{name} = {value} is out of range [{lo}, {hi}]", start)
+        return value
+
+    def read_line(self, pattern: str | None = None, name: str = "a line") -> str:
+        """Read the rest of the line and the newline
+
+        Args:
+            pattern (str | None): Regular expression the whole line must match
+            name (str): Name of the line in error messages
+        Returns:
+            str: Line without the newline
+        """
+        start = self._pos
+        end = self._data.find(b"\n", start)
+        if end == -1:
+            self.fail(f"expected a newline after {name}", len(self._data))
+        try:
+            line = self._data[start:end].decode()
+        except UnicodeDecodeError:
+            self.fail(f"{name} is not valid UTF-8", start)
+        if pattern is not None and re.fullmatch(pattern, line) is None:
+            self.fail(f"{name} {line!r} does not match {pattern!r}", start)
+        self._pos = end + 1
+        return line
+
+    def _expect(self, expected: bytes, message: str) -> None:
+        end = self._pos + len(expected)
+        if self._data[self._pos : end] != expected:
+            self.fail(message)
+        self._pos = end
+
+    def read_space(self) -> None:
+        self._expect(b" ", "expected a space")
+
+    def read_eoln(self) -> None:
+        self._expect(b"\n", "expected a newline")
+
+    def read_eof(self) -> None:
+        if self._pos != len(self._data):
+            self.fail("expected the end of the input")
+
+
+def verify_inputs(
+    verify: Callable[[Validator], object], argv: Sequence[str] | None = None
+) -> NoReturn:
+    """Run the verification on stdin, or on each input file in the arguments
+
+    Input files are passed as arguments by `cp-problem-maker verify --batch`.
+    Each failure is printed to stdout as "<input file>: <message>", and all the
+    files are verified before exiting with 1 if any of them fails.
+
+    Args:
+        verify (Callable[[Validator], object]): Verification of an input
+        argv (Sequence[str] | None): Arguments. Defaults to `sys.argv`.
+    Raises:
+        SystemExit: Always, with 0 if all the inputs are valid, and 1 otherwise
+    """
+    files = (sys.argv if argv is None else argv)[1:]
+    if not files:
+        with Validator() as inf:
+            verify(inf)
+        raise SystemExit(0)
+    failed = False
+    for file in files:
+        with Path(file).open("rb") as f:
+            inf = Validator(f)
+            try:
+                verify(inf)
+            except ValidationError as e:
+                print(f"{file}: {e}", flush=True)
+                failed = True
+            finally:
+                inf.close()
+    raise SystemExit(1 if failed else 0)
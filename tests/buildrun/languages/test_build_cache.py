@@ -0,0 +1,240 @@
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from cp_problem_maker.buildrun.languages.build_cache import BuildCache
+from cp_problem_maker.buildrun.languages.cpp import Cpp, SolverCpp, _leading_includes
+from cp_problem_maker.buildrun.languages.language import CompileError
+from cp_problem_maker.buildrun.languages.python import SolverPython
+from cp_problem_maker.config import tool_config
+
+
+@pytest.fixture(scope="function")
+def build_cache() -> Generator[BuildCache, Any, None]:
+    with tempfile.TemporaryDirectory() as dirname:
+        yield BuildCache(Path(dirname), max_size_mb=None)
+
+
+@pytest.fixture(scope="function")
+def source_dir() -> Generator[Path, Any, None]:
+    with tempfile.TemporaryDirectory() as dirname:
+        yield Path(dirname)
+
+
+def _cpp_config() -> tool_config._Cpp:
+    return tool_config._Cpp(
+        flags=["-std=c++17"], solver=tool_config._CppOverride(flags=["-O2"])
+    )
+
+
+def test_compile_cache_hit(build_cache: BuildCache, source_dir: Path) -> None:
+    source = source_dir / "main.cpp"
+    source.write_text("int main() { return 0; }\n")
+    exec_file = Path(Cpp(_cpp_config(), build_cache).compile(source).exec_cmd[0])
+    mtime = exec_file.stat().st_mtime_ns
+    # A new instance has an empty in-memory cache, but hits the build cache
+    cached = Path(Cpp(_cpp_config(), build_cache).compile(source).exec_cmd[0])
+    assert cached == exec_file
+    assert exec_file.stat().st_mtime_ns >= mtime
+    assert not (source_dir / "main").exists()
+
+
+def test_compile_profiles_do_not_collide(
+    build_cache: BuildCache, source_dir: Path
+) -> None:
+    source = source_dir / "main.cpp"
+    source.write_text("int main() { return 0; }\n")
+    exec_file = Cpp(_cpp_config(), build_cache).compile(source).exec_cmd[0]
+    solver_exec_file = SolverCpp(_cpp_config(), build_cache).compile(source).exec_cmd
+    assert exec_file != solver_exec_file[0]
+
+
+def test_compile_header_change_invalidates(
+    build_cache: BuildCache, source_dir: Path
+) -> None:
+    source = source_dir / "main.cpp"
+    header = source_dir / "params.h"
+    source.write_text('#include "params.h"\nint main() { return N; }\n')
+    header.write_text("#define N 0\n")
+    exec_file = Cpp(_cpp_config(), build_cache).compile(source).exec_cmd[0]
+    header.write_text("#define N 1\n")
+    rebuilt = Cpp(_cpp_config(), build_cache).compile(source).exec_cmd[0]
+    assert rebuilt != exec_file
+    # Reverting the header makes the first artifact valid again
+    header.write_text("#define N 0\n")
+    assert Cpp(_cpp_config(), build_cache).compile(source).exec_cmd[0] == exec_file
+
+
+def test_compile_single_flight(
+    build_cache: BuildCache, source_dir: Path, mocker: MockerFixture
+) -> None:
+    source = source_dir / "main.cpp"
+    source.write_text("int main() { return 0; }\n")
+    cpp = Cpp(_cpp_config(), build_cache)
+    spy = mocker.spy(cpp, "_build")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(cpp.compile, [source] * 8))
+    assert spy.call_count == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_compile_with_precompiled_header(
+    build_cache: BuildCache, source_dir: Path
+) -> None:
+    header = source_dir / "common.h"
+    header.write_text("#pragma once\ninline int answer() { return 42; }\n")
+    for name in ["a", "b"]:
+        (source_dir / f"{name}.cpp").write_text(
+            '#include "common.h"\nint main() { return answer() - 42; }\n'
+        )
+    cpp_config = _cpp_config()
+    cpp_config.precompiled_headers = ["common.h"]
+    cpp = Cpp(cpp_config, build_cache)
+    for name in ["a", "b"]:
+        exec_file = cpp.compile(source_dir / f"{name}.cpp").exec_cmd[0]
+        assert subprocess.run([exec_file]).returncode == 0
+    pch_files = list(build_cache.root.glob("*/artifacts/*/common.h.gch"))
+    assert len(pch_files) == 1
+
+    # Editing the header invalidates the artifacts built with the old one
+    header.write_text("#pragma once\ninline int answer() { return 0; }\n")
+    cpp = Cpp(cpp_config, build_cache)
+    exec_file = cpp.compile(source_dir / "a.cpp").exec_cmd[0]
+    assert subprocess.run([exec_file]).returncode != 0
+
+
+def test_leading_includes() -> None:
+    source = """// comment
+#include <bits/stdc++.h>
+#include "testlib.h"
+#define N 10
+#include "params.h"
+"""
+    assert _leading_includes(source) == ["bits/stdc++.h", "testlib.h"]
+
+
+def test_compile_error(build_cache: BuildCache, source_dir: Path) -> None:
+    source = source_dir / "main.cpp"
+    source.write_text("int main() { return }\n")
+    with pytest.raises(CompileError):
+        Cpp(_cpp_config(), build_cache).compile(source)
+
+
+def test_eviction(source_dir: Path) -> None:
+    with tempfile.TemporaryDirectory() as dirname:
+        exec_files: list[Path] = []
+        for i in range(3):
+            # A cache per run, like separate commands
+            build_cache = BuildCache(Path(dirname), max_size_mb=1)
+            source = source_dir / f"main_{i}.cpp"
+            source.write_text(f"char buf[400000] = {{{i + 1}}};\nint main() {{}}\n")
+            cpp = Cpp(_cpp_config(), build_cache)
+            exec_files.append(Path(cpp.compile(source).exec_cmd[0]))
+        assert not exec_files[0].exists()
+        assert exec_files[-1].exists()
+
+
+def test_eviction_keeps_artifacts_in_use(source_dir: Path) -> None:
+    with tempfile.TemporaryDirectory() as dirname:
+        build_cache = BuildCache(Path(dirname), max_size_mb=1)
+        exec_files: list[Path] = []
+        for i in range(3):
+            source = source_dir / f"main_{i}.cpp"
+            source.write_text(f"char buf[400000] = {{{i + 1}}};\nint main() {{}}\n")
+            cpp = Cpp(_cpp_config(), build_cache)
+            exec_files.append(Path(cpp.compile(source).exec_cmd[0]))
+        assert all(exec_file.exists() for exec_file in exec_files)
+
+
+def test_eviction_keeps_artifacts_of_live_sessions(source_dir: Path) -> None:
+    with tempfile.TemporaryDirectory() as dirname:
+        # Another process still running its executable
+        other_cache = BuildCache(Path(dirname), max_size_mb=1)
+        source = source_dir / "main.cpp"
+        source.write_text("char buf[400000] = {1};\nint main() {}\n")
+        exec_file = Path(Cpp(_cpp_config(), other_cache).compile(source).exec_cmd[0])
+        for i in range(2):
+            build_cache = BuildCache(Path(dirname), max_size_mb=1)
+            source = source_dir / f"main_{i}.cpp"
+            source.write_text(f"char buf[400000] = {{{i + 2}}};\nint main() {{}}\n")
+            Cpp(_cpp_config(), build_cache).compile(source)
+        assert exec_file.exists()
+        # Evicted once the other process has ended
+        del other_cache
+        build_cache = BuildCache(Path(dirname), max_size_mb=1)
+        source = source_dir / "main_2.cpp"
+        source.write_text("char buf[400000] = {4};\nint main() {}\n")
+        Cpp(_cpp_config(), build_cache).compile(source)
+        assert not exec_file.exists()
+        assert len(list((Path(dirname) / "sessions").iterdir())) == 1
+
+
+def test_eviction_by_profile_budget(source_dir: Path) -> None:
+    with tempfile.TemporaryDirectory() as dirname:
+        source = source_dir / "main.cpp"
+        source.write_text("char buf[400000] = {1};\nint main() {}\n")
+        exec_file = Path(
+            Cpp(_cpp_config(), BuildCache(Path(dirname), max_size_mb=1))
+            .compile(source)
+            .exec_cmd[0]
+        )
+        answers: list[Path] = []
+        for i in range(3):
+            build_cache = BuildCache(
+                Path(dirname), max_size_mb=1, profile_max_size_mb={"answers": 1}
+            )
+            with build_cache.staging_dir("answers") as staging_dir:
+                answer = staging_dir / "answer"
+                answer.write_bytes(bytes([i]) * 400000)
+                answers.append(
+                    build_cache.store("answers", str(i), artifact=answer, deps=[])
+                )
+        # The answers only evict each other
+        assert exec_file.exists()
+        assert not answers[0].exists()
+        assert answers[-1].exists()
+
+
+def test_python_byte_compile(build_cache: BuildCache, source_dir: Path) -> None:
+    source = source_dir / "main.py"
+    source.write_text("import sys\nprint(__name__, __file__, sys.argv[1:])\n")
+    python_config = tool_config._Python(python="python3")
+    exec_cmd = SolverPython(python_config, build_cache).compile(source).exec_cmd
+    assert Path(exec_cmd[-2]).is_relative_to(build_cache.root)
+    proc = subprocess.run(
+        [*exec_cmd, "arg"], capture_output=True, text=True, check=True
+    )
+    assert proc.stdout == f"__main__ {source} ['arg']\n"
+    # A new instance reuses the bytecode in the build cache
+    language = SolverPython(python_config, build_cache)
+    assert language.compile(source).exec_cmd == exec_cmd
+
+
+def test_python_byte_compile_syntax_error(
+    build_cache: BuildCache, source_dir: Path
+) -> None:
+    source = source_dir / "main.py"
+    source.write_text("def (:\n")
+    python_config = tool_config._Python(python="python3")
+    exec_cmd = SolverPython(python_config, build_cache).compile(source).exec_cmd
+    assert exec_cmd == ["python3", str(source)]
+
+
+def test_static_link_fallback(build_cache: BuildCache, source_dir: Path) -> None:
+    source = source_dir / "main.cpp"
+    source.write_text("int main() { return 0; }\n")
+    # Sanitizers cannot be linked statically
+    cpp_config = tool_config._Cpp(
+        flags=["-fsanitize=address"],
+        static_link=True,
+        solver=tool_config._CppOverride(),
+    )
+    solver = SolverCpp(cpp_config, build_cache)
+    assert not solver.links_statically()
+    exec_file = solver.compile(source).exec_cmd[0]
+    assert subprocess.run([exec_file]).returncode == 0
@@ -1,9 +1,27 @@
+import importlib.metadata
+import sys
 from pathlib import Path
 
 import pytest
+from pytest_mock import MockerFixture
 
-from cp_problem_maker.buildrun.languages.cpp import Cpp
-from cp_problem_maker.buildrun.languages.language import ILanguage
+from cp_problem_maker.buildrun.languages import (
+    CheckerCpp,
+    Cpp,
+    GeneratorCpp,
+    ILanguage,
+    LanguageRegistry,
+    Role,
+    SolverCpp,
+    SolverPython,
+    ToolPython,
+    VerifierCpp,
+)
+from cp_problem_maker.buildrun.languages.language import (
+    ENTRY_POINT_GROUP,
+    _language_targets,
+)
+from cp_problem_maker.config import tool_config
 
 
 class TestLanguages:
@@ -34,3 +52,70 @@ class TestLanguages:
     def test_detect_language_invalid(self) -> None:
         with pytest.raises(ValueError):
             ILanguage.detect_language(Path("test.__invalid_extension__"))
+
+    def test_detect_language_plugin(
+        self, tmp_path: Path, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (tmp_path / "my_language_plugin.py").write_text(
+            """
+from cp_problem_maker.buildrun.languages import ILanguage
+
+class PluginLanguage(ILanguage):
+    @classmethod
+    def get_name(cls):
+        return "PluginLanguage"
+
+    @classmethod
+    def get_extensions(cls):
+        return [".__my_plugin_extension__"]
+
+    def compile(self, file_path):
+        raise NotImplementedError()
+"""
+        )
+        monkeypatch.syspath_prepend(tmp_path)
+        mocker.patch(
+            "importlib.metadata.entry_points",
+            return_value=[
+                importlib.metadata.EntryPoint(
+                    name=".__my_plugin_extension__",
+                    value="my_language_plugin:PluginLanguage",
+                    group=ENTRY_POINT_GROUP,
+                )
+            ],
+        )
+        _language_targets.cache_clear()
+        try:
+            language_type = ILanguage.detect_language(
+                Path("test.__my_plugin_extension__")
+            )
+        finally:
+            _language_targets.cache_clear()
+        assert language_type.get_name() == "PluginLanguage"
+        assert "my_language_plugin" in sys.modules
+
+
+@pytest.mark.parametrize(
+    "file_path, role, expected_language_type",
+    [
+        (Path("sol.cpp"), "solver", SolverCpp),
+        (Path("checker.cpp"), "checker", CheckerCpp),
+        (Path("verifier.cpp"), "verifier", VerifierCpp),
+        (Path("gen.cpp"), "generator", GeneratorCpp),
+        (Path("sol.py"), "solver", SolverPython),
+        (Path("gen.py"), "generator", ToolPython),
+    ],
+)
+def test_get_languege_for_role(
+    file_path: Path, role: Role, expected_language_type: type[ILanguage]
+) -> None:
+    LanguageRegistry.load_config(tool_config._Language())
+    language = LanguageRegistry.get_languege_for_role(file_path, role)
+    assert type(language) is expected_language_type
+
+
+@pytest.mark.parametrize(
+    "file_path, expected", [(Path("sol.cpp"), True), (Path("sol.py"), False)]
+)
+def test_has_sanitizer(file_path: Path, expected: bool) -> None:
+    assert ILanguage.detect_language(file_path).has_sanitizer() is expected
@@ -0,0 +1,73 @@
+import gzip
+import os
+import re
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+from cp_problem_maker.buildrun.runners.interaction import (
+    TO_JUDGE,
+    TO_SOLVER,
+    Channel,
+    ChannelStats,
+    Forwarder,
+    Transcript,
+)
+
+
+def _messages(transcript: Transcript) -> list[str]:
+    """Strip the header and the timestamps"""
+    lines = transcript.format().splitlines()
+    return [re.sub(r"^ *[0-9.]+ ", "", line) for line in lines[1:]]
+
+
+def test_transcript_joins_partial_lines() -> None:
+    transcript = Transcript(10)
+    transcript.record(TO_SOLVER, b"1 2")
+    transcript.record(TO_SOLVER, b"\n3")
+    transcript.record(TO_JUDGE, b"3\n")
+    transcript.record(TO_SOLVER, b" 4\n5")
+    assert _messages(transcript) == ["> 1 2", "< 3", "> 3 4", "> 5"]
+    assert transcript.format().startswith("# 3 of 3 lines.")
+
+
+def test_transcript_keeps_last_lines() -> None:
+    transcript = Transcript(3, max_line_bytes=4)
+    transcript.record(TO_SOLVER, b"".join(b"%d\n" % i for i in range(1000)))
+    transcript.record(TO_JUDGE, b"123456789\n")
+    assert _messages(transcript) == ["> 998", "> 999", "< 1234 ... (9 bytes)"]
+    assert transcript.format().startswith("# 3 of 1001 lines.")
+
+
+def test_transcript_save() -> None:
+    transcript = Transcript(10)
+    transcript.record(TO_SOLVER, b"1\n")
+    with TemporaryDirectory() as tmpdir:
+        transcript_file = Path(tmpdir) / "sol" / "00.txt.gz"
+        transcript.save(transcript_file)
+        with gzip.open(transcript_file, "rt") as f:
+            assert f.read() == transcript.format()
+
+
+def test_forwarder_waits_for_slow_receivers() -> None:
+    # More than a pipe holds, so that the forwarder waits for the receiver
+    data = b"0123456789abcde\n" * (1 << 16)
+    src_r, src_w = os.pipe()
+    dst_r, dst_w = os.pipe()
+    channel = Channel(src_r, dst_w, direction=TO_SOLVER)
+    forwarder = Forwarder([channel])
+    forwarder.start()
+
+    def send() -> None:
+        with os.fdopen(src_w, "wb") as f:
+            f.write(data)
+
+    sender = Thread(target=send)
+    sender.start()
+    with os.fdopen(dst_r, "rb") as f:
+        received = f.read()
+    sender.join()
+    forwarder.join(5.0)
+    assert not forwarder.is_alive()
+    assert received == data
+    assert channel.stats() == ChannelStats(messages=1 << 16, bytes=len(data))
@@ -1,9 +1,13 @@
+import signal
 import subprocess
+import time
 from pathlib import Path
 
 import pytest
+from pytest_mock import MockerFixture
 
-from cp_problem_maker.buildrun.runners import runner
+from cp_problem_maker.buildrun.runners import fork_server, runner
+from cp_problem_maker.buildrun.runners.interaction import Transcript
 from tests.helpers.compile import compile_cpp
 from tests.helpers.files import temp_files
 
@@ -128,3 +132,282 @@ def test_run_check_returncode_not_raise(py_file: Path) -> None:
                 stdin=stdin, stdout=stdout, stderr=stderr, check_returncode=False
             ),
         )
+
+
+@pytest.mark.parametrize("n, m", [(1, 2), (3, 4)])
+def test_run_fork_server(py_file: Path, n: int, m: int) -> None:
+    py_code = """
+import sys
+n, m = map(int, input().split())
+print(n + m, file=sys.stdout)
+print(n * m, file=sys.stderr)
+sys.exit(int(sys.argv[1]))
+"""
+    py_file.write_text(py_code)
+    cmd = fork_server.get_server(["python3"], py_file.resolve()).command()
+    with temp_files(3) as (stdin, stdout, stderr):
+        stdin.write(f"{n} {m}\n")
+        stdin.seek(0)
+        run_result = runner.run(
+            cmd + [str(n)],
+            runner_params=runner.RunnerParams(
+                stdin=stdin, stdout=stdout, stderr=stderr, check_returncode=False
+            ),
+        )
+    assert run_result.stdout.strip() == str(n + m)
+    assert run_result.stderr.strip() == str(n * m)
+    assert run_result.returncode == n
+
+
+def test_run_fork_server_timeout(py_file: Path) -> None:
+    py_file.write_text("while True: pass")
+    cmd = fork_server.get_server(["python3"], py_file.resolve()).command()
+    with pytest.raises(subprocess.TimeoutExpired):
+        with temp_files(3) as (stdin, stdout, stderr):
+            runner.run(
+                cmd,
+                runner_params=runner.RunnerParams(
+                    stdin=stdin,
+                    stdout=stdout,
+                    stderr=stderr,
+                    timeout=0.5,
+                    check_returncode=False,
+                ),
+            )
+
+
+@pytest.mark.parametrize("stack_limit, expected_ok", [(1, False), (256, True)])
+def test_run_stack_limit(
+    cpp_file: Path, stack_limit: runner.StackLimit, expected_ok: bool
+) -> None:
+    cpp_code = """
+#include <iostream>
+
+int depth(volatile int n) <% return n == 0 ? 0 : depth(n - 1) + 1; %>
+
+int main() <% std::cout << depth(1000000) << std::endl; %>
+"""
+    exe_file = compile_cpp(cpp_file, cpp_code)
+    with temp_files(3) as (stdin, stdout, stderr):
+        run_result = runner.run(
+            [f"{exe_file}"],
+            runner_params=runner.RunnerParams(
+                stdin=stdin,
+                stdout=stdout,
+                stderr=stderr,
+                check_returncode=False,
+                stack_limit=stack_limit,
+            ),
+        )
+    assert (run_result.returncode == 0) == expected_ok
+
+
+@pytest.mark.parametrize("pipe_size_kb", [128, 256])
+def test_run_interactive_judge_pipe_size(py_file: Path, pipe_size_kb: int) -> None:
+    # Both sides report the capacity of their stdin to each other
+    py_code = """
+import fcntl
+import sys
+size = str(fcntl.fcntl(0, fcntl.F_GETPIPE_SZ))
+if sys.argv[1] == "judge":
+    print(size, flush=True)
+    sys.exit(0 if input() == size == sys.argv[2] else 1)
+print(size if input() == size else -1, flush=True)
+"""
+    py_file.write_text(py_code)
+    run_result = runner.run_interactive_judge(
+        ["python3", f"{py_file}", "judge", str(pipe_size_kb * 1024)],
+        ["python3", f"{py_file}", "solver"],
+        params=runner.InteractiveJudgeParams(
+            stderr=subprocess.DEVNULL,
+            judge_stderr=subprocess.DEVNULL,
+            timeout=5.0,
+            pipe_size_kb=pipe_size_kb,
+        ),
+    )
+    assert run_result.returncode == 0
+
+
+def test_run_interactive_judge_count_messages(py_file: Path) -> None:
+    py_code = """
+import sys
+if sys.argv[1] == "judge":
+    for i in range(3):
+        print(i, flush=True)
+        assert input() == str(i * 10)
+else:
+    for _ in range(3):
+        print(int(input()) * 10, flush=True)
+"""
+    py_file.write_text(py_code)
+    transcript = Transcript(10)
+    run_result = runner.run_interactive_judge(
+        ["python3", f"{py_file}", "judge"],
+        ["python3", f"{py_file}", "solver"],
+        params=runner.InteractiveJudgeParams(
+            stderr=subprocess.DEVNULL,
+            judge_stderr=subprocess.DEVNULL,
+            timeout=5.0,
+            count_messages=True,
+            transcript=transcript,
+        ),
+    )
+    assert run_result.returncode == 0
+    directions = [line.split()[1] for line in transcript.format().splitlines()[1:]]
+    assert directions == [">", "<"] * 3
+    assert run_result.interaction is not None
+    assert run_result.interaction.to_solver.model_dump() == {"messages": 3, "bytes": 6}
+    assert run_result.interaction.to_judge.model_dump() == {"messages": 3, "bytes": 8}
+
+
+def test_run_interactive_judge_partial_result(py_file: Path) -> None:
+    # The solver answers twice, then hangs
+    py_code = """
+import sys
+import time
+if sys.argv[1] == "judge":
+    for i in range(3):
+        print(i, flush=True)
+        input()
+else:
+    for _ in range(2):
+        print(input(), flush=True)
+    time.sleep(10)
+"""
+    py_file.write_text(py_code)
+    with pytest.raises(runner.SolverTimeoutExpired) as e:
+        runner.run_interactive_judge(
+            ["python3", f"{py_file}", "judge"],
+            ["python3", f"{py_file}", "solver"],
+            params=runner.InteractiveJudgeParams(
+                stderr=subprocess.DEVNULL,
+                judge_stderr=subprocess.DEVNULL,
+                timeout=0.5,
+                count_messages=True,
+            ),
+        )
+    run_result = e.value.run_result
+    assert run_result is not None
+    assert run_result.elapsed_time >= 0.5
+    assert run_result.cpu_time is not None and run_result.judge_cpu_time is not None
+    assert run_result.interaction is not None
+    assert run_result.interaction.to_solver.messages == 3
+    assert run_result.interaction.to_judge.messages == 2
+
+
+@pytest.mark.parametrize("cpu_time_limit", [False, True])
+def test_run_interactive_judge_slow_judge(py_file: Path, cpu_time_limit: bool) -> None:
+    # The solver waits for the judge longer than the timeout without running
+    py_code = """
+import sys
+import time
+if sys.argv[1] == "judge":
+    time.sleep(1.0)
+    print(1, flush=True)
+    input()
+else:
+    print(input())
+"""
+    py_file.write_text(py_code)
+
+    def run() -> runner.RunResult:
+        return runner.run_interactive_judge(
+            ["python3", f"{py_file}", "judge"],
+            ["python3", f"{py_file}", "solver"],
+            params=runner.InteractiveJudgeParams(
+                stderr=subprocess.DEVNULL,
+                judge_stderr=subprocess.DEVNULL,
+                timeout=0.5,
+                cpu_time_limit=cpu_time_limit,
+                # Sleeping is not waiting for the other side
+                idleness_limit=0.2,
+            ),
+        )
+
+    if not cpu_time_limit:
+        with pytest.raises(runner.SolverTimeoutExpired):
+            run()
+        return
+    run_result = run()
+    assert run_result.returncode == 0
+    assert run_result.elapsed_time > 1.0
+    assert run_result.cpu_time is not None and run_result.cpu_time < 0.5
+
+
+@pytest.mark.skipif(
+    not Path("/proc/self/wchan").exists(), reason="/proc is not available"
+)
+@pytest.mark.parametrize("count_messages", [False, True])
+def test_run_interactive_judge_idleness(py_file: Path, count_messages: bool) -> None:
+    # The solver reads again without answering, as if its answer were left
+    # in the buffer, so both sides wait to read
+    py_code = """
+import sys
+if sys.argv[1] == "judge":
+    print(1, flush=True)
+    input()
+else:
+    input()
+    input()
+"""
+    py_file.write_text(py_code)
+    start_time = time.perf_counter()
+    with pytest.raises(runner.IdlenessLimitExceeded):
+        runner.run_interactive_judge(
+            ["python3", f"{py_file}", "judge"],
+            ["python3", f"{py_file}", "solver"],
+            params=runner.InteractiveJudgeParams(
+                stderr=subprocess.DEVNULL,
+                judge_stderr=subprocess.DEVNULL,
+                timeout=10.0,
+                count_messages=count_messages,
+                idleness_limit=0.2,
+            ),
+        )
+    assert time.perf_counter() - start_time < 5.0
+
+
+def test_reaper_kill(mocker: MockerFixture) -> None:
+    process = subprocess.Popen(["sleep", "10"])
+    reaper = runner._Reaper(process)
+    reaper.start()
+    # Polling would reap the process behind the reaper
+    poll = mocker.spy(process, "poll")
+    reaper.kill()
+    assert not reaper.is_alive()
+    assert process.returncode == -signal.SIGKILL
+    poll.assert_not_called()
+    # Killing again after the process has gone is a no-op
+    reaper.kill()
+
+
+@pytest.mark.parametrize(
+    ("wchan", "threads", "expected"),
+    [
+        ("pipe_read", 1, (10, 20)),
+        ("anon_pipe_read", 1, (10, 20)),
+        ("pipe_wait", 1, (10, 20)),
+        # Blocked on writing to a full pipe, waiting for the other side
+        ("pipe_write", 1, None),
+        ("anon_pipe_write", 1, None),
+        # Another thread may be computing while the main thread reads
+        ("pipe_read", 2, None),
+    ],
+)
+def test_pipe_read_io(
+    tmp_path: Path,
+    mocker: MockerFixture,
+    wchan: str,
+    threads: int,
+    expected: tuple[int, int] | None,
+) -> None:
+    proc_dir = tmp_path / "42"
+    proc_dir.mkdir()
+    (proc_dir / "status").write_text(
+        f"Name:\tsol ver\nState:\tS (sleeping)\nThreads:\t{threads}\n"
+    )
+    (proc_dir / "stat").write_text("42 (sol ver) S 1 42 42 0")
+    (proc_dir / "wchan").write_text(wchan)
+    (proc_dir / "io").write_text("rchar: 10\nwchar: 20\nsyscr: 1\n")
+    mocker.patch.object(runner, "_PROC_DIR", tmp_path)
+    assert runner._pipe_read_io(42) == expected
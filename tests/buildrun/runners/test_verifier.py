@@ -0,0 +1,87 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+import pydantic
+import pytest
+
+from cp_problem_maker.buildrun.runners.verifier import (
+    FormatTestcaseVerifier,
+    VerifierStatusEnum,
+)
+from cp_problem_maker.config.problem_config import _InputFormat
+
+_INPUT_FORMAT: dict[str, Any] = {
+    "lines": [
+        {
+            "tokens": [
+                {"name": "N", "min": "N_MIN", "max": "N_MAX"},
+                {"name": "S", "type": "str", "min": 1, "max": "N", "pattern": "[a-z]+"},
+            ]
+        },
+        {"tokens": [{"name": "A", "length": "N", "min": 1, "max": "2 * N"}]},
+        {
+            "repeat": "N - 1",
+            "tokens": [
+                {"name": "u", "min": 1, "max": "N"},
+                {"name": "v", "min": 1, "max": "N"},
+            ],
+        },
+        {
+            "repeat": 2,
+            "tokens": [
+                {"name": "c", "type": "str", "pattern": "[+-]"},
+                {"name": "x", "type": "float", "min": 0, "max": 1, "max_decimals": 2},
+            ],
+        },
+    ]
+}
+
+
+@pytest.mark.parametrize(
+    "content, error",
+    [
+        ("3 abc\n1 6 2\n1 2\n2 3\n+ 0.5\n- 1\n", ""),
+        ("3 abcd\n1 6 2\n1 2\n2 3\n+ 0.5\n- 1\n", "line 1, column 3: length of S"),
+        ("3 abc\n1 7 2\n1 2\n2 3\n+ 0.5\n- 1\n", "line 2, column 3: A[1] = 7"),
+        ("3 abc\n1 6 2\n1 2\n2 4\n+ 0.5\n- 1\n", "line 4, column 3: v[1] = 4"),
+        ("3 abc\n1 6 2\n1 2\n2 3\n+ 0.5\n* 1\n", "line 6, column 1: c[1] '*'"),
+        ("3 abc\n1 6 2\n1 2\n2 3\n+ 0.5\n- 1\n\n", "line 7, column 1: expected"),
+        ("0 a\n\n\n\n", "line 1, column 1: N = 0 is out of range [1, 10]"),
+    ],
+)
+def test_format_verifier(content: str, error: str) -> None:
+    verifier = FormatTestcaseVerifier(
+        _InputFormat.model_validate(_INPUT_FORMAT), {"N_MIN": 1, "N_MAX": 10}
+    )
+    with TemporaryDirectory() as tmpdir:
+        testcase_file = Path(tmpdir) / "00_sample_00.in"
+        testcase_file.write_text(content)
+        result = verifier.verify_testcase(testcase_file)
+    if error:
+        assert result.status == VerifierStatusEnum.Failed
+        assert result.run_result.stderr.startswith(error)
+    else:
+        assert result.status == VerifierStatusEnum.Passed
+        assert result.run_result.stderr == ""
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        {"name": "N", "min": 1},
+        {"name": "N", "min": "__import__('os')", "max": 1},
+        {"name": "N", "min": 1, "max": 1, "pattern": "[0-9]+"},
+    ],
+)
+def test_input_format_invalid(token: dict[str, Any]) -> None:
+    with pytest.raises(pydantic.ValidationError):
+        _InputFormat.model_validate({"lines": [{"tokens": [token]}]})
+
+
+def test_input_format_name_conflict() -> None:
+    input_format = _InputFormat.model_validate(
+        {"lines": [{"tokens": [{"name": "N", "min": 1, "max": 10}]}]}
+    )
+    with pytest.raises(ValueError):
+        FormatTestcaseVerifier(input_format, {"N": 1})
@@ -75,3 +75,18 @@ default = "C++"  # Overwrite the global config
         assert config.language.default == "C++"
         assert config.checker.style == "yukicoder"
         assert config.path.problem_config == "AAAAA.toml"
+
+
+def test_local_config_toolchains() -> None:
+    local_config = """
+[language.cpp.toolchains.clang]
+compiler = "clang++"
+flags = ["-std=c++20", "-O2"]
+"""
+    with temp_files(1, suffix=".toml") as (temp_config,):
+        temp_config.write(local_config)
+        temp_config.seek(0)
+        config = load_local_config(Path(temp_config.name))
+        toolchain = config.language.cpp.toolchains["clang"]
+        assert toolchain.compiler == "clang++"
+        assert toolchain.flags == ["-std=c++20", "-O2"]
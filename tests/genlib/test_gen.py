@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np  # noqa: E402
+
+from cp_problem_maker.genlib import Gen  # noqa: E402
+
+
+def test_gen_deterministic() -> None:
+    gen1 = Gen.from_argv(["gen", "3", "12345"])
+    gen2 = Gen(12345)
+    assert gen1.case_id == 3
+    assert gen1.ints(100, 1, 10**9).tolist() == gen2.ints(100, 1, 10**9).tolist()
+    assert gen1.string(100) == gen2.string(100)
+
+
+def test_gen_values() -> None:
+    gen = Gen(0)
+    a = gen.ints(1000, -5, 5)
+    assert a.min() == -5 and a.max() == 5
+    assert sorted(gen.permutation(100).tolist()) == list(range(1, 101))
+    assert sorted(gen.permutation(100, start=0).tolist()) == list(range(100))
+    distinct = gen.distinct(1000, 10**18, 10**18 + 999)
+    assert sorted(distinct.tolist()) == list(range(10**18, 10**18 + 1000))
+    assert len(np.unique(gen.distinct(10**5, 1, 10**18))) == 10**5
+    assert set(gen.string(1000, "ab")) == {"a", "b"}
+
+
+def test_gen_invalid() -> None:
+    gen = Gen(0)
+    with pytest.raises(ValueError):
+        gen.distinct(11, 1, 10)
+    with pytest.raises(ValueError):
+        gen.string(10, "")
@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np  # noqa: E402
+import numpy.typing as npt  # noqa: E402
+
+from cp_problem_maker.genlib import Gen, graph  # noqa: E402
+
+
+def _is_connected(n: int, edges: npt.NDArray[np.int64]) -> bool:
+    parent = list(range(n + 1))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v in edges.tolist():
+        parent[find(u)] = find(v)
+    return len({find(v) for v in range(1, n + 1)}) == 1
+
+
+def _is_simple(edges: npt.NDArray[np.int64]) -> bool:
+    pairs = np.sort(edges, axis=1)
+    return bool((pairs[:, 0] != pairs[:, 1]).all()) and len(
+        np.unique(pairs, axis=0)
+    ) == len(pairs)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 1000])
+def test_trees(n: int) -> None:
+    gen = Gen(n)
+    for edges in [
+        graph.tree(gen, n),
+        graph.path(gen, n),
+        graph.star(gen, n),
+        graph.caterpillar(gen, n, (n + 1) // 2),
+    ]:
+        assert edges.shape == (n - 1, 2)
+        assert _is_connected(n, edges)
+        assert edges.size == 0 or (edges.min() >= 1 and edges.max() <= n)
+
+
+def test_tree_uniform() -> None:
+    gen = Gen(0)
+    # All 3 labeled trees with 3 vertices are equally likely
+    centers = [np.bincount(graph.tree(gen, 3).ravel()).argmax() for _ in range(3000)]
+    counts = np.bincount(centers, minlength=4)[1:]
+    assert counts.min() > 900
+
+
+@pytest.mark.parametrize("n, m", [(2, 1), (10, 9), (10, 45), (1000, 5000)])
+def test_connected_graph(n: int, m: int) -> None:
+    edges = graph.connected_graph(Gen(0), n, m)
+    assert len(edges) == m
+    assert _is_connected(n, edges)
+    assert _is_simple(edges)
+
+
+def test_connected_graph_invalid() -> None:
+    with pytest.raises(ValueError):
+        graph.connected_graph(Gen(0), 10, 8)
+    with pytest.raises(ValueError):
+        graph.connected_graph(Gen(0), 10, 46)
+
+
+def test_dag() -> None:
+    n, m = 100, 1000
+    edges = graph.dag(Gen(0), n, m)
+    assert _is_simple(edges)
+    # Kahn's algorithm visits every vertex iff the graph is acyclic
+    indegree = np.bincount(edges[:, 1], minlength=n + 1)
+    adjacency: list[list[int]] = [[] for _ in range(n + 1)]
+    for u, v in edges.tolist():
+        adjacency[u].append(v)
+    stack = [v for v in range(1, n + 1) if indegree[v] == 0]
+    visited = 0
+    while stack:
+        u = stack.pop()
+        visited += 1
+        for v in adjacency[u]:
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                stack.append(v)
+    assert visited == n
+
+
+def test_planted_string() -> None:
+    gen = Gen(0)
+    assert gen.planted_string(30, "abc", 5, "x").count("abc") == 5
+    assert gen.planted_string(9, "abc", 3, "x") == "abcabcabc"
+    with pytest.raises(ValueError):
+        gen.planted_string(8, "abc", 3)
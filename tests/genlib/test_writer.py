@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np  # noqa: E402
+
+from cp_problem_maker.genlib import Gen, Writer  # noqa: E402
+
+
+@pytest.mark.parametrize("lo, hi", [(0, 9), (-(10**4), 10**4), (-(2**63), 2**63 - 1)])
+@pytest.mark.parametrize("cols", [1, 3])
+def test_writer_matrix(lo: int, hi: int, cols: int) -> None:
+    a = Gen(0).ints(3000, lo, hi).reshape(-1, cols)
+    a[0, 0] = lo
+    a[-1, -1] = hi
+    buffer = io.BytesIO()
+    with Writer(buffer) as out:
+        out.matrix(a)
+    expected = "".join(" ".join(map(str, row)) + "\n" for row in a.tolist())
+    assert buffer.getvalue().decode() == expected
+
+
+def test_writer_mixed() -> None:
+    buffer = io.BytesIO()
+    with Writer(buffer) as out:
+        out.line(3, "abc")
+        out.array([1, -2, 3])
+        out.array(np.array([2**64 - 1, 0], dtype=np.uint64), sep=",")
+        out.lines([4, 5])
+        out.array([])
+        out.array([0.5, 1.0])
+        out.write("end\n")
+    assert buffer.getvalue().decode() == (
+        "3 abc\n1 -2 3\n18446744073709551615,0\n4\n5\n\n0.5 1.0\nend\n"
+    )
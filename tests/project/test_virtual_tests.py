@@ -0,0 +1,85 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from cp_problem_maker.buildrun.languages import LanguageRegistry
+from cp_problem_maker.buildrun.languages.build_cache import hash_file
+from cp_problem_maker.config import tool_config
+from cp_problem_maker.project.virtual_tests import (
+    VirtualTest,
+    VirtualTestError,
+    VirtualTestManifest,
+    VirtualTestStore,
+    load_manifest,
+    save_manifest,
+)
+
+_GENERATOR = """
+import sys
+
+case_id, seed = map(int, sys.argv[1:])
+print(case_id, seed % 1000)
+"""
+
+
+def _solve(input_file: Path, answer_file: Path) -> None:
+    a, b = map(int, input_file.read_text().split())
+    answer_file.write_text(f"{a + b}\n")
+
+
+def test_virtual_test_store() -> None:
+    with TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        LanguageRegistry.load_config(
+            tool_config._Language.model_validate({"cache": {"path": str(root / "c")}})
+        )
+        (root / "gen.py").write_text(_GENERATOR)
+        with VirtualTestStore(VirtualTestManifest(), generators_dir=root) as store:
+            input_file = store.generate_input(
+                "gen_00.in", generator="gen.py", case_id=3, seed=12345
+            )
+            assert input_file.read_text() == "3 345\n"
+            answer_file = store.memory_dir / "gen_00.out"
+            _solve(input_file, answer_file)
+            store.manifest.tests["gen_00.in"] = VirtualTest(
+                generator="gen.py",
+                case_id=3,
+                seed=12345,
+                input_sha256=hash_file(input_file),
+                answer_sha256=store.store_answer(answer_file),
+            )
+        manifest_file = root / "virtual_tests.json"
+        save_manifest(manifest_file, store.manifest)
+
+        # The answer is cached, and the input is regenerated in memory
+        manifest = load_manifest(manifest_file)
+        with VirtualTestStore(manifest, generators_dir=root) as store:
+            assert store.input_file("gen_00.in").parent == store.memory_dir
+            assert store.input_file("gen_00.in").read_text() == "3 345\n"
+            assert store.answer_file("gen_00.in").read_text() == "348\n"
+            with pytest.raises(VirtualTestError):
+                store.input_file("gen_01.in")
+
+        # Inputs beyond the memory budget are regenerated on disk
+        with VirtualTestStore(
+            manifest, generators_dir=root, memory_budget_mb=0
+        ) as store:
+            input_file = store.input_file("gen_00.in")
+            assert input_file.parent == store.disk_dir
+            assert input_file.read_text() == "3 345\n"
+        assert not input_file.exists()
+
+        # The answer is generated again if it is evicted from the cache
+        LanguageRegistry.load_config(
+            tool_config._Language.model_validate({"cache": {"path": str(root / "d")}})
+        )
+        with VirtualTestStore(manifest, generators_dir=root, solve=_solve) as store:
+            assert store.answer_file("gen_00.in").read_text() == "348\n"
+
+        # Inputs that are not regenerated identically are rejected
+        test = manifest.tests["gen_00.in"]
+        manifest.tests["gen_00.in"] = test.model_copy(update={"seed": 1})
+        with VirtualTestStore(manifest, generators_dir=root) as store:
+            with pytest.raises(VirtualTestError):
+                store.input_file("gen_00.in")
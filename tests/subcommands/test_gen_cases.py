@@ -0,0 +1,100 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+from pytest_mock import MockerFixture
+
+from cp_problem_maker.buildrun.runners.runner import RunResult
+from cp_problem_maker.buildrun.runners.solver import SolveResult, SolverStatusEnum
+from cp_problem_maker.subcommands import gen_cases
+
+# Output and elapsed time of each solution
+_SOLUTIONS = {
+    "slow.py": ("3\n", 1.0),
+    "fast.cpp": ("3\n", 0.1),
+    "wrong.cpp": ("4\n", 0.01),
+}
+
+
+def _fake_solve(
+    solution_file: Path,
+    testcase_file: Path,
+    output_file: Path,
+    *,
+    params: gen_cases._SolutionParams,
+) -> SolveResult:
+    output, elapsed_time = _SOLUTIONS[solution_file.name]
+    if solution_file.name == "fast.cpp" and testcase_file.read_text() == "hard\n":
+        output = "5\n"
+    if solution_file.name == "slow.py" and testcase_file.read_text() == "huge\n":
+        elapsed_time = 10.0
+    if elapsed_time > params.timeout:
+        # A truncated answer
+        output_file.write_text(output[:-1])
+        return SolveResult(run_result=None, status=SolverStatusEnum.Timeout)
+    output_file.write_text(output)
+    return SolveResult(
+        run_result=RunResult(
+            stdout="",
+            stderr="",
+            returncode=0,
+            elapsed_time=elapsed_time,
+            used_memory_mb=0.0,
+        ),
+        status=SolverStatusEnum.Success,
+    )
+
+
+def _fake_is_accepted(
+    testcase_file: Path,
+    output_file: Path,
+    answer_file: Path,
+    *,
+    fastest: gen_cases._FastestSolutionParams,
+) -> bool:
+    return output_file.read_text() == answer_file.read_text()
+
+
+def test_generate_answers_by_fastest(mocker: MockerFixture) -> None:
+    solve = mocker.patch.object(gen_cases, "_solve", side_effect=_fake_solve)
+    mocker.patch.object(gen_cases, "_is_accepted", side_effect=_fake_is_accepted)
+    with TemporaryDirectory() as tmpdir:
+        fastest = gen_cases._FastestSolutionParams(
+            expected_file=Path("slow.py"),
+            checker=mocker.Mock(),
+            checker_file=Path("checker.cpp"),
+            sample=2,
+            cross_check=1.0,
+            elapsed_times={Path(name): 0.0 for name in _SOLUTIONS},
+        )
+        params = gen_cases._SolutionParams(
+            file=Path("slow.py"),
+            answers_dir=Path(tmpdir),
+            # Only the expected solution may exceed the time limit
+            timeout=0.5,
+            memory_limit=None,
+            stack_limit=None,
+            fastest=fastest,
+        )
+
+        def generate_answer(name: str, content: str) -> list[str]:
+            solve.reset_mock()
+            testcase_file = Path(tmpdir) / f"{name}.in"
+            testcase_file.write_text(content)
+            gen_cases._generate_answer(testcase_file, params=params)
+            assert testcase_file.with_suffix(".out").read_text() == "3\n"
+            return [call.args[0].name for call in solve.call_args_list]
+
+        # The expected solution generates the answers while benchmarking
+        assert generate_answer("00", "easy\n") == ["slow.py", "fast.cpp", "wrong.cpp"]
+        assert fastest.elapsed_times[Path("wrong.cpp")] == float("inf")
+        assert generate_answer("01", "easy\n") == ["slow.py", "fast.cpp"]
+        assert fastest.solution_file == Path("fast.cpp")
+        # The other answers are generated by the fastest one, and cross-checked
+        assert generate_answer("02", "easy\n") == ["fast.cpp", "slow.py"]
+        with pytest.raises(ValueError, match="is not accepted"):
+            generate_answer("03", "hard\n")
+
+        # The truncated answer of the expected solution is not a reference
+        with pytest.raises(ValueError, match="ended with Timeout"):
+            generate_answer("04", "huge\n")
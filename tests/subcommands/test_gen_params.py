@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+
+from cp_problem_maker.buildrun.runners import runner
+from cp_problem_maker.subcommands import gen_params
+from tests.helpers.compile import compile_cpp
+from tests.helpers.files import temp_files
+
+
+def test_runtime_params_cpp(cpp_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    params: dict[str, int | float | str] = {"N_MAX": 10, "EPS": 0.5, "S": "abc"}
+    header_file = gen_params.runtime_params_file(cpp_file.with_suffix(".h"))
+    header_file.write_text(gen_params._declare_runtime_params(params, "C++"))
+    cpp_code = f"""
+#include <iostream>
+#include "{header_file.name}"
+
+int main() <% std::cout << N_MAX * EPS << ' ' << S << std::endl; %>
+"""
+    try:
+        exe_file = compile_cpp(cpp_file, cpp_code)
+    finally:
+        header_file.unlink()
+    params["N_MAX"] = 20  # Changing the values does not require a rebuild
+    for name, value in gen_params.runtime_param_env(params).items():
+        monkeypatch.setenv(name, value)
+    with temp_files(3) as (stdin, stdout, stderr):
+        run_result = runner.run(
+            [str(exe_file)],
+            runner_params=runner.RunnerParams(
+                stdin=stdin, stdout=stdout, stderr=stderr, check_returncode=True
+            ),
+        )
+    exe_file.unlink()
+    assert run_result.stdout.split() == ["10", "abc"]
+
+
+@pytest.mark.parametrize(
+    "content, expected_ok",
+    [
+        ("3\n1 -2 3\n", True),
+        ("3\n1 -2  3\n", False),
+        ("3\n1 -0 3\n", False),
+        ("3\n1 -2 3", False),
+        ("3\n1 -2 3\n\n", False),
+        ("3\n1 2 9223372036854775808\n", False),
+    ],
+)
+def test_fastio_strict_reader(cpp_file: Path, content: str, expected_ok: bool) -> None:
+    header_file = cpp_file.with_name(f"{cpp_file.stem}_{gen_params.FASTIO_HEADER.name}")
+    header_file.write_text(gen_params.FASTIO_HEADER.read_text())
+    cpp_code = f"""
+#include <climits>
+#include "{header_file.name}"
+
+int main() <%
+    fastio::StrictReader in;
+    long long n = in.read_int(1, 10);
+    in.read_newline();
+    for (long long i = 0; i < n; ++i) <%
+        if (i > 0) in.read_space();
+        in.read_int(LLONG_MIN, LLONG_MAX);
+    %>
+    in.read_newline();
+    in.read_eof();
+%>
+"""
+    try:
+        exe_file = compile_cpp(cpp_file, cpp_code)
+    finally:
+        header_file.unlink()
+    with temp_files(3) as (stdin, stdout, stderr):
+        stdin.write(content)
+        stdin.seek(0)
+        run_result = runner.run(
+            [str(exe_file)],
+            runner_params=runner.RunnerParams(
+                stdin=stdin, stdout=stdout, stderr=stderr, check_returncode=False
+            ),
+        )
+    exe_file.unlink()
+    assert (run_result.returncode == 0) == expected_ok
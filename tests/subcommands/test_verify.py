@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+from pytest_mock import MockerFixture
+
+from cp_problem_maker import anchor
+from cp_problem_maker.buildrun.languages.language import CompileError
+from cp_problem_maker.project.problem import ProblemWithConfig
+from cp_problem_maker.subcommands import verify
+
+_VERIFIER = """
+from cp_problem_maker.validlib import Validator, verify_inputs
+
+
+def verify(inf: Validator) -> None:
+    inf.read_int(0, 99, "a")
+    inf.read_eoln()
+    inf.read_eof()
+
+
+verify_inputs(verify)
+"""
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_verify_all_failures(
+    py_file: Path, monkeypatch: pytest.MonkeyPatch, batch: bool
+) -> None:
+    monkeypatch.setenv("PYTHONPATH", str(anchor.SOURCE_ROOT.parent))
+    py_file.write_text(_VERIFIER)
+    cmd = [sys.executable, str(py_file)]
+    with TemporaryDirectory() as tmpdir:
+        contents = ["1\n", "100\n", "2\n", "3 \n"]
+        testcase_files = [Path(tmpdir) / f"{i:02d}.in" for i in range(len(contents))]
+        for file, content in zip(testcase_files, contents, strict=True):
+            file.write_text(content)
+        if batch:
+            failures = verify._verify_batch(cmd, testcase_files)
+        else:
+            failures = [
+                failure
+                for file in testcase_files
+                for failure in verify._verify_testcase(cmd, file)
+            ]
+    assert [(f.testcase_file.name, f.message) for f in failures] == [
+        ("01.in", "line 1, column 1: a = 100 is out of range [0, 99]"),
+        ("03.in", "line 1, column 2: expected a newline"),
+    ]
+
+
+def test_verify_builds_verifier_up_front(
+    project_root: Path, mocker: MockerFixture
+) -> None:
+    problem = ProblemWithConfig(project_root, search_root=False).problem
+    problem.verifier_file.write_text("int main( {}\n")
+    verify_testcases = mocker.patch.object(verify, "_verify_testcases")
+    with pytest.raises(CompileError):
+        verify.verify(project_root, jobs=None, batch=False)
+    verify_testcases.assert_not_called()
@@ -0,0 +1,110 @@
+import io
+import re
+
+import pytest
+
+from cp_problem_maker.validlib import ValidationError, Validator
+
+
+def test_validator() -> None:
+    inf = Validator(io.BytesIO(b"3 abc\n-1 0 10\n1.25\n7\n8\n9\nhello world\n"))
+    assert inf.read_int(1, 3, "n") == 3
+    inf.read_space()
+    assert inf.read_token("[a-z]+", "s") == "abc"
+    inf.read_eoln()
+    assert inf.read_ints(3, -1, 10, "a") == [-1, 0, 10]
+    inf.read_eoln()
+    assert inf.read_real(0, 2, "x", max_decimals=2) == 1.25
+    inf.read_eoln()
+    assert inf.read_ints(3, 1, 9, "b", sep="\n") == [7, 8, 9]
+    inf.read_eoln()
+    assert inf.read_line("[a-z ]+") == "hello world"
+    inf.read_eof()
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"01\n", "line 1, column 1: expected n, found b'01'"),
+        (b"-0\n", "line 1, column 1: expected n, found b'-0'"),
+        (b"+1\n", "line 1, column 1: expected n, found b'+1'"),
+        (b"11\n", "line 1, column 1: n = 11 is out of range [1, 10]"),
+        # Longer than `int` converts
+        (
+            b"1" * 5000 + b"\n",
+            "line 1, column 1: n of 5000 digits is out of range [1, 10]",
+        ),
+        (b" 1\n", "line 1, column 1: expected n"),
+        (b"1 \n", "line 1, column 2: expected a newline"),
+        (b"1\r\n", "line 1, column 2: expected a newline"),
+        (b"1", "line 1, column 2: expected a newline"),
+        (b"1\n\n", "line 2, column 1: expected the end of the input"),
+    ],
+)
+def test_validator_int_error(data: bytes, message: str) -> None:
+    inf = Validator(io.BytesIO(data))
+    with pytest.raises(ValidationError, match=f"^{re.escape(message)}$"):
+        inf.read_int(1, 10, "n")
+        inf.read_eoln()
+        inf.read_eof()
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"1 2  3\n", "line 1, column 5: expected a[2]"),
+        (b"1 2 03\n", "line 1, column 5: expected a[2], found b'03'"),
+        (b"1 -0 3\n", "line 1, column 3: expected a[1], found b'-0'"),
+        (b"1 2 11\n", "line 1, column 5: a[2] = 11 is out of range [-10, 10]"),
+        (b"1 2\n", "line 1, column 4: expected ' ' in a"),
+        (b"1 2 3 4\n", "line 1, column 6: expected a newline"),
+        (b"1 2 3x\n", "line 1, column 5: expected a[2], found b'3x'"),
+        (b"1 - 3\n", "line 1, column 3: expected a[1], found b'-'"),
+        (b"1 --2 3\n", "line 1, column 3: expected a[1], found b'--2'"),
+        (
+            b"1 -" + b"2" * 5000 + b" 3\n",
+            "line 1, column 3: a[1] of 5001 digits is out of range [-10, 10]",
+        ),
+    ],
+)
+def test_validator_ints_error(data: bytes, message: str) -> None:
+    inf = Validator(io.BytesIO(data))
+    with pytest.raises(ValidationError, match=f"^{re.escape(message)}$"):
+        inf.read_ints(3, -10, 10, "a")
+        inf.read_eoln()
+
+
+def test_validator_exit(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit) as e:
+        with Validator(io.BytesIO(b"1 2\n")) as inf:
+            inf.read_int(1, 10, "n")
+            inf.read_eoln()
+    assert e.value.code == 1
+    assert capsys.readouterr().err == "line 1, column 2: expected a newline\n"
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"1 2\n3 4\n5 6\n", ""),
+        (b"1 2\n3 4\n5 7\n", "line 3, column 3: v[2] = 7 is out of range [1, 6]"),
+        (b"1 2\n3 4 5\n6\n", "line 2, column 4: expected a newline"),
+        (b"1 2\n3 4\n5 6", "line 3, column 4: expected a newline"),
+        (b"1 2\n3 04\n5 6\n", "line 2, column 3: expected v[1], found b'04'"),
+        (
+            b"1 2\n" + b"3" * 5000 + b" 4\n5 6\n",
+            "line 2, column 1: u[1] of 5000 digits is out of range [1, 6]",
+        ),
+    ],
+)
+def test_validator_int_columns(data: bytes, message: str) -> None:
+    inf = Validator(io.BytesIO(data))
+    if not message:
+        assert inf.read_int_columns(3, [(1, 6), (1, 6)], ["u", "v"]) == [
+            [1, 3, 5],
+            [2, 4, 6],
+        ]
+        inf.read_eof()
+        return
+    with pytest.raises(ValidationError, match=f"^{re.escape(message)}$"):
+        inf.read_int_columns(3, [(1, 6), (1, 6)], ["u", "v"])
@@ -4,7 +4,7 @@ from typing import Literal
 
 import pytest
 
-from cp_problem_maker.utils._path import search_root
+from cp_problem_maker.utils._path import copy_file, search_root
 
 
 @pytest.mark.parametrize(
@@ -28,3 +28,17 @@ def test_search_root_not_found() -> None:
         cwd.mkdir(parents=True)
         with pytest.raises(FileNotFoundError):
             search_root(cwd, "DUMMY" * 10)
+
+
+def test_copy_file() -> None:
+    with TemporaryDirectory() as tmpdir:
+        src = Path(tmpdir) / "src.in"
+        dest = Path(tmpdir) / "dest.in"
+        link = Path(tmpdir) / "link.in"
+        content = b"1 2\r\n" * 100000
+        src.write_bytes(content)
+        dest.write_bytes(b"old")
+        link.hardlink_to(dest)
+        copy_file(src, dest)
+        assert dest.read_bytes() == content
+        assert link.read_bytes() == b"old"